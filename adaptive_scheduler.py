@@ -0,0 +1,210 @@
+"""
+PoseDetector용 적응형 추론 스케줄러.
+프레임당 지연 예산(budget_ms)에 맞추어 다음을 자동으로 결정합니다.
+- 정적 장면 건너뛰기: 축소한 흑백 썸네일의 프레임 차이가 작으면 추론을 생략하고 직전 랜드마크를 재사용
+- ROI 자르기: 직전 랜드마크로 예측한 사람 영역만 잘라 추론
+- 입력 축소와 model_complexity: 추론 지연 이동 평균이 예산을 넘으면 한 단계 가볍게, 여유가 크면 한 단계 무겁게
+- 추론 빈도 제한(max_inference_hz): 그 사이 프레임은 직전 랜드마크를 재사용(landmark_filter.LandmarkSmoother가 예측으로 보간)
+PoseDetector와 같은 find_pose / find_landmark_frame / find_landmarks 인터페이스를 제공하므로 그대로 대신 쓸 수 있습니다.
+"""
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from landmark_frame import VISIBILITY
+from renderer import draw_skeleton
+
+# 가벼운 순서로 정렬한 (model_complexity, 입력 배율) 단계
+QUALITY_LEVELS = (
+    (2, 1.0),
+    (1, 1.0),
+    (1, 0.75),
+    (0, 0.75),
+    (0, 0.5),
+    (0, 0.35),
+)
+
+_THUMB_STRIDE = 16  # 움직임 판단용 썸네일 샘플링 간격(픽셀)
+
+
+class AdaptiveInferenceScheduler:
+    """
+    적응형 추론 스케줄러.
+    - detector: PoseDetector
+    - budget_ms: 프레임당 추론 지연 예산(ms)
+    - motion_threshold: 썸네일 평균 밝기 차이(0~255)가 이 값 미만이면 정적 장면으로 판단
+    - max_skip_seconds: 정적 장면이어도 이 시간이 지나면 다시 추론
+    - crop: ROI 자르기 사용 여부
+    - crop_margin: 랜드마크 외곽 상자에 더하는 여백(상자 크기 대비 비율)
+    - start_level: 시작 품질 단계(QUALITY_LEVELS 인덱스)
+    - max_inference_hz: 초당 최대 추론 횟수(None이면 제한 없음). 사람이 보이지 않을 때는 제한하지 않습니다.
+    결정 내용은 last_decision, 누적 통계는 stats()로 확인합니다.
+    """
+    def __init__(self, detector, budget_ms=40.0, motion_threshold=2.0, max_skip_seconds=1.0,
+                 crop=True, crop_margin=0.3, start_level=1, min_visibility=0.5, max_inference_hz=None):
+        self.detector = detector
+        self.budget_ms = budget_ms
+        self.motion_threshold = motion_threshold
+        self.max_skip_seconds = max_skip_seconds
+        self.crop = crop
+        self.crop_margin = crop_margin
+        self.min_visibility = min_visibility
+        self.min_interval = 1.0 / max_inference_hz if max_inference_hz else 0.0
+
+        self.level = start_level
+        self._min_level = 0          # 사용할 수 있는 가장 무거운 단계
+        self._apply_level()
+        self.latency_ms = None       # 추론 지연 지수 이동 평균
+        self._since_change = 0       # 마지막 단계 변경 이후 추론 횟수
+        self.roi = None              # 현재 자르기 영역 (x0, y0, x1, y1) 또는 None(전체 프레임)
+
+        self._last_thumb = None
+        self._last_inference_at = 0.0
+        self._inference_times = deque(maxlen=120)
+        self.frames = 0
+        self.inferences = 0
+        self.skipped = 0
+        self.last_decision = {}
+
+    # ---- PoseDetector 호환 인터페이스 ----
+    def find_pose(self, img, draw=True):
+        """
+        프레임을 처리합니다. 필요할 때만 추론하고, 건너뛴 프레임에는 직전 랜드마크를 재사용합니다.
+        - 반환: 랜드마크가 그려진(또는 원본) BGR 이미지
+        """
+        now = time.perf_counter()
+        self.frames += 1
+        thumb = self._thumbnail(img)
+        motion = None if self._last_thumb is None else float(cv2.absdiff(thumb, self._last_thumb).mean())
+
+        frame = self.detector.find_landmark_frame()
+        since = now - self._last_inference_at
+        static = (motion is not None and motion < self.motion_threshold and bool(frame)
+                  and since < self.max_skip_seconds)
+        throttled = bool(frame) and since < self.min_interval
+        if static or throttled:
+            self.skipped += 1
+            self.last_decision = {'skipped': True, 'reason': 'static' if static else 'rate',
+                                  'motion': motion, 'level': self.level}
+            if draw:
+                draw_skeleton(img, frame.data, visibility=frame.visibility)
+            return img
+
+        complexity, scale = QUALITY_LEVELS[self.level]
+        roi = self.roi
+        t0 = time.perf_counter()
+        img = self.detector.find_pose(img, draw=draw, roi=roi, scale=scale)
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        self.inferences += 1
+        self._last_thumb = thumb
+        self._last_inference_at = now
+        self._inference_times.append(now)
+        self._update_latency(elapsed_ms)
+        self._update_roi(img.shape)
+        self.last_decision = {
+            'skipped': False, 'motion': motion, 'level': self.level,
+            'model_complexity': complexity, 'scale': scale, 'roi': roi, 'latency_ms': elapsed_ms,
+        }
+        return img
+
+    def find_landmark_frame(self):
+        """마지막으로 추론(또는 재사용)한 LandmarkFrame을 반환합니다."""
+        return self.detector.find_landmark_frame()
+
+    def find_landmarks(self, img):
+        return self.detector.find_landmarks(img)
+
+    # ---- 내부 결정 로직 ----
+    @staticmethod
+    def _thumbnail(img):
+        """간격 샘플링한 작은 흑백 썸네일(움직임 판단용)."""
+        small = np.ascontiguousarray(img[::_THUMB_STRIDE, ::_THUMB_STRIDE])
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def _apply_level(self, previous=None):
+        """현재 단계의 model_complexity를 적용합니다. 모델을 불러올 수 없으면 이전 단계로 돌아가고 그보다 무거운 단계는 쓰지 않습니다."""
+        try:
+            self.detector.set_model_complexity(QUALITY_LEVELS[self.level][0])
+        except Exception as e:
+            if previous is None:
+                raise
+            print(f"[추론 스케줄러] model_complexity={QUALITY_LEVELS[self.level][0]} 모델을 사용할 수 없습니다: {e}")
+            self._min_level = max(self._min_level, self.level + 1)
+            self.level = previous
+
+    def _update_latency(self, elapsed_ms):
+        """지연 이동 평균을 갱신하고 예산과 비교해 품질 단계를 조정합니다(변경 후 최소 10회 관찰)."""
+        self.latency_ms = elapsed_ms if self.latency_ms is None else 0.8 * self.latency_ms + 0.2 * elapsed_ms
+        self._since_change += 1
+        if self._since_change < 10:
+            return
+        previous = self.level
+        if self.latency_ms > self.budget_ms and self.level < len(QUALITY_LEVELS) - 1:
+            self.level += 1
+        elif self.latency_ms < 0.5 * self.budget_ms and self.level > self._min_level:
+            self.level -= 1
+        else:
+            return
+        self._apply_level(previous)
+        self._since_change = 0
+        self.latency_ms = None
+
+    def _update_roi(self, shape):
+        """
+        직전 랜드마크의 외곽 상자로 다음 자르기 영역을 정합니다.
+        사람이 현재 영역 안쪽에 머무르면 영역을 유지해(추적 좌표계 안정) 불필요한 이동을 줄입니다.
+        """
+        if not self.crop:
+            return
+        frame = self.detector.find_landmark_frame()
+        if not frame:
+            self.roi = None  # 사람을 놓치면 전체 프레임에서 다시 찾습니다.
+            return
+        h, w = shape[:2]
+        visible = frame.data[frame.data[:, VISIBILITY] >= self.min_visibility]
+        if len(visible) < 4:
+            self.roi = None
+            return
+        bx0, by0 = visible[:, 0].min() * w, visible[:, 1].min() * h
+        bx1, by1 = visible[:, 0].max() * w, visible[:, 1].max() * h
+
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            inner_x, inner_y = (x1 - x0) * 0.1, (y1 - y0) * 0.1
+            if bx0 > x0 + inner_x and by0 > y0 + inner_y and bx1 < x1 - inner_x and by1 < y1 - inner_y:
+                return
+
+        # 여백을 더하고, 모델 입력에 맞게 정사각형에 가깝게 만든 뒤 프레임 안으로 제한합니다.
+        size = max(bx1 - bx0, by1 - by0) * (1.0 + 2 * self.crop_margin)
+        cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+        x0, x1 = int(max(cx - size / 2, 0)), int(min(cx + size / 2, w))
+        y0, y1 = int(max(cy - size / 2, 0)), int(min(cy + size / 2, h))
+        # 영역이 프레임 대부분이면 자르지 않습니다.
+        self.roi = None if (x1 - x0) * (y1 - y0) > 0.8 * w * h else (x0, y0, x1, y1)
+
+    def effective_fps(self, window_seconds=5.0):
+        """최근 window_seconds 동안의 실제 추론 횟수/초."""
+        now = time.perf_counter()
+        recent = [t for t in self._inference_times if now - t <= window_seconds]
+        if len(recent) < 2:
+            return 0.0
+        return (len(recent) - 1) / max(recent[-1] - recent[0], 1e-6)
+
+    def stats(self):
+        """누적 결정 통계를 반환합니다."""
+        complexity, scale = QUALITY_LEVELS[self.level]
+        return {
+            'frames': self.frames,
+            'inferences': self.inferences,
+            'skipped': self.skipped,
+            'skip_ratio': self.skipped / max(self.frames, 1),
+            'effective_inference_fps': self.effective_fps(),
+            'level': self.level,
+            'model_complexity': complexity,
+            'scale': scale,
+            'latency_ms': self.latency_ms,
+            'roi': self.roi,
+        }
@@ -0,0 +1,495 @@
+"""
+자세 분석 결과의 시계열 저장소(SQLite, WAL 모드).
+- AnalyticsStore.record()는 프레임 루프에서 분석 결과를 대기열에 넣기만 하고, 작업 스레드가 모아서 한 트랜잭션으로 씁니다.
+  디스크가 느려도 프레임 루프는 멈추지 않으며, 대기열이 가득 차면 새 표본을 버리고 dropped를 셉니다.
+- 원본 프레임은 저장하지 않고, 분/시/일 단위 롤업만 증분 upsert로 갱신합니다.
+  · status_rollup: (단위, 구간 시작, 항목, 상태)별 표본 수와 지속 시간(초). 'person' 항목은 PRESENT/ABSENT(사람 검출 여부)입니다.
+  · metric_rollup: (단위, 구간 시작, 지표)별 개수, 합, 제곱합, 최솟값, 최댓값(CVA, 팔꿈치 각도 등)
+  지속 시간은 각 표본이 다음 표본까지(마지막 표본은 stop() 시각까지, 최대 max_gap초) 유지된 것으로 계산합니다.
+  시/일 구간은 현지 시각 기준(자정, 정시)입니다.
+- report()는 범위를 일 → 시 → 분 롤업으로 나누어 읽으므로, 몇 달치 데이터도 수 밀리초 안에 답합니다.
+사용 예:
+   python main.py --analytics                              # 기본 경로(~/.cache/ergonomic_posture/analytics.db)
+   python analytics_store.py report --from 2026-10-01 --to 2026-10-16
+   python analytics_store.py series --from 2026-10-15 --resolution hour --item head
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from ergonomics_rules import analyze_batch, is_issue
+from landmark_frame import LANDMARK_INDEX, NUM_LANDMARKS
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ergonomic_posture", "analytics.db")
+SCHEMA_VERSION = 1
+
+MINUTE, HOUR, DAY = 60, 3600, 86400
+RESOLUTIONS = {'minute': MINUTE, 'hour': HOUR, 'day': DAY}
+PERSON = 'person'  # 사람 검출 여부 항목(상태 PRESENT/ABSENT)
+METRICS = ('cva', 'left_elbow_angle', 'right_elbow_angle', 'nose_eye_diff', 'shoulder_z_delta')
+
+# 지표별로 보여야 하는 관절(웹캠 좌우 반전으로 화면상 왼팔은 MediaPipe의 right_* 관절)
+_METRIC_JOINTS = {
+    'cva': ('left_shoulder', 'right_shoulder', 'right_ear'),
+    'left_elbow_angle': ('right_shoulder', 'right_elbow', 'right_wrist'),
+    'right_elbow_angle': ('left_shoulder', 'left_elbow', 'left_wrist'),
+    'nose_eye_diff': ('nose', 'left_eye', 'right_eye'),
+    'shoulder_z_delta': ('left_shoulder', 'right_shoulder', 'left_hip', 'right_hip'),
+}
+_METRIC_INDEX = {name: [LANDMARK_INDEX[j] for j in joints] for name, joints in _METRIC_JOINTS.items()}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS status_rollup (
+    res INTEGER NOT NULL, bucket INTEGER NOT NULL, item TEXT NOT NULL, status TEXT NOT NULL,
+    frames INTEGER NOT NULL, seconds REAL NOT NULL,
+    PRIMARY KEY (res, bucket, item, status)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS metric_rollup (
+    res INTEGER NOT NULL, bucket INTEGER NOT NULL, metric TEXT NOT NULL,
+    n INTEGER NOT NULL, total REAL NOT NULL, total_sq REAL NOT NULL, lo REAL NOT NULL, hi REAL NOT NULL,
+    PRIMARY KEY (res, bucket, metric)
+) WITHOUT ROWID;
+"""
+_UPSERT_STATUS = """
+INSERT INTO status_rollup (res, bucket, item, status, frames, seconds) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (res, bucket, item, status) DO UPDATE SET
+    frames = frames + excluded.frames, seconds = seconds + excluded.seconds
+"""
+_UPSERT_METRIC = """
+INSERT INTO metric_rollup (res, bucket, metric, n, total, total_sq, lo, hi) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (res, bucket, metric) DO UPDATE SET
+    n = n + excluded.n, total = total + excluded.total, total_sq = total_sq + excluded.total_sq,
+    lo = min(lo, excluded.lo), hi = max(hi, excluded.hi)
+"""
+
+
+def floor_bucket(t, res):
+    """t(UNIX 초)가 속한 구간의 시작 시각. 시/일은 현지 시각 기준입니다."""
+    t = int(t // MINUTE) * MINUTE
+    if res == MINUTE:
+        return t
+    lt = time.localtime(t)
+    if res == HOUR:
+        return t - lt.tm_min * 60
+    return int(time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday, 0, 0, 0, 0, 0, -1)))
+
+
+def next_bucket(t, res):
+    """t 이후(같으면 t) 첫 구간 경계."""
+    start = floor_bucket(t, res)
+    if start >= t:
+        return start
+    if res != DAY:
+        return start + res
+    lt = time.localtime(start)
+    return int(time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday + 1, 0, 0, 0, 0, 0, -1)))
+
+
+def plan_range(start, end):
+    """
+    [start, end) 범위를 가장 굵은 롤업으로 덮는 (단위, 시작, 끝) 목록을 만듭니다.
+    분 단위로 맞추어(시작은 내림, 끝은 올림) 일 → 시 → 분 순으로 나누므로 구간은 많아야 5개입니다.
+    """
+    start = int(start // MINUTE) * MINUTE
+    end = int(math.ceil(end / MINUTE)) * MINUTE
+    plan = []
+
+    def split(lo, hi, levels):
+        if lo >= hi:
+            return
+        res = levels[0]
+        if res == MINUTE:
+            plan.append((MINUTE, lo, hi))
+            return
+        a, b = next_bucket(lo, res), floor_bucket(hi, res)
+        if a < b:
+            split(lo, a, levels[1:])
+            plan.append((res, a, b))
+            split(b, hi, levels[1:])
+        else:
+            split(lo, hi, levels[1:])
+
+    split(start, end, (DAY, HOUR, MINUTE))
+    return plan
+
+
+def _landmark_metrics(landmarks, min_visibility):
+    """(k, 33, 4) 랜드마크 묶음에서 지표별 값 배열을 계산합니다. 관절이 안 보이는 프레임은 NaN입니다."""
+    batch = analyze_batch(landmarks, 0.0, 0.0, 0.0, 0.0, 0.0)
+    hidden = landmarks[:, :, 3] < min_visibility
+    metrics = {}
+    for name in METRICS:
+        values = np.asarray(getattr(batch, name), dtype=np.float64)
+        metrics[name] = np.where(hidden[:, _METRIC_INDEX[name]].any(axis=1), np.nan, values)
+    return metrics
+
+
+class AnalyticsStore:
+    """
+    배치 쓰기 작업 스레드가 붙은 시계열 롤업 저장소.
+    - path: SQLite 파일 경로(WAL 모드로 열어 읽기와 쓰기가 서로 막지 않습니다)
+    - batch_size: 한 트랜잭션에 쓰는 최대 표본 수
+    - flush_interval: 표본이 batch_size만큼 모이지 않아도 이 간격(초)마다 씁니다
+    - max_gap: 표본 하나가 유지된 것으로 보는 최대 시간(초). 앱이 꺼져 있던 시간은 세지 않습니다.
+    - max_pending: 대기열 최대 표본 수(넘으면 새 표본을 버림)
+    start()를 호출해야 record()가 기록되며, 조회(report/series)는 start() 없이도 됩니다.
+    """
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=512, flush_interval=1.0, max_gap=10.0,
+                 max_pending=8192, min_visibility=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_gap = max_gap
+        self.max_pending = max_pending
+        self.min_visibility = min_visibility
+
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._flush_requests = 0
+        self._flushed = 0
+        self._last = None  # 직전 표본 (timestamp, [(항목, 상태)]) — 지속 시간은 다음 표본이 올 때 확정됩니다.
+        self._read_conn = None
+        self._read_lock = threading.Lock()
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0  # 쓰기에 실패해 버린 표본 수
+        self.write_ms = 0.0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.close()
+
+    def _connect(self, check_same_thread=True):
+        conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    # ---- 기록 ----
+    def start(self):
+        """쓰기 작업 스레드를 시작합니다."""
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="analytics-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, items, landmarks=None, timestamp=None):
+        """
+        분석 결과 하나를 대기열에 넣습니다(프레임 루프에서 호출, 디스크를 기다리지 않음).
+        - items: [(항목, 상태, 문구)] (빈 리스트면 사람이 없는 표본)
+        - landmarks: 지표 계산용 랜드마크(LandmarkFrame 또는 (33, 4) 배열, 복사해 둡니다). 생략하거나
+                     visibility 열이 없으면((33, 3) 등) 상태만 기록합니다.
+        - timestamp: UNIX 시각(초). 생략하면 현재 시각.
+        - 반환: 대기열에 넣었으면 True, 가득 차 버렸으면 False
+        """
+        if not self._running:
+            return False
+        statuses = [(item, status) for item, status, _ in items]
+        lm = None
+        if items and landmarks is not None and len(landmarks):
+            try:
+                lm = np.array(landmarks, dtype=np.float32)
+            except (TypeError, ValueError):
+                lm = np.empty(0, dtype=np.float32)
+            # 지표는 visibility로 가려진 관절을 걸러야 하므로 (33, 4 이상) 모양만 씁니다.
+            lm = lm[:, :4] if lm.ndim == 2 and lm.shape[0] == NUM_LANDMARKS and lm.shape[1] >= 4 else None
+        sample = (time.time() if timestamp is None else timestamp, statuses, lm)
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending.append(sample)
+            self.recorded += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self, timeout=5.0):
+        """대기 중인 표본을 모두 쓸 때까지 기다립니다. 기다린 시간 안에 끝나면 True."""
+        with self._cond:
+            if not self._running:
+                return True
+            self._flush_requests += 1
+            target = self._flush_requests
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._flushed >= target or not self._running, timeout)
+
+    def stop(self, timeout=5.0):
+        """남은 표본을 쓰고 작업 스레드를 종료합니다."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    close = stop
+
+    def _worker(self):
+        conn = self._connect()
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: len(self._pending) >= self.batch_size or not self._running
+                                        or self._flush_requests > self._flushed, self.flush_interval)
+                    batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.batch_size))]
+                    more = bool(self._pending)
+                    running = self._running
+                    flush_target = self._flush_requests
+                # 종료할 때는 마지막 표본의 지속 시간도 지금까지로 확정해 씁니다.
+                end = None if running or more else time.time()
+                if batch or (end is not None and self._last is not None):
+                    try:
+                        self._write(conn, batch, end)
+                    except Exception as e:  # 어떤 오류든 작업 스레드는 계속 돌아야 합니다.
+                        self.failed += len(batch)
+                        print(f"[분석 저장소] 쓰기 오류(이번 묶음 {len(batch)}개 버림): {e!r}")
+                if more:
+                    continue
+                with self._cond:
+                    self._flushed = flush_target
+                    self._cond.notify_all()
+                if not running:
+                    break
+        finally:
+            conn.close()
+
+    def _write(self, conn, batch, end=None):
+        """
+        표본 묶음을 분 구간별로 합산한 뒤 분/시/일 롤업에 upsert합니다.
+        end(UNIX 시각)를 주면 마지막 표본을 그 시각까지(최대 max_gap초) 유지된 것으로 보고 함께 씁니다(종료 시).
+        """
+        t0 = time.perf_counter()
+        status_acc = {}  # (분 구간, 항목, 상태) -> [표본 수, 초]
+
+        def close_last(t):
+            last_t, last_statuses = self._last
+            seconds = min(max(t - last_t, 0.0), self.max_gap)
+            minute = int(last_t // MINUTE) * MINUTE
+            for item, status in last_statuses:
+                acc = status_acc.setdefault((minute, item, status), [0, 0.0])
+                acc[0] += 1
+                acc[1] += seconds
+
+        for t, statuses, lm in batch:
+            if self._last is not None:
+                close_last(t)
+            self._last = (t, [(PERSON, 'PRESENT' if statuses else 'ABSENT')] + statuses)
+        if end is not None and self._last is not None:
+            close_last(end)
+            self._last = None
+
+        metric_acc = {}  # (분 구간, 지표) -> [n, 합, 제곱합, 최소, 최대]
+        with_landmarks = [(t, lm) for t, _, lm in batch if lm is not None]
+        if with_landmarks:
+            minutes = np.array([int(t // MINUTE) * MINUTE for t, _ in with_landmarks])
+            metrics = _landmark_metrics(np.stack([lm for _, lm in with_landmarks]), self.min_visibility)
+            for minute in np.unique(minutes):
+                in_minute = minutes == minute
+                for name, values in metrics.items():
+                    v = values[in_minute]
+                    v = v[~np.isnan(v)]
+                    if len(v):
+                        metric_acc[(int(minute), name)] = [len(v), float(v.sum()), float((v * v).sum()),
+                                                           float(v.min()), float(v.max())]
+
+        buckets = {}  # 분 구간 -> (분, 시, 일 구간 시작)
+        for minute in {key[0] for key in status_acc} | {key[0] for key in metric_acc}:
+            buckets[minute] = ((MINUTE, minute), (HOUR, floor_bucket(minute, HOUR)), (DAY, floor_bucket(minute, DAY)))
+        status_rows = [(res, bucket, item, status, frames, seconds)
+                       for (minute, item, status), (frames, seconds) in status_acc.items()
+                       for res, bucket in buckets[minute]]
+        metric_rows = [(res, bucket, name) + tuple(values)
+                       for (minute, name), values in metric_acc.items()
+                       for res, bucket in buckets[minute]]
+        with conn:
+            conn.executemany(_UPSERT_STATUS, status_rows)
+            conn.executemany(_UPSERT_METRIC, metric_rows)
+        self.written += len(batch)
+        self.batches += 1
+        self.write_ms = (time.perf_counter() - t0) * 1000.0
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending)
+        return {'recorded': self.recorded, 'written': self.written, 'dropped': self.dropped, 'failed': self.failed,
+                'pending': pending,
+                'batches': self.batches, 'last_write_ms': round(self.write_ms, 2)}
+
+    # ---- 조회 ----
+    def _query(self, sql, params):
+        with self._read_lock:
+            if self._read_conn is None:
+                self._read_conn = self._connect(check_same_thread=False)
+            return self._read_conn.execute(sql, params).fetchall()
+
+    def report(self, start, end, items=None):
+        """
+        [start, end) 범위의 항목별 상태 지속 시간/비율과 지표 통계를 롤업으로 계산합니다.
+        - items: 항목 이름 목록(None이면 전체)
+        - 반환: {'start', 'end', 'plan', 'present_seconds', 'absent_seconds',
+                 'items': {항목: {상태: {'frames', 'seconds', 'ratio'}}},   # ratio는 사람이 있던 시간 대비
+                 'metrics': {지표: {'n', 'mean', 'std', 'min', 'max'}}}
+        """
+        plan = plan_range(start, end)
+        status, metrics = {}, {}
+        for res, lo, hi in plan:
+            for item, name, frames, seconds in self._query(
+                    "SELECT item, status, SUM(frames), SUM(seconds) FROM status_rollup "
+                    "WHERE res = ? AND bucket >= ? AND bucket < ? GROUP BY item, status", (res, lo, hi)):
+                acc = status.setdefault(item, {}).setdefault(name, [0, 0.0])
+                acc[0] += frames
+                acc[1] += seconds
+            for name, n, total, total_sq, lo_v, hi_v in self._query(
+                    "SELECT metric, SUM(n), SUM(total), SUM(total_sq), MIN(lo), MAX(hi) FROM metric_rollup "
+                    "WHERE res = ? AND bucket >= ? AND bucket < ? GROUP BY metric", (res, lo, hi)):
+                acc = metrics.setdefault(name, [0, 0.0, 0.0, math.inf, -math.inf])
+                acc[0] += n
+                acc[1] += total
+                acc[2] += total_sq
+                acc[3] = min(acc[3], lo_v)
+                acc[4] = max(acc[4], hi_v)
+
+        person = status.pop(PERSON, {})
+        present = person.get('PRESENT', [0, 0.0])[1]
+        result = {'start': start, 'end': end, 'plan': plan, 'present_seconds': present,
+                  'absent_seconds': person.get('ABSENT', [0, 0.0])[1], 'items': {}, 'metrics': {}}
+        for item, rows in status.items():
+            if items and item not in items:
+                continue
+            result['items'][item] = {name: {'frames': frames, 'seconds': seconds,
+                                            'ratio': seconds / present if present else 0.0}
+                                     for name, (frames, seconds) in rows.items()}
+        for name, (n, total, total_sq, lo_v, hi_v) in metrics.items():
+            mean = total / n
+            result['metrics'][name] = {'n': n, 'mean': mean, 'std': math.sqrt(max(total_sq / n - mean * mean, 0.0)),
+                                       'min': lo_v, 'max': hi_v}
+        return result
+
+    def series(self, start, end, resolution='hour', item=None):
+        """
+        구간별 시계열을 반환합니다(차트/일일 보고용).
+        - 반환: [(구간 시작, 항목, 상태, 표본 수, 초)] (구간 시작 순)
+        """
+        res = RESOLUTIONS[resolution]
+        lo, hi = floor_bucket(start, res), end
+        sql = ("SELECT bucket, item, status, frames, seconds FROM status_rollup "
+               "WHERE res = ? AND bucket >= ? AND bucket < ?")
+        params = (res, lo, hi)
+        if item is not None:
+            sql += " AND item = ?"
+            params += (item,)
+        return self._query(sql + " ORDER BY bucket, item, status", params)
+
+    def span(self):
+        """기록된 (첫 분 구간 시작, 마지막 분 구간 끝). 비어 있으면 None."""
+        lo, hi = self._query("SELECT MIN(bucket), MAX(bucket) FROM status_rollup WHERE res = ?", (MINUTE,))[0]
+        return None if lo is None else (lo, hi + MINUTE)
+
+
+def _parse_time(text, default):
+    """ISO 날짜/시각, 'HH:MM'(오늘), UNIX 초 또는 'now'를 UNIX 초로 바꿉니다."""
+    if text is None:
+        return default
+    if text == 'now':
+        return time.time()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    if len(text) <= 8 and ':' in text:
+        return datetime.datetime.combine(datetime.date.today(), datetime.time.fromisoformat(text)).timestamp()
+    return datetime.datetime.fromisoformat(text).timestamp()
+
+
+def _format_time(t):
+    return datetime.datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M')
+
+
+def _format_duration(seconds):
+    return f"{seconds / 3600:.1f}시간" if seconds >= 3600 else f"{seconds / 60:.1f}분"
+
+
+def print_report(result):
+    print(f"[분석 보고] {_format_time(result['start'])} ~ {_format_time(result['end'])}: "
+          f"자리에 있음 {_format_duration(result['present_seconds'])}, 자리 비움 {_format_duration(result['absent_seconds'])}")
+    for item, rows in sorted(result['items'].items()):
+        issue = sum(v['ratio'] for name, v in rows.items() if is_issue(name))
+        parts = [f"{name} {v['ratio']:.1%} ({_format_duration(v['seconds'])})"
+                 for name, v in sorted(rows.items(), key=lambda kv: -kv[1]['seconds'])]
+        print(f"  {item:8s} 문제 {issue:6.1%} | " + ", ".join(parts))
+    for name, m in result['metrics'].items():
+        print(f"  {name:18s} 평균 {m['mean']:8.3f}  표준편차 {m['std']:7.3f}  범위 {m['min']:.3f}~{m['max']:.3f}  n={m['n']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="자세 분석 시계열 저장소 조회")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"저장소 경로(기본 {DEFAULT_DB_PATH})")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_report = sub.add_parser('report', help="범위 보고(항목별 문제 시간 비율, 지표 통계)")
+    p_series = sub.add_parser('series', help="구간별 시계열")
+    for p in (p_report, p_series):
+        p.add_argument("--from", dest='start', help="시작(ISO 날짜/시각, HH:MM, UNIX 초. 기본: 기록 처음)")
+        p.add_argument("--to", dest='end', help="끝(기본: 지금)")
+        p.add_argument("--item", action='append', help="항목만 보기(head, shoulder, eye, elbow, person)")
+        p.add_argument("--json", action='store_true', help="JSON으로 출력")
+    p_series.add_argument("--resolution", choices=tuple(RESOLUTIONS), default='day', help="구간 단위(기본 day)")
+    sub.add_parser('info', help="저장소 정보")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"저장소가 없습니다: {args.db}")
+    store = AnalyticsStore(args.db)
+    span = store.span()
+    if args.command == 'info':
+        rows = {name: store._query(f"SELECT COUNT(*) FROM {name}", ())[0][0] for name in ('status_rollup', 'metric_rollup')}
+        print(f"[분석 저장소] {args.db}: {os.path.getsize(args.db) / 1e6:.1f} MB, 행 {rows}")
+        if span:
+            print(f"  기록 범위 {_format_time(span[0])} ~ {_format_time(span[1])}")
+        return
+    if span is None:
+        print("[분석 저장소] 기록이 없습니다.")
+        return
+    start, end = _parse_time(args.start, span[0]), _parse_time(args.end, time.time())
+
+    t0 = time.perf_counter()
+    if args.command == 'report':
+        result = store.report(start, end, args.item)
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=1))
+        else:
+            print_report(result)
+            print(f"  (롤업 구간 {len(result['plan'])}개, {elapsed:.1f} ms)")
+        return
+    items = args.item or [None]
+    rows = [row for item in items for row in store.series(start, end, args.resolution, item)]
+    if args.json:
+        print(json.dumps([dict(zip(('bucket', 'item', 'status', 'frames', 'seconds'), r)) for r in rows],
+                         ensure_ascii=False))
+        return
+    for bucket, item, status, frames, seconds in sorted(rows):
+        print(f"{_format_time(bucket)}  {item:8s} {status:18s} {frames:8d}  {_format_duration(seconds)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+"""
+저전력 헤드리스 백그라운드 모드(창 없이 하루 종일 실행하는 용도).
+- 화면 표시(cv2.imshow/waitKey)와 랜드마크 그리기(find_pose(draw=False))를 하지 않습니다.
+- DutyCycleScheduler가 표본 추출 빈도를 정합니다.
+  · ACTIVE: 카메라 속도(또는 --active-hz)로 추론. 자세 상태가 바뀌거나(문제 시작 포함) 사람이 움직이면 이 상태가 됩니다.
+  · STABLE: 상태 변화와 움직임 없이 stable_seconds가 지나면 약 1초에 한 번만 추론합니다.
+  · ABSENT: 사람이 absent_seconds 동안 보이지 않으면 absent_interval초마다 한 번 확인만 합니다(카메라 장치는 그 사이 닫음).
+  추론하지 않는 동안에는 프레임을 읽지 않고 잠들어 CPU를 쓰지 않습니다.
+- 주기적으로 CPU 사용률과 대화형 모드(매 프레임 추론) 대비 절약량 추정치를 출력하고,
+  psutil이 있으면 배터리 잔량 변화도 함께 출력합니다.
+사용 예:
+   python background_service.py                       # 기본 카메라, 음성/콘솔 피드백
+   python background_service.py --no-voice --feedback-log posture.jsonl --report-interval 600
+   python background_service.py --rules rules.json --record today.plog
+   python background_service.py --analytics          # 표본마다 시계열 통계 저장소에 기록(analytics_store.py로 보고)
+"""
+import argparse
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+from feedback_dispatcher import FeedbackDispatcher, ConsoleSink, JsonlFileSink, WebhookSink, VoiceSink
+from main import PostureFeedback, analyze_items
+
+ACTIVE, STABLE, ABSENT = 'ACTIVE', 'STABLE', 'ABSENT'
+_MOTION_JOINTS = np.arange(0, 17)  # 얼굴, 어깨, 팔(움직임 판단용)
+
+
+class DutyCycleScheduler:
+    """
+    자세 상태와 움직임에 따라 다음 표본까지의 간격을 정하는 상태 기계.
+    - active_hz: ACTIVE 상태 최대 추론 빈도(None이면 카메라 속도)
+    - stable_interval: STABLE 상태 표본 간격(초)
+    - absent_interval: ABSENT 상태 확인 간격(초)
+    - stable_seconds: 상태 변화/움직임 없이 이 시간이 지나면 STABLE
+    - absent_seconds: 사람이 이 시간 동안 보이지 않으면 ABSENT
+    - motion_threshold: 직전 표본 대비 관절 평균 이동량(정규화 좌표)이 이 값을 넘으면 움직임으로 판단
+    """
+    def __init__(self, active_hz=None, stable_interval=1.0, absent_interval=5.0, stable_seconds=3.0,
+                 absent_seconds=2.0, motion_threshold=0.02, min_visibility=0.5, verbose=False):
+        self.active_interval = 1.0 / active_hz if active_hz else 0.0
+        self.stable_interval = stable_interval
+        self.absent_interval = absent_interval
+        self.stable_seconds = stable_seconds
+        self.absent_seconds = absent_seconds
+        self.motion_threshold = motion_threshold
+        self.min_visibility = min_visibility
+        self.verbose = verbose
+
+        self.state = ACTIVE
+        self._state_started = None
+        self._calm_since = None       # 마지막 상태 변화/움직임 시각
+        self._absent_since = None
+        self._last_points = None
+        self._last_statuses = None
+        self.state_seconds = {ACTIVE: 0.0, STABLE: 0.0, ABSENT: 0.0}
+        self.samples = {ACTIVE: 0, STABLE: 0, ABSENT: 0}
+        self.transitions = 0
+        self.last_motion = None
+
+    def interval(self):
+        """현재 상태의 다음 표본까지 간격(초). 0이면 바로 다음 프레임."""
+        if self.state == ABSENT:
+            return self.absent_interval
+        if self.state == STABLE:
+            return self.stable_interval
+        return self.active_interval
+
+    def _set_state(self, state, t):
+        if self._state_started is not None:
+            self.state_seconds[self.state] += t - self._state_started
+        self._state_started = t
+        if state != self.state:
+            if self.verbose:
+                print(f"[백그라운드] {self.state} → {state}")
+            self.state = state
+            self.transitions += 1
+
+    def close(self, t):
+        """실행을 마칠 때 현재 상태의 머문 시간을 t까지 확정합니다."""
+        if self._state_started is not None:
+            self._set_state(self.state, t)
+
+    def _motion(self, landmarks):
+        """직전 표본 대비 잘 보이는 관절의 평균 이동량(정규화 x, y). 비교할 수 없으면 None."""
+        data = np.asarray(landmarks)
+        points = data[_MOTION_JOINTS, :2].copy()
+        visible = data[_MOTION_JOINTS, 3] >= self.min_visibility if data.shape[1] > 3 else np.ones(len(points), bool)
+        previous, self._last_points = self._last_points, (points, visible)
+        if previous is None:
+            return None
+        both = visible & previous[1]
+        if not both.any():
+            return None
+        return float(np.abs(points[both] - previous[0][both]).mean())
+
+    def update(self, landmarks, items, t):
+        """
+        표본 하나의 결과로 상태를 갱신하고 새 상태를 반환합니다.
+        - landmarks: LandmarkFrame(미검출이면 bool이 False)
+        - items: [(항목, 상태, 문구)] 분석 결과
+        """
+        if self._state_started is None:
+            self._state_started = t
+        self.samples[self.state] += 1
+        if not landmarks:
+            self._last_points = None
+            self._last_statuses = None
+            if self._absent_since is None:
+                self._absent_since = t
+            if t - self._absent_since >= self.absent_seconds:
+                self._set_state(ABSENT, t)
+            elif self.state == STABLE:
+                self._set_state(ACTIVE, t)  # 자리를 떴는지 빨리 확인합니다.
+            else:
+                self._set_state(self.state, t)
+            return self.state
+
+        self._absent_since = None
+        statuses = {item: status for item, status, _ in items}
+        changed = statuses != self._last_statuses
+        self._last_statuses = statuses
+        self.last_motion = self._motion(landmarks)
+        moved = self.last_motion is not None and self.last_motion > self.motion_threshold
+        if self.state == ABSENT or changed or moved:
+            self._calm_since = t
+            self._set_state(ACTIVE, t)
+        elif self.state == ACTIVE and t - self._calm_since >= self.stable_seconds:
+            self._set_state(STABLE, t)
+        else:
+            self._set_state(self.state, t)
+        return self.state
+
+
+def battery_status():
+    """psutil로 배터리 잔량(%)과 충전기 연결 여부를 읽습니다. 알 수 없으면 None."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        battery = psutil.sensors_battery()
+    except Exception:
+        return None
+    if battery is None:
+        return None
+    return {'percent': float(battery.percent), 'plugged': bool(battery.power_plugged), 'time': time.time()}
+
+
+class BackgroundService:
+    """
+    헤드리스 저전력 분석 루프.
+    - source: 카메라 번호 또는 영상 파일(파일은 실제 시간에 맞추어 위치를 옮겨 카메라처럼 읽음)
+    - session: PostureFeedback(피드백 상태/전달)
+    - detector: PoseDetector(생략하면 생성)
+    - scheduler: DutyCycleScheduler(생략하면 기본값)
+    - rules: RuleEngine(생략하면 ergonomics_rules 분석 함수), recorder: SessionRecorder(선택)
+    - analytics: AnalyticsStore(선택). 표본 간격이 길어도 지속 시간은 다음 표본까지(최대 max_gap초)로 셉니다.
+    - watts_per_core: 절약 전력 추정에 쓰는 코어 하나를 100% 쓸 때의 전력(W, 가정값)
+    - settle_seconds: 카메라를 다시 연 뒤 자동 노출이 안정될 때까지 프레임을 버리는 시간(초)
+    run()은 stop()이 호출되거나 duration이 지나거나 영상 파일이 끝날 때까지 실행됩니다.
+    """
+    def __init__(self, source, session, detector=None, scheduler=None, rules=None, recorder=None,
+                 mirror=True, watts_per_core=3.0, analytics=None, settle_seconds=0.5):
+        if detector is None:
+            from pose_detector import PoseDetector
+            detector = PoseDetector()
+        self.source = source
+        self.session = session
+        self.detector = detector
+        self.scheduler = scheduler or DutyCycleScheduler()
+        self.rules = rules
+        self.recorder = recorder
+        self.analytics = analytics
+        self.mirror = mirror
+        self.watts_per_core = watts_per_core
+        self.settle_seconds = settle_seconds
+        self.is_file = isinstance(source, str) and '://' not in source and os.path.exists(source)
+        self._stop = threading.Event()
+        self._cap = None
+        self.camera_fps = 30.0
+
+        self.samples = 0
+        self.sample_cpu = {ACTIVE: 0.0, STABLE: 0.0, ABSENT: 0.0}  # 상태별 표본 처리 CPU 시간(초)
+        self.camera_opens = 0
+        self._started = None
+        self._cpu_started = None
+        self._battery_started = None
+
+    # ---- 카메라 ----
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            raise RuntimeError(f"입력을 열 수 없습니다: {self.source}")
+        self._cap = cap
+        if not self.is_file:
+            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # 지원하는 장치에서는 오래된 프레임이 쌓이지 않도록
+        self.camera_fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.camera_opens += 1
+
+    def _release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def _read(self, elapsed):
+        """현재 시점의 프레임을 읽습니다. 카메라는 버퍼에 쌓인 오래된 프레임을 버리고 읽습니다."""
+        opened = self._cap is None
+        if opened:
+            try:
+                self._open()
+            except RuntimeError as e:
+                if self.is_file:
+                    raise
+                # 다른 앱이 카메라를 쓰고 있거나 장치가 잠시 사라진 경우: 읽기 실패처럼 나중에 다시 엽니다.
+                print(f"[백그라운드] {e}")
+                return None
+        cap = self._cap
+        if self.is_file:
+            cap.set(cv2.CAP_PROP_POS_MSEC, elapsed * 1000.0)
+            success, img = cap.read()
+            return img if success else None
+        if opened:
+            # 막 연 웹캠의 첫 프레임들은 어둡거나 노출이 맞지 않아 포즈 검출이 실패하므로, 안정될 때까지 버립니다.
+            deadline = time.perf_counter() + self.settle_seconds
+            grabbed = 0
+            while grabbed < 3 or time.perf_counter() < deadline:
+                if not cap.grab():
+                    return None
+                grabbed += 1
+            success, img = cap.retrieve()
+            return img if success else None
+        # 버퍼에 있던 프레임은 즉시 반환되고 새 프레임은 한 프레임 간격을 기다리므로, 기다림이 생기면 최신 프레임입니다.
+        half_frame = 0.5 / self.camera_fps
+        for _ in range(5):
+            t0 = time.perf_counter()
+            if not cap.grab():
+                return None
+            if time.perf_counter() - t0 > half_frame:
+                break
+        success, img = cap.retrieve()
+        return img if success else None
+
+    # ---- 실행 ----
+    def _sample(self, t, elapsed):
+        """프레임 하나를 읽어 추론/분석하고 스케줄러 상태를 반환합니다. 입력이 끝나면 None."""
+        img = self._read(elapsed)
+        if img is None:
+            return None
+        if self.mirror:
+            img = cv2.flip(img, 1)
+        self.detector.find_pose(img, draw=False)
+        frame = self.detector.find_landmark_frame()
+        items = analyze_items(frame, self.session.min_visibility) if self.rules is None else self.rules.evaluate(frame)
+        self.session.update(items, t)
+        if self.recorder is not None:
+            self.recorder.append(frame)
+        if self.analytics is not None:
+            self.analytics.record(items, frame)
+        return self.scheduler.update(frame, items, t)
+
+    def run(self, duration=None, report_interval=300.0):
+        cv2.setNumThreads(1)  # 백그라운드에서는 OpenCV 작업 스레드를 깨우지 않습니다.
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._battery_started = battery_status()
+        next_due = self._started
+        next_report = self._started + report_interval
+        try:
+            while not self._stop.is_set():
+                now = time.perf_counter()
+                if duration is not None and now - self._started >= duration:
+                    break
+                if now >= next_report:
+                    print(self.format_report())
+                    next_report += report_interval
+                if now < next_due:
+                    self._stop.wait(min(next_due, next_report) - now)
+                    continue
+                state = self.scheduler.state
+                c0 = time.process_time()
+                new_state = self._sample(now, now - self._started)
+                self.sample_cpu[state] += time.process_time() - c0
+                if new_state is None:
+                    if self.is_file:
+                        break
+                    print("[백그라운드] 프레임을 읽지 못했습니다. 카메라를 다시 엽니다.")
+                    self._release()
+                    next_due = now + self.scheduler.absent_interval
+                    continue
+                self.samples += 1
+                interval = self.scheduler.interval()
+                if self.is_file:
+                    interval = max(interval, 1.0 / self.camera_fps)  # 파일은 원래 FPS보다 빨리 읽지 않습니다.
+                next_due = now + interval
+                if new_state == ABSENT and not self.is_file:
+                    self._release()  # 확인 사이에는 카메라 장치를 닫아 둡니다.
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.scheduler.close(time.perf_counter())
+            self._release()
+        print(self.format_report())
+
+    def stop(self):
+        self._stop.set()
+
+    # ---- 보고 ----
+    def report(self):
+        """
+        CPU 사용률과 대화형 모드 대비 절약 추정치.
+        대화형 모드 CPU는 ACTIVE 표본 하나의 평균 처리 CPU 시간 × 카메라 FPS로 추정합니다
+        (대화형 모드의 그리기/화면 표시 비용은 빠져 있으므로 절약량은 보수적인 값입니다).
+        """
+        wall = max(time.perf_counter() - self._started, 1e-9)
+        cpu = time.process_time() - self._cpu_started
+        sched = self.scheduler
+        active = sched.samples[ACTIVE]
+        if active >= 5:
+            per_frame = self.sample_cpu[ACTIVE] / active
+        else:
+            per_frame = sum(self.sample_cpu.values()) / max(self.samples, 1)
+        cores = os.cpu_count() or 1
+        interactive_pct = min(per_frame * self.camera_fps * 100.0, cores * 100.0)
+        cpu_pct = cpu / wall * 100.0
+        saved_pct = max(interactive_pct - cpu_pct, 0.0)
+        row = {
+            'seconds': wall,
+            'samples': self.samples,
+            'sample_hz': self.samples / wall,
+            'camera_fps': self.camera_fps,
+            'cpu_percent': cpu_pct,
+            'interactive_cpu_percent_est': interactive_pct,
+            'cpu_saved_ratio_est': saved_pct / interactive_pct if interactive_pct else 0.0,
+            'power_saved_watts_est': saved_pct / 100.0 * self.watts_per_core,
+            'state_seconds': dict(sched.state_seconds),
+            'state_samples': dict(sched.samples),
+            'camera_opens': self.camera_opens,
+        }
+        battery = battery_status()
+        if battery is not None:
+            row['battery_percent'] = battery['percent']
+            row['battery_plugged'] = battery['plugged']
+            start = self._battery_started
+            hours = (battery['time'] - start['time']) / 3600.0 if start else 0.0
+            if start and not start['plugged'] and not battery['plugged'] and hours > 0:
+                row['battery_drain_percent_per_hour'] = (start['percent'] - battery['percent']) / hours
+        return row
+
+    def format_report(self):
+        r = self.report()
+        states = ", ".join(f"{s} {r['state_seconds'][s] / 60:.1f}분/{r['state_samples'][s]}회"
+                           for s in (ACTIVE, STABLE, ABSENT))
+        text = (f"[백그라운드] {r['seconds'] / 60:.1f}분, 표본 {r['samples']}개({r['sample_hz']:.2f} Hz, "
+                f"카메라 {r['camera_fps']:.0f} fps) | {states}\n"
+                f"[백그라운드] CPU {r['cpu_percent']:.1f}% (대화형 모드 추정 {r['interactive_cpu_percent_est']:.1f}%, "
+                f"절약 약 {r['cpu_saved_ratio_est']:.0%}, 약 {r['power_saved_watts_est']:.1f} W 절약 추정"
+                f" - 코어당 {self.watts_per_core:g} W 가정)")
+        if 'battery_percent' in r:
+            text += f"\n[백그라운드] 배터리 {r['battery_percent']:.0f}%" + (" (충전 중)" if r['battery_plugged'] else "")
+            if 'battery_drain_percent_per_hour' in r:
+                text += f", 소모 {r['battery_drain_percent_per_hour']:.1f}%/시간"
+        return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="저전력 헤드리스 자세 분석(백그라운드 모드)")
+    parser.add_argument("--source", default='0', help="카메라 번호 또는 영상 파일(기본 0)")
+    parser.add_argument("--active-hz", type=float, default=None, help="ACTIVE 상태 최대 추론 빈도(기본: 카메라 속도)")
+    parser.add_argument("--stable-interval", type=float, default=1.0, help="안정 상태 표본 간격(초, 기본 1)")
+    parser.add_argument("--stable-seconds", type=float, default=3.0, help="변화 없이 이 시간이 지나면 안정 상태(초, 기본 3)")
+    parser.add_argument("--absent-interval", type=float, default=5.0, help="사람이 없을 때 확인 간격(초, 기본 5)")
+    parser.add_argument("--motion-threshold", type=float, default=0.02, help="움직임 판단 관절 평균 이동량(정규화 좌표)")
+    parser.add_argument("--settle-seconds", type=float, default=0.5,
+                        help="카메라를 다시 연 뒤 노출이 안정될 때까지 버리는 시간(초, 기본 0.5)")
+    parser.add_argument("--no-voice", action='store_true', help="음성 피드백을 끕니다")
+    parser.add_argument("--tts-backend", default='gtts', help="음성 합성 백엔드: gtts(온라인) 또는 pyttsx3(오프라인)")
+    parser.add_argument("--feedback-log", help="피드백 이벤트를 JSONL로 기록할 파일 경로")
+    parser.add_argument("--webhook", help="피드백 이벤트를 POST할 로컬 HTTP 주소")
+    parser.add_argument("--min-visibility", type=float, nargs='?', const=0.5, default=None,
+                        help="관절 visibility가 이 값보다 낮은 항목은 판단을 보류합니다(값 생략 시 0.5, 기본: 끔). --rules와 함께 쓰면 규칙 파일의 값 대신 적용합니다")
+    parser.add_argument("--rules", help="선언형 규칙 파일(예: rules.json)")
+    parser.add_argument("--record", help="랜드마크 세션 로그(.plog) 경로(표본마다 기록)")
+    parser.add_argument("--analytics", nargs='?', const='',
+                        help="시계열 통계 저장소(SQLite) 경로(경로 생략 시 기본 경로, analytics_store.py로 보고)")
+    parser.add_argument("--report-interval", type=float, default=300.0, help="절약 보고 주기(초, 기본 300)")
+    parser.add_argument("--watts-per-core", type=float, default=3.0, help="전력 절약 추정용 코어당 전력(W, 기본 3)")
+    parser.add_argument("--duration", type=float, default=None, help="실행 시간(초, 기본: 종료할 때까지)")
+    parser.add_argument("--verbose", action='store_true', help="상태 전환을 출력합니다")
+    args = parser.parse_args(argv)
+
+    sinks = [ConsoleSink()]
+    if not args.no_voice:
+        from feedback_handler import FeedbackHandler
+        sinks.append(VoiceSink(FeedbackHandler(tts_backend=args.tts_backend)))
+    if args.feedback_log:
+        sinks.append(JsonlFileSink(args.feedback_log))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    dispatcher = FeedbackDispatcher(sinks).start()
+
+    rules = None
+    if args.rules:
+        from rule_engine import RuleEngine
+        rules = RuleEngine(args.rules, min_visibility=args.min_visibility)
+    recorder = None
+    if args.record:
+        from session_log import SessionRecorder
+        recorder = SessionRecorder(args.record, min_interval=0.0)
+    analytics = None
+    if args.analytics is not None:
+        from analytics_store import AnalyticsStore, DEFAULT_DB_PATH
+        analytics = AnalyticsStore(args.analytics or DEFAULT_DB_PATH).start()
+    session = PostureFeedback(dispatcher, rules=rules, min_visibility=args.min_visibility)
+    scheduler = DutyCycleScheduler(active_hz=args.active_hz, stable_interval=args.stable_interval,
+                                   absent_interval=args.absent_interval, stable_seconds=args.stable_seconds,
+                                   motion_threshold=args.motion_threshold, verbose=args.verbose)
+    source = int(args.source) if args.source.isdigit() else args.source
+    service = BackgroundService(source, session, scheduler=scheduler, rules=rules, recorder=recorder,
+                                watts_per_core=args.watts_per_core, analytics=analytics,
+                                settle_seconds=args.settle_seconds)
+    try:
+        service.run(args.duration, args.report_interval)
+    finally:
+        dispatcher.stop()
+        if recorder is not None:
+            recorder.close()
+        if analytics is not None:
+            analytics.stop()
+            print(f"[분석 저장소] {analytics.path}: {analytics.stats()}")
+        print(f"[피드백] {dispatcher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+오프라인(헤드리스) 영상 일괄 분석 모드.
+- 입력한 영상 파일/디렉터리를 프레임 구간(chunk)으로 나누고, 여러 프로세스가 각자 PoseDetector를 소유하여 병렬 처리합니다.
+- 구간마다 프레임별 랜드마크와 ergonomics_rules 배치 분석 결과를 열(column) 단위 파일(.npz, 또는 pyarrow가 있으면 .parquet)로 저장합니다.
+- 작업 목록(manifest.json)을 출력 디렉터리에 기록하므로 중단된 실행을 다시 시작하면 완료된 구간은 건너뜁니다.
+사용 예:
+   python batch_analysis.py recordings/ -o results/ --workers 8
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+import cv2
+import numpy as np
+
+from ergonomics_rules import analyze_batch, MIN_VISIBILITY
+
+# Parquet 출력은 선택 사항입니다(pip install pyarrow).
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.m4v', '.webm')
+MANIFEST_NAME = "manifest.json"
+NUM_LANDMARKS = 33
+_MISSING = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)  # 미검출 프레임 자리 표시
+
+_worker_detector = None  # 작업 프로세스마다 하나씩 생성되는 PoseDetector
+
+
+def find_videos(inputs):
+    """입력 경로 목록에서 영상 파일을 찾아 정렬된 절대 경로 리스트로 반환합니다(디렉터리는 재귀 탐색)."""
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    if name.lower().endswith(VIDEO_EXTENSIONS):
+                        videos.append(os.path.abspath(os.path.join(root, name)))
+        elif os.path.isfile(path):
+            videos.append(os.path.abspath(path))
+        else:
+            print(f"[안내] 입력 경로를 찾을 수 없습니다: {path}")
+    return sorted(set(videos))
+
+
+def plan_chunks(video, chunk_frames):
+    """
+    영상을 chunk_frames 길이의 프레임 구간으로 나눕니다.
+    - 반환: [{'id', 'video', 'start', 'end', 'status'}] 리스트. 프레임 수를 알 수 없으면 end=None인 구간 하나.
+    """
+    cap = cv2.VideoCapture(video)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+    cap.release()
+
+    video_key = hashlib.sha1(video.encode('utf-8')).hexdigest()[:10]
+    stem = os.path.splitext(os.path.basename(video))[0]
+    bounds = [(s, min(s + chunk_frames, total)) for s in range(0, total, chunk_frames)] if total > 0 else [(0, None)]
+    return [
+        {'id': f"{stem}_{video_key}_{start:08d}", 'video': video, 'start': start, 'end': end, 'status': 'pending'}
+        for start, end in bounds
+    ]
+
+
+def load_manifest(out_dir):
+    """출력 디렉터리의 작업 목록을 읽습니다. 없으면 빈 작업 목록을 반환합니다."""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'version': 1, 'chunks': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    """작업 목록을 임시 파일에 쓴 뒤 교체하여, 중간에 중단되어도 파일이 깨지지 않도록 저장합니다."""
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _init_worker():
+    """작업 프로세스 초기화: 프로세스 전용 PoseDetector를 만들고 OpenCV 내부 스레드를 1개로 제한합니다."""
+    global _worker_detector
+    from pose_detector import PoseDetector
+    cv2.setNumThreads(1)
+    _worker_detector = PoseDetector()
+
+
+def _process_chunk(task):
+    """
+    한 구간의 프레임을 읽어 포즈 추정과 배치 분석을 수행하고 결과 파일을 씁니다(작업 프로세스에서 실행).
+    - 반환: (chunk_id, 출력 파일명, 처리 프레임 수, 오류 메시지 또는 None)
+    """
+    chunk, out_dir, fmt, mirror, min_visibility = task
+    try:
+        cap = cv2.VideoCapture(chunk['video'])
+        if not cap.isOpened():
+            return chunk['id'], None, 0, "영상을 열 수 없습니다"
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if chunk['start']:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, chunk['start'])
+
+        landmarks = []
+        frame_index = chunk['start']
+        while chunk['end'] is None or frame_index < chunk['end']:
+            success, img = cap.read()
+            if not success:
+                break
+            if mirror:
+                img = cv2.flip(img, 1)  # 실시간 모드와 같은 거울 좌표계로 분석합니다.
+            _worker_detector.find_pose(img, draw=False)
+            frame = _worker_detector.find_landmark_frame()
+            landmarks.append(frame.data.copy() if frame else _MISSING)
+            frame_index += 1
+        cap.release()
+
+        stacked = np.stack(landmarks) if landmarks else np.empty((0, NUM_LANDMARKS, 4), dtype=np.float32)
+        columns = _build_columns(chunk, stacked, fps, min_visibility)
+        filename = chunk['id'] + ('.parquet' if fmt == 'parquet' else '.npz')
+        write_columns(os.path.join(out_dir, filename), columns, fmt)
+        return chunk['id'], filename, len(landmarks), None
+    except Exception as e:
+        return chunk['id'], None, 0, str(e)
+
+
+def _build_columns(chunk, landmarks, fps, min_visibility=None):
+    """
+    프레임별 (N, 33, 4) 랜드마크 배열로 열 단위 결과(dict of arrays)를 만듭니다.
+    미검출 프레임의 상태 코드는 -1, 수치 열은 NaN입니다. min_visibility는 analyze_batch의 판단 보류 기준입니다.
+    """
+    n = len(landmarks)
+    detected = ~np.isnan(landmarks).any(axis=(1, 2))
+    frames = np.arange(chunk['start'], chunk['start'] + n, dtype=np.int64)
+    columns = {
+        'frame': frames,
+        'timestamp': frames / fps,
+        'detected': detected,
+        'landmarks': landmarks[:, :, :3],
+        'visibility': landmarks[:, :, 3],
+    }
+
+    result = analyze_batch(landmarks[detected], min_visibility=min_visibility) if detected.any() else None
+    for name in ('cva', 'left_elbow_angle', 'right_elbow_angle', 'shoulder_z_delta', 'nose_eye_diff'):
+        col = np.full(n, np.nan, dtype=np.float32)
+        if result is not None:
+            col[detected] = getattr(result, name)
+        columns[name] = col
+    for name in ('head_status', 'shoulder_status', 'elbow_status', 'eye_status'):
+        col = np.full(n, -1, dtype=np.int8)
+        if result is not None:
+            col[detected] = getattr(result, name)
+        columns[name] = col
+    return columns
+
+
+def write_columns(path, columns, fmt):
+    """열 단위 결과를 .npz 또는 .parquet로 저장합니다. parquet에서는 랜드마크를 lm{i}_{x|y|z|v} 열로 펼칩니다."""
+    tmp = path + ".part"
+    if fmt == 'parquet':
+        flat = {k: v for k, v in columns.items() if k not in ('landmarks', 'visibility')}
+        lms, vis = columns['landmarks'], columns['visibility']
+        for i in range(NUM_LANDMARKS):
+            for j, axis in enumerate('xyz'):
+                flat[f"lm{i}_{axis}"] = lms[:, i, j]
+            flat[f"lm{i}_v"] = vis[:, i]
+        pq.write_table(pa.table(flat), tmp)
+    else:
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, **columns)
+    os.replace(tmp, path)
+
+
+def load_results(out_dir):
+    """
+    출력 디렉터리의 .npz 결과를 작업 목록 순서대로 읽어 영상별로 이어 붙입니다.
+    - 반환: {video 경로: {열 이름: 배열}}
+    """
+    manifest = load_manifest(out_dir)
+    merged = {}
+    for chunk in manifest['chunks']:
+        if chunk.get('status') != 'done' or not chunk.get('output', '').endswith('.npz'):
+            continue
+        with np.load(os.path.join(out_dir, chunk['output'])) as data:
+            parts = merged.setdefault(chunk['video'], {})
+            for key in data.files:
+                parts.setdefault(key, []).append(data[key])
+    return {video: {k: np.concatenate(v) for k, v in parts.items()} for video, parts in merged.items()}
+
+
+def run_batch(inputs, out_dir, workers=None, chunk_frames=900, fmt='npz', mirror=True, min_visibility=None):
+    """
+    영상 일괄 분석을 실행합니다.
+    - inputs: 영상 파일/디렉터리 경로 리스트
+    - out_dir: 결과와 manifest.json을 저장할 디렉터리
+    - workers: 작업 프로세스 수(기본: CPU 코어 수)
+    - chunk_frames: 구간당 프레임 수
+    - fmt: 'npz' 또는 'parquet'
+    - min_visibility: 관절 visibility가 이보다 낮은 항목은 UNKNOWN(None이면 실시간 모드 기본값처럼 보류 안 함)
+    - 반환: 이번 실행에서 처리한 프레임 수
+    """
+    if fmt == 'parquet' and not PYARROW_AVAILABLE:
+        print("[안내] pyarrow가 설치되어 있지 않아 npz 형식으로 저장합니다. (pip install pyarrow)")
+        fmt = 'npz'
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    manifest = load_manifest(out_dir)
+    known = {c['video'] for c in manifest['chunks']}
+    for video in find_videos(inputs):
+        if video not in known:
+            manifest['chunks'].extend(plan_chunks(video, chunk_frames))
+    save_manifest(out_dir, manifest)
+
+    by_id = {c['id']: c for c in manifest['chunks']}
+    pending = [
+        c for c in manifest['chunks']
+        if not (c['status'] == 'done' and os.path.exists(os.path.join(out_dir, c.get('output', ''))))
+    ]
+    print(f"[일괄 분석] 전체 {len(manifest['chunks'])}개 구간 중 {len(pending)}개 처리, 작업 프로세스 {workers}개")
+    if not pending:
+        return 0
+
+    total_frames = 0
+    t0 = time.time()
+    tasks = [(c, out_dir, fmt, mirror, min_visibility) for c in pending]
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker) as pool:
+        for done, (chunk_id, output, n_frames, error) in enumerate(pool.imap_unordered(_process_chunk, tasks), 1):
+            chunk = by_id[chunk_id]
+            if error is None:
+                chunk.update(status='done', output=output, frames=n_frames)
+                total_frames += n_frames
+            else:
+                chunk.update(status='failed', error=error)
+                print(f"[일괄 분석] 구간 실패 {chunk_id}: {error}")
+            save_manifest(out_dir, manifest)
+            elapsed = time.time() - t0
+            print(f"[일괄 분석] {done}/{len(tasks)} 구간 완료, {total_frames / max(elapsed, 1e-6):.1f} fps")
+    return total_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화 영상 일괄 자세 분석 (헤드리스)")
+    parser.add_argument("inputs", nargs='+', help="영상 파일 또는 디렉터리")
+    parser.add_argument("-o", "--output", required=True, help="결과 저장 디렉터리 (manifest.json 포함)")
+    parser.add_argument("--workers", type=int, default=None, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--chunk-frames", type=int, default=900, help="구간당 프레임 수 (기본 900)")
+    parser.add_argument("--format", choices=('npz', 'parquet'), default='npz', help="출력 형식")
+    parser.add_argument("--no-mirror", action='store_true', help="프레임 좌우 반전 없이 분석")
+    parser.add_argument("--min-visibility", type=float, nargs='?', const=MIN_VISIBILITY, default=None,
+                        help=f"관절 visibility가 이 값보다 낮은 항목은 판단을 보류합니다(값 생략 시 {MIN_VISIBILITY}, 기본: 끔)")
+    args = parser.parse_args()
+    run_batch(args.inputs, args.output, workers=args.workers, chunk_frames=args.chunk_frames,
+              fmt=args.format, mirror=not args.no_mirror, min_visibility=args.min_visibility)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+성능 측정 스크립트 모음. 저장소 루트에서 모듈로 실행합니다.
+- 단계별 벤치마크(기준 파일 저장/비교): python -m benchmarks run -o baseline.json
+- 변경 전후 비교용 마이크로벤치마크: python -m benchmarks.bench_render, python -m benchmarks.bench_landmarks
+- 시작 시간(모듈 로드, 첫 프레임, 모델/오디오 준비): python -m benchmarks.bench_startup -o startup.json
+"""
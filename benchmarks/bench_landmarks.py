@@ -0,0 +1,136 @@
+"""
+랜드마크 표현 비교: 기존 방식(프레임마다 33개의 [x, y, z] 리스트 생성)과 LandmarkFrame(재사용 (33, 4) float32 버퍼).
+- 랜드마크 생성 단계와 분석(4개 analyze_* 함수)까지 포함한 단계의 프레임당 시간(µs)
+- tracemalloc 기준 프레임당 할당 블록 수와 바이트, 프레임 사이에 남는(보관되는) 바이트
+사용법: python -m benchmarks.bench_landmarks [--frames 5000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from ergonomics_rules import (
+    analyze_head_posture,
+    analyze_shoulder_posture,
+    analyze_elbow_posture,
+    analyze_eye_level,
+)
+from landmark_frame import LandmarkRing
+
+
+class _FakeLandmark:
+    """MediaPipe NormalizedLandmark와 같은 속성을 가진 가짜 랜드마크."""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z, visibility):
+        self.x, self.y, self.z, self.visibility = x, y, z, visibility
+
+
+def synthetic_results(n_frames, seed=0):
+    """
+    프레임별 pose_landmarks 목록. mediapipe가 있으면 실제 NormalizedLandmarkList(protobuf)를,
+    없으면 같은 속성을 가진 가짜 랜드마크 리스트를 만듭니다.
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(0.2, 0.8, (n_frames, 33, 5)).tolist()
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except Exception:
+        return [[_FakeLandmark(*v[:4]) for v in frame] for frame in values]
+    return [
+        landmark_pb2.NormalizedLandmarkList(landmark=[
+            landmark_pb2.NormalizedLandmark(x=x, y=y, z=z, visibility=vis, presence=pres)
+            for x, y, z, vis, pres in frame
+        ])
+        for frame in values
+    ]
+
+
+def _landmarks_of(result):
+    """protobuf 목록이면 .landmark 시퀀스, 아니면 그대로."""
+    return getattr(result, 'landmark', result)
+
+
+def _legacy_landmarks(result):
+    """변경 전 PoseDetector.find_landmarks 구현."""
+    landmark_list = []
+    for lm in _landmarks_of(result):
+        landmark_list.append([lm.x, lm.y, lm.z])
+    return landmark_list
+
+
+def _analyze(landmarks):
+    analyze_head_posture(landmarks)
+    analyze_shoulder_posture(landmarks)
+    analyze_elbow_posture(landmarks)
+    analyze_eye_level(landmarks)
+
+
+def _measure(step, results):
+    """step(lms)을 모든 프레임에 적용한 프레임당 시간(µs)과 할당 통계."""
+    t0 = time.perf_counter()
+    for lms in results:
+        step(lms)
+    per_frame_us = (time.perf_counter() - t0) * 1e6 / len(results)
+
+    sample = results[:min(len(results), 500)]
+    kept = []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for lms in sample:
+        kept.append(step(lms))  # 파이프라인처럼 결과를 다음 단계가 잡고 있는 상황
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = [d for d in after.compare_to(before, 'filename') if d.size_diff > 0]
+    return {
+        'us_per_frame': per_frame_us,
+        'retained_bytes_per_frame': sum(d.size_diff for d in diff) / len(sample),
+        'retained_blocks_per_frame': sum(d.count_diff for d in diff) / len(sample),
+    }
+
+
+def run(n_frames=5000):
+    """
+    두 방식을 측정합니다.
+    - 반환: {방식: {'us_per_frame', 'retained_bytes_per_frame', 'retained_blocks_per_frame'}}
+    """
+    results = synthetic_results(n_frames)
+    ring = LandmarkRing(8)
+
+    def frame_fill(result):
+        frame = ring.next()
+        if hasattr(result, 'SerializeToString'):
+            return frame.fill_from_proto(result)
+        return frame.fill(result)
+
+    def legacy_full(lms):
+        landmarks = _legacy_landmarks(lms)
+        _analyze(landmarks)
+        return landmarks
+
+    def frame_full(result):
+        frame = frame_fill(result)
+        _analyze(frame)
+        return frame
+
+    return {
+        'legacy_list': _measure(_legacy_landmarks, results),
+        'landmark_frame': _measure(frame_fill, results),
+        'legacy_list+analyze': _measure(legacy_full, results),
+        'landmark_frame+analyze': _measure(frame_full, results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="랜드마크 표현 할당/시간 비교")
+    parser.add_argument("--frames", type=int, default=5000, help="측정 프레임 수")
+    args = parser.parse_args()
+    for name, row in run(args.frames).items():
+        print(f"{name:24s} {row['us_per_frame']:8.1f} µs/frame  "
+              f"retained {row['retained_bytes_per_frame']:8.0f} B/frame  "
+              f"{row['retained_blocks_per_frame']:6.1f} blocks/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+오버레이 렌더링 마이크로벤치마크: 기존 방식(프레임 전체 BGR→RGB→PIL→BGR 변환 + 매 프레임 폰트 로드,
+mp_drawing.draw_landmarks)과 renderer 모듈(스프라이트 캐시 + ROI 블렌딩, 벡터화 스켈레톤)을 720p/1080p에서 비교합니다.
+사용법: python -m benchmarks.bench_render [--font 폰트경로] [--repeat 200]
+"""
+import argparse
+import glob
+import time
+
+import cv2
+import numpy as np
+
+import renderer
+from renderer import draw_text_multiline, draw_skeleton, PIL_AVAILABLE
+
+if PIL_AVAILABLE:
+    from PIL import ImageFont, ImageDraw, Image
+
+RESOLUTIONS = {'720p': (1280, 720), '1080p': (1920, 1080)}
+OVERLAY = [
+    ("거북목 주의: CVA 63° < 70°. 귀를 어깨선과 맞추세요.", (0, 0, 255)),
+    ("어깨가 말려 있습니다. 가슴을 펴고 어깨를 뒤로 젖히세요.", (0, 0, 255)),
+    ("팔꿈치 각도 조정: 왼쪽 120°. 80°~100° 유지하세요.", (0, 0, 255)),
+]
+
+
+def legacy_draw_text_multiline(img, lines, font_path, org=(10, 30), font_size=24, line_gap=6):
+    """변경 전 main.draw_text_multiline 구현(비교 기준)."""
+    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    pil_img = Image.fromarray(rgb)
+    draw = ImageDraw.Draw(pil_img)
+    try:
+        font = ImageFont.truetype(font_path, font_size)
+    except Exception:
+        font = ImageFont.load_default()
+    x, y = org
+    for text, bgr in lines:
+        draw.text((x, y), text, fill=(bgr[2], bgr[1], bgr[0]), font=font)
+        try:
+            bbox = draw.textbbox((0, 0), text, font=font)
+            h = bbox[3] - bbox[1]
+        except Exception:
+            h = font_size + 4
+        y += h + line_gap
+    img[:] = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+
+
+def _synthetic_landmarks(seed=0):
+    """화면 중앙에 앉은 자세와 비슷한 33개 정규화 랜드마크."""
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.normal(0.5, 0.15, (33, 2)), 0.05, 0.95)
+
+
+def _time_ms(func, frame, repeat):
+    """프레임 복사본에 func를 repeat번 적용한 평균 시간(ms)."""
+    imgs = [frame.copy() for _ in range(4)]
+    func(imgs[0])  # 캐시/워밍업
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        func(imgs[i % 4])
+    return (time.perf_counter() - t0) * 1000.0 / repeat
+
+
+def _find_font(path):
+    if path:
+        return path
+    if renderer.korean_font_path():
+        return renderer.korean_font_path()
+    found = glob.glob("/usr/share/fonts/**/*.tt[fc]", recursive=True)
+    return found[0] if found else None
+
+
+def run(font_path=None, repeat=200):
+    """
+    해상도별 렌더링 시간을 측정합니다.
+    - 반환: {해상도: {'text_legacy_ms', 'text_cached_ms', 'skeleton_legacy_ms', 'skeleton_vectorized_ms'}}
+    """
+    font_path = _find_font(font_path)
+    lms = _synthetic_landmarks()
+    results = {}
+    try:
+        import mediapipe as mp
+        from mediapipe.framework.formats import landmark_pb2
+        proto = landmark_pb2.NormalizedLandmarkList(
+            landmark=[landmark_pb2.NormalizedLandmark(x=x, y=y, visibility=1.0) for x, y in lms])
+        mp_draw = mp.solutions.drawing_utils
+        connections = mp.solutions.pose.POSE_CONNECTIONS
+    except Exception:
+        mp_draw = None
+
+    for name, (w, h) in RESOLUTIONS.items():
+        frame = np.random.default_rng(1).integers(0, 255, (h, w, 3), dtype=np.uint8)
+        row = {}
+        if PIL_AVAILABLE and font_path:
+            row['text_legacy_ms'] = _time_ms(
+                lambda img: legacy_draw_text_multiline(img, OVERLAY, font_path, font_size=40, line_gap=8), frame, repeat)
+            row['text_cached_ms'] = _time_ms(
+                lambda img: draw_text_multiline(img, OVERLAY, font_size=40, line_gap=8, font_path=font_path),
+                frame, repeat)
+        if mp_draw is not None:
+            row['skeleton_legacy_ms'] = _time_ms(lambda img: mp_draw.draw_landmarks(img, proto, connections),
+                                                 frame, repeat)
+        row['skeleton_vectorized_ms'] = _time_ms(lambda img: draw_skeleton(img, lms, visibility=np.ones(33)),
+                                                 frame, repeat)
+        results[name] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오버레이 렌더링 마이크로벤치마크")
+    parser.add_argument("--font", help="텍스트 렌더링에 사용할 폰트 경로(기본: 한글 폰트 자동 탐색)")
+    parser.add_argument("--repeat", type=int, default=200, help="측정 반복 횟수")
+    args = parser.parse_args()
+    for name, row in run(args.font, args.repeat).items():
+        parts = [f"{k}={v:.3f}" for k, v in row.items()]
+        if 'text_legacy_ms' in row:
+            parts.append(f"text x{row['text_legacy_ms'] / row['text_cached_ms']:.1f}")
+        if 'skeleton_legacy_ms' in row:
+            parts.append(f"skeleton x{row['skeleton_legacy_ms'] / row['skeleton_vectorized_ms']:.1f}")
+        print(f"{name}: " + ", ".join(parts))
+
+
+if __name__ == "__main__":
+    main()
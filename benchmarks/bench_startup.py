@@ -0,0 +1,144 @@
+"""
+시작 시간 측정: main 모듈 로드 시간과 실행 후 첫 프레임/모델 준비/오디오 준비까지 걸린 시간.
+- 매 회 새 파이썬 프로세스로 측정합니다(모듈 캐시가 없는 실제 시작과 같은 조건, 디스크 캐시는 따뜻한 상태).
+- 실행 측정은 창 없이(--no-window) 절차적 영상을 입력으로 main.py --startup-report를 돌려 출력 시각을 읽습니다.
+- 결과는 벤치마크 기준 파일과 같은 형식(stages.startup.*)이라 suite의 compare로 추적할 수 있습니다.
+사용법:
+   python -m benchmarks.bench_startup                       # 5회 측정, 느린 모듈 목록 출력
+   python -m benchmarks.bench_startup -n 10 -o startup.json
+   python -m benchmarks.bench_startup --compare startup.json
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import suite
+from benchmarks.fixtures import procedural_video
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_REPORT_RE = re.compile(r"^\[시작\] (\w+) (\d+) ms")
+_IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print((time.perf_counter() - t) * 1000.0)"
+
+
+def _env():
+    env = dict(os.environ, SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1', PYTHONUNBUFFERED='1')
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def measure_import():
+    """새 프로세스에서 import main에 걸린 시간(ms)."""
+    out = subprocess.run([sys.executable, "-c", _IMPORT_SNIPPET], cwd=ROOT, env=_env(),
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def import_offenders(top=10):
+    """-X importtime으로 누적 로드 시간이 큰 최상위 모듈 [(모듈, ms)]를 반환합니다."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, env=_env(),
+                         capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        if name.startswith('   ') and not name.startswith('     '):  # main이 직접 불러온 모듈(들여쓰기 한 단계)
+            rows.append((name.strip(), int(parts[1]) / 1000.0))
+    return sorted(rows, key=lambda r: -r[1])[:top]
+
+
+def measure_run(video, timeout=60.0):
+    """
+    main.py를 창 없이 실행해 [시작] 보고 줄의 시각을 모읍니다. 모델과 오디오가 준비되면 프로세스를 종료합니다.
+    - 반환: {'first_frame': ms, 'model_ready': ms, 'audio_ready': ms} (프로세스 안에서 잰 값, 인터프리터 시작 제외)
+            와 'process_first_frame'(프로세스 생성부터 첫 프레임 줄을 읽을 때까지의 바깥 시간)
+    """
+    cmd = [sys.executable, os.path.join(ROOT, "main.py"), "--no-window", "--startup-report", "--source", video]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=_env(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            text=True)
+    marks = {}
+    deadline = t0 + timeout
+    try:
+        for line in proc.stdout:
+            m = _REPORT_RE.match(line)
+            if m:
+                marks[m.group(1)] = float(m.group(2))
+                if m.group(1) == 'first_frame':
+                    marks['process_first_frame'] = (time.perf_counter() - t0) * 1000.0
+            if ('model_ready' in marks and 'audio_ready' in marks) or time.perf_counter() > deadline:
+                break
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(5.0)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return marks
+
+
+def _stage(samples):
+    samples = np.asarray(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+    return {'iterations': len(samples), 'items_per_call': 1, 'rounds': len(samples),
+            'mean_ms': float(samples.mean()), 'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+
+
+def run(runs=5, verbose=True):
+    """runs회 측정해 suite와 같은 형식의 결과 dict를 반환합니다."""
+    video = procedural_video(frames=1800)
+    samples = {'startup.import_main': []}
+    for i in range(runs):
+        samples['startup.import_main'].append(measure_import())
+        for name, ms in measure_run(video).items():
+            samples.setdefault('startup.' + name, []).append(ms)
+        if verbose:
+            print(f"[시작 시간] {i + 1}/{runs}회 측정 완료", flush=True)
+    report = {'schema': suite.SCHEMA_VERSION, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'environment': suite._environment(), 'stages': {}, 'skipped': {}}
+    for name in ('startup.import_main', 'startup.imported', 'startup.first_frame', 'startup.process_first_frame',
+                 'startup.model_ready', 'startup.audio_ready'):
+        if samples.get(name):
+            report['stages'][name] = _stage(samples[name])
+        else:
+            report['skipped'][name] = "보고 줄을 받지 못했습니다"
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시작 시간(모듈 로드, 첫 프레임, 모델/오디오 준비) 측정")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="측정 횟수(기본 5)")
+    parser.add_argument("-o", "--output", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--compare", help="이 기준 파일과 비교")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="허용 저하 비율(기본 0.15)")
+    parser.add_argument("--no-offenders", action='store_true', help="느린 모듈 목록을 출력하지 않습니다")
+    args = parser.parse_args(argv)
+
+    report = run(args.runs)
+    for name, row in report['stages'].items():
+        print(f"{name:28s} p50 {row['p50_ms']:8.1f}  p95 {row['p95_ms']:8.1f}  mean {row['mean_ms']:8.1f} ms")
+    for name, reason in report['skipped'].items():
+        print(f"{name:28s} 건너뜀: {reason}")
+    if not args.no_offenders:
+        print("[시작 시간] main이 직접 불러오는 모듈 중 느린 것(누적 ms):")
+        for name, ms in import_offenders():
+            print(f"  {name:28s} {ms:8.1f}")
+    if args.output:
+        suite.save(report, args.output)
+        print(f"[시작 시간] 결과 저장: {args.output}")
+    if args.compare:
+        metrics = ('p50_ms', 'p95_ms')
+        regressions, rows = suite.compare(suite.load(args.compare), report, args.tolerance, metrics)
+        suite.print_comparison(regressions, rows, args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
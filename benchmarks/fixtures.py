@@ -0,0 +1,129 @@
+"""
+벤치마크용 합성 입력(카메라/네트워크 없이 재현 가능).
+- synthetic_landmarks: 노트북 앞에 앉은 자세를 본뜬 (N, 33, 4) 랜드마크. 자세 항목별 분기가 고르게 나오도록 흔들어 만듭니다.
+- procedural_video: 움직이는 사람 모양 도형을 그린 작은 MJPG 영상을 만들어 캐시 디렉터리에 저장합니다.
+- SilentBackend: 네트워크 없이 짧은 무음 wav를 돌려주는 TTS 백엔드.
+"""
+import io
+import os
+import tempfile
+import wave
+
+import cv2
+import numpy as np
+
+from landmark_frame import NUM_LANDMARKS
+
+FIXTURE_DIR = os.path.join(tempfile.gettempdir(), "ergonomic_posture_bench")
+
+# 앉은 자세 기본 좌표(정규화 x, y): 얼굴, 상체, 팔은 잘 보이고 하체는 화면 아래쪽(낮은 visibility)
+_TEMPLATE_XY = np.array([
+    (0.50, 0.33),                                                    # nose
+    (0.48, 0.30), (0.47, 0.30), (0.46, 0.30),                        # left eye inner/eye/outer
+    (0.52, 0.30), (0.53, 0.30), (0.54, 0.30),                        # right eye inner/eye/outer
+    (0.44, 0.32), (0.56, 0.32),                                      # ears
+    (0.48, 0.37), (0.52, 0.37),                                      # mouth
+    (0.38, 0.52), (0.62, 0.52),                                      # shoulders
+    (0.33, 0.72), (0.67, 0.72),                                      # elbows
+    (0.42, 0.80), (0.58, 0.80),                                      # wrists
+    (0.44, 0.82), (0.56, 0.82), (0.45, 0.81), (0.55, 0.81), (0.44, 0.80), (0.56, 0.80),  # hands
+    (0.42, 0.95), (0.58, 0.95),                                      # hips
+    (0.41, 1.15), (0.59, 1.15), (0.41, 1.35), (0.59, 1.35),          # knees, ankles
+    (0.40, 1.38), (0.60, 1.38), (0.42, 1.40), (0.58, 1.40),          # heels, feet
+], dtype=np.float32)
+_LOWER_BODY = slice(25, NUM_LANDMARKS)
+
+
+def synthetic_landmarks(n_frames, seed=0, jitter=0.03):
+    """
+    (n_frames, 33, 4) float32 [x, y, z, visibility] 랜드마크.
+    프레임마다 전체 자세 흔들림(jitter)과 관절별 잡음을 더해 양호/문제/판단 보류 상태가 섞이도록 합니다.
+    """
+    rng = np.random.default_rng(seed)
+    out = np.empty((n_frames, NUM_LANDMARKS, 4), dtype=np.float32)
+    out[:, :, :2] = _TEMPLATE_XY
+    out[:, :, :2] += rng.normal(0, jitter, (n_frames, 1, 2))              # 자세 전체 이동
+    out[:, :, :2] += rng.normal(0, jitter / 2, (n_frames, NUM_LANDMARKS, 2))
+    out[:, :, 2] = rng.normal(-0.2, 0.15, (n_frames, NUM_LANDMARKS))
+    out[:, :, 3] = rng.uniform(0.6, 1.0, (n_frames, NUM_LANDMARKS))
+    out[:, _LOWER_BODY, 3] = rng.uniform(0.0, 0.3, (n_frames, NUM_LANDMARKS - 25))
+    # 일부 프레임은 한쪽 팔이 가려진 상태
+    hidden = rng.random(n_frames) < 0.1
+    out[hidden, 13:17:2, 3] = 0.1
+    return out
+
+
+def _draw_figure(img, t):
+    """t(초)에 따라 앞뒤로 기울고 팔을 움직이는 사람 모양 도형을 그립니다."""
+    h, w = img.shape[:2]
+    sway = 0.03 * np.sin(2 * np.pi * 0.3 * t)
+    arm = 0.04 * np.sin(2 * np.pi * 0.7 * t)
+    pts = _TEMPLATE_XY.copy()
+    pts[:11] += (sway, abs(sway))
+    pts[13:23, 1] += arm
+    px = (pts * (w, h)).astype(np.int32)
+    cv2.rectangle(img, tuple(px[11] + (0, -5)), tuple(px[24]), (60, 90, 160), -1)      # 상체
+    cv2.circle(img, tuple(px[0]), int(0.09 * w), (150, 180, 220), -1)                  # 머리
+    for a, b in ((11, 13), (13, 15), (12, 14), (14, 16)):
+        cv2.line(img, tuple(px[a]), tuple(px[b]), (60, 90, 160), int(0.03 * w))        # 팔
+    for i in (2, 5):
+        cv2.circle(img, tuple(px[i]), 4, (30, 30, 30), -1)                              # 눈
+
+
+def procedural_video(path=None, frames=90, size=(640, 480), fps=30.0, seed=0):
+    """
+    움직이는 도형 영상을 만들어 경로를 반환합니다(이미 있으면 재사용).
+    배경에는 고정 잡음 텍스처를 깔아 압축/디코딩 비용이 실제 영상과 비슷하도록 합니다.
+    """
+    if path is None:
+        path = os.path.join(FIXTURE_DIR, f"figure_{size[0]}x{size[1]}_{frames}.avi")
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    w, h = size
+    background = np.random.default_rng(seed).integers(90, 140, (h, w, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (7, 7), 0)
+    tmp = path + ".part.avi"
+    writer = cv2.VideoWriter(tmp, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+    for i in range(frames):
+        img = background.copy()
+        _draw_figure(img, i / fps)
+        writer.write(img)
+    writer.release()
+    os.replace(tmp, path)
+    return path
+
+
+def load_frames(path, limit=None):
+    """영상의 프레임을 메모리로 모두 읽습니다(디코딩 비용을 측정에서 분리하기 위함)."""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while limit is None or len(frames) < limit:
+        success, img = cap.read()
+        if not success:
+            break
+        frames.append(img)
+    cap.release()
+    return frames
+
+
+def _silent_wav(seconds=0.05, rate=16000):
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b'\0\0' * int(seconds * rate))
+    return buf.getvalue()
+
+
+class SilentBackend:
+    """네트워크/음성 엔진 없이 짧은 무음 wav를 돌려주는 TTS 백엔드(벤치마크 전용)."""
+    name = 'silent'
+    ext = 'wav'
+
+    def __init__(self):
+        self._data = _silent_wav()
+
+    def synthesize(self, text, lang):
+        return self._data
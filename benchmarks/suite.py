@@ -0,0 +1,449 @@
+"""
+파이프라인 단계별 성능 벤치마크 모음(카메라/네트워크 없이 CPU에서 재현 가능).
+- 단계마다 처리량(회/초), p50/p95/p99 지연(ms), tracemalloc 기준 최대 추가 메모리(KB)를 측정합니다.
+- 입력은 benchmarks.fixtures의 합성 랜드마크와 절차적으로 생성한 영상입니다(난수 시드 고정).
+- 결과는 JSON 기준 파일로 저장하고, compare 명령으로 허용 오차를 넘는 성능 저하를 찾습니다(저하가 있으면 종료 코드 1).
+사용법:
+   python -m benchmarks run -o baseline.json            # 전체 측정 후 저장
+   python -m benchmarks run --stage rules --quick       # 이름에 'rules'가 들어간 단계만 짧게
+   python -m benchmarks run -o current.json --compare baseline.json
+   python -m benchmarks compare baseline.json current.json --tolerance 0.15
+   python -m benchmarks list
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import queue
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.fixtures import synthetic_landmarks, procedural_video, load_frames, SilentBackend
+
+SCHEMA_VERSION = 1
+
+# 비교할 지표와 방향(+1: 클수록 나쁨, -1: 작을수록 나쁨)
+METRIC_DIRECTIONS = {
+    'p50_ms': 1,
+    'p95_ms': 1,
+    'p99_ms': 1,
+    'throughput_per_s': -1,
+    'peak_kb': 1,
+}
+DEFAULT_COMPARE_METRICS = ('p50_ms', 'p95_ms', 'throughput_per_s', 'peak_kb')
+PEAK_KB_SLACK = 64.0  # 작은 메모리 변화(할당기 잡음)는 무시합니다.
+
+
+class SkipStage(Exception):
+    """선택 의존성(mediapipe, pygame, 폰트 등)이 없어 단계를 건너뛸 때 사용합니다."""
+
+
+# 이름 → (준비 함수, 기본 반복 횟수, 호출당 처리 항목 수)
+STAGES = {}
+
+
+def stage(name, iterations, items=1):
+    """
+    벤치마크 단계 등록 데코레이터. 준비 함수는 step(i)를 반환하며, step은 한 번 호출이 측정 단위입니다.
+    준비 함수가 (step, cleanup) 튜플을 반환하면 측정 후 cleanup()을 호출합니다.
+    """
+    def register(setup):
+        STAGES[name] = (setup, iterations, items)
+        return setup
+    return register
+
+
+# ---- 단계 정의 ----
+@stage('landmarks.fill', 5000)
+def _landmarks_fill():
+    from benchmarks.bench_landmarks import synthetic_results
+    from landmark_frame import LandmarkRing
+    results = synthetic_results(256)
+    ring = LandmarkRing(8)
+    if hasattr(results[0], 'SerializeToString'):
+        return lambda i: ring.next().fill_from_proto(results[i % 256])
+    return lambda i: ring.next().fill(results[i % 256])
+
+
+def _frames(n, seed=0):
+    from landmark_frame import LandmarkFrame
+    frames = []
+    for data in synthetic_landmarks(n, seed):
+        frame = LandmarkFrame()
+        frame.data[:] = data
+        frame.valid = True
+        frames.append(frame)
+    return frames
+
+
+@stage('rules.analyze_frame', 5000)
+def _rules_analyze_frame():
+    from main import analyze_posture
+    frames = _frames(256)
+    return lambda i: analyze_posture(frames[i % 256])
+
+
+@stage('rules.engine_frame', 5000)
+def _rules_engine_frame():
+    from rule_engine import RuleEngine
+    engine = RuleEngine(reload_interval=float('inf'))
+    frames = _frames(256)
+    return lambda i: engine.evaluate(frames[i % 256])
+
+
+@stage('rules.analyze_batch', 50, items=1000)
+def _rules_analyze_batch():
+    from ergonomics_rules import analyze_batch, MIN_VISIBILITY
+    landmarks = synthetic_landmarks(1000)
+    return lambda i: analyze_batch(landmarks, min_visibility=MIN_VISIBILITY)
+
+
+@stage('filter.smoother', 5000)
+def _filter_smoother():
+    from landmark_filter import LandmarkSmoother
+    frames = _frames(256)
+    smoother = LandmarkSmoother()
+    # 3프레임에 한 번 새 추론 결과(나머지는 예측)인 10 Hz 추론/30 fps 표시 상황
+    for k, frame in enumerate(frames):
+        frame.timestamp = k
+    return lambda i: smoother.process(frames[(i // 3) % 256], i / 30.0)
+
+
+def _render_frame():
+    return np.random.default_rng(1).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+
+
+@stage('render.text_720p', 500)
+def _render_text():
+    from benchmarks.bench_render import OVERLAY, _find_font
+    from renderer import draw_text_multiline, PIL_AVAILABLE
+    font_path = _find_font(None)
+    if not (PIL_AVAILABLE and font_path):
+        raise SkipStage("Pillow 또는 폰트가 없습니다")
+    img = _render_frame()
+    return lambda i: draw_text_multiline(img, OVERLAY, font_size=40, line_gap=8, font_path=font_path)
+
+
+@stage('render.skeleton_720p', 2000)
+def _render_skeleton():
+    from renderer import draw_skeleton
+    img = _render_frame()
+    landmarks = synthetic_landmarks(64)
+    return lambda i: draw_skeleton(img, landmarks[i % 64], visibility=landmarks[i % 64, :, 3])
+
+
+@stage('video.decode', 300)
+def _video_decode():
+    path = procedural_video()
+    state = {'cap': cv2.VideoCapture(path)}
+
+    def step(i):
+        success, _ = state['cap'].read()
+        if not success:
+            state['cap'].release()
+            state['cap'] = cv2.VideoCapture(path)
+            state['cap'].read()
+
+    return step, lambda: state['cap'].release()
+
+
+def _detector():
+    try:
+        from pose_detector import PoseDetector
+        return PoseDetector()
+    except Exception as e:
+        raise SkipStage(f"mediapipe를 사용할 수 없습니다: {e}")
+
+
+@stage('detector.find_pose', 60)
+def _detector_find_pose():
+    frames = load_frames(procedural_video())
+    detector = _detector()
+    return (lambda i: detector.find_pose(frames[i % len(frames)], draw=False)), detector.pose.close
+
+
+@stage('detector.adaptive', 60)
+def _detector_adaptive():
+    from adaptive_scheduler import AdaptiveInferenceScheduler
+    frames = load_frames(procedural_video())
+    detector = _detector()
+    scheduler = AdaptiveInferenceScheduler(detector, budget_ms=40.0)
+    return (lambda i: scheduler.find_pose(frames[i % len(frames)], draw=False)), lambda: detector.pose.close()
+
+
+_MESSAGES = [
+    "거북목 주의: CVA {a}° < 70°. 귀를 어깨선과 맞추세요.",
+    "팔꿈치 각도 조정: 왼쪽 {a}°. 80°~100° 유지하세요.",
+    "어깨가 말려 있습니다. 가슴을 펴고 어깨를 뒤로 젖히세요.",
+]
+
+
+def _message(i):
+    return _MESSAGES[i % len(_MESSAGES)].format(a=40 + i % 60)
+
+
+@stage('feedback.tts_clips', 5000)
+def _feedback_tts_clips():
+    from tts_cache import TTSAudioCache
+    cache = TTSAudioCache(SilentBackend(), cache_dir=None)
+    for i in range(180):  # 캐시 적중 경로를 측정합니다.
+        cache.get_clips(_message(i))
+    return lambda i: cache.get_clips(_message(i))
+
+
+@stage('feedback.voice', 2000)
+def _feedback_voice():
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    try:
+        from feedback_handler import FeedbackHandler
+        from tts_cache import TTSAudioCache
+        handler = FeedbackHandler(tts_cache=TTSAudioCache(SilentBackend(), cache_dir=None), prewarm=False)
+    except Exception as e:
+        raise SkipStage(f"pygame 오디오를 사용할 수 없습니다: {e}")
+    if not handler.wait_ready(10.0):
+        raise SkipStage(f"pygame 오디오를 사용할 수 없습니다: {handler.audio_error}")
+    for i in range(180):
+        handler.tts_cache.get_clips(_message(i))
+    handler.feedback_cooldown = -1
+    # 재생 스레드는 원래 대기열을 기다리도록 두고, 측정용 대기열에서 바로 꺼내 실제 재생 없이 전달 경로만 측정합니다.
+    handler._play_queue = queue.Queue()
+
+    def step(i):
+        handler.provide_voice_feedback(_message(i))
+        handler._play_queue.get_nowait()
+
+    return step
+
+
+class _NullSink:
+    name = 'null'
+
+    def handle(self, event):
+        pass
+
+
+@stage('feedback.dispatch', 5000)
+def _feedback_dispatch():
+    from feedback_dispatcher import FeedbackDispatcher, FeedbackEvent
+    dispatcher = FeedbackDispatcher([_NullSink()], max_pending=64, coalesce_window=0.0).start()
+    return (lambda i: dispatcher.dispatch(FeedbackEvent(f"k{i % 64}", _message(i)))), dispatcher.stop
+
+
+@stage('analytics.record', 5000)
+def _analytics_record():
+    import shutil
+    import tempfile
+    from analytics_store import AnalyticsStore
+    from main import analyze_items
+    frames = _frames(256)
+    items = [analyze_items(frame) for frame in frames]
+    directory = tempfile.mkdtemp(prefix="bench_analytics_")
+    store = AnalyticsStore(os.path.join(directory, "analytics.db"), max_pending=1 << 20).start()
+    t0 = time.time()
+
+    def cleanup():
+        store.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # 프레임 루프가 부담하는 비용(대기열에 넣기)만 측정합니다. 쓰기는 작업 스레드에서 일어납니다.
+    return (lambda i: store.record(items[i % 256], frames[i % 256], t0 + i / 30.0)), cleanup
+
+
+# ---- 측정 ----
+def measure(step, iterations, items=1, warmup=None, rounds=5, memory_iterations=200):
+    """
+    step(i)를 iterations번 호출해 지연 분포와 처리량을 재고, 별도 반복에서 tracemalloc 최대 추가 메모리를 잽니다.
+    - 반복을 rounds개 구간으로 나누어 구간별 처리량의 중앙값을 보고합니다(일시적인 CPU 경합에 덜 민감).
+    - 지연 백분위는 전체 호출 기준입니다.
+    (tracemalloc은 시간 측정을 왜곡하므로 두 측정을 분리합니다)
+    """
+    warmup = max(1, iterations // 10) if warmup is None else warmup
+    for i in range(warmup):
+        step(i)
+
+    samples = np.empty(iterations, dtype=np.float64)
+    bounds = np.linspace(0, iterations, min(rounds, iterations) + 1).astype(int)
+    throughputs = []
+    clock = time.perf_counter_ns
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        gc.collect()
+        started = clock()
+        for i in range(start, end):
+            t0 = clock()
+            step(i)
+            samples[i] = clock() - t0
+        throughputs.append((end - start) / max((clock() - started) / 1e9, 1e-9))
+    throughput = float(np.median(throughputs))
+    samples /= 1e6
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for i in range(min(iterations, memory_iterations)):
+        step(i)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+    return {
+        'iterations': iterations,
+        'items_per_call': items,
+        'rounds': len(throughputs),
+        'throughput_per_s': throughput,
+        'items_per_s': throughput * items,
+        'mean_ms': float(samples.mean()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'peak_kb': max(peak, 0) / 1024.0,
+    }
+
+
+def _environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'cv2_threads': cv2.getNumThreads(),
+    }
+
+
+def run(patterns=None, scale=1.0, threads=1, verbose=True):
+    """
+    선택한 단계를 측정해 결과 dict를 반환합니다.
+    - patterns: 단계 이름에 포함되어야 하는 문자열 리스트(None이면 전체)
+    - scale: 반복 횟수 배율(--quick은 0.2)
+    - threads: OpenCV 내부 스레드 수(재현성을 위해 기본 1)
+    """
+    cv2.setNumThreads(threads)
+    report = {'schema': SCHEMA_VERSION, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'environment': _environment(), 'stages': {}, 'skipped': {}}
+    for name, (setup, iterations, items) in STAGES.items():
+        if patterns and not any(p in name for p in patterns):
+            continue
+        try:
+            prepared = setup()
+        except SkipStage as e:
+            report['skipped'][name] = str(e)
+            if verbose:
+                print(f"{name:24s} 건너뜀: {e}")
+            continue
+        step, cleanup = prepared if isinstance(prepared, tuple) else (prepared, None)
+        try:
+            result = measure(step, max(int(iterations * scale), 10), items)
+        finally:
+            if cleanup is not None:
+                cleanup()
+        report['stages'][name] = result
+        if verbose:
+            print(format_result(name, result))
+    return report
+
+
+def format_result(name, r):
+    return (f"{name:24s} {r['throughput_per_s']:10.1f}/s  p50 {r['p50_ms']:8.3f}  p95 {r['p95_ms']:8.3f}  "
+            f"p99 {r['p99_ms']:8.3f} ms  peak {r['peak_kb']:8.1f} KB")
+
+
+def save(report, path):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(baseline, current, tolerance=0.15, metrics=DEFAULT_COMPARE_METRICS):
+    """
+    두 결과를 비교합니다. 지표가 기준 대비 tolerance(비율)보다 나빠지면 저하로 판단합니다.
+    - 반환: [(단계, 지표, 기준값, 현재값, 변화율)] 저하 목록과 전체 비교 행 목록
+    """
+    regressions, rows = [], []
+    for name, base in baseline.get('stages', {}).items():
+        cur = current.get('stages', {}).get(name)
+        if cur is None:
+            continue
+        for metric in metrics:
+            if metric not in base or metric not in cur:
+                continue
+            b, c = base[metric], cur[metric]
+            change = (c - b) / b if b else 0.0
+            worse = change * METRIC_DIRECTIONS[metric] > tolerance
+            if metric == 'peak_kb' and c - b <= PEAK_KB_SLACK:
+                worse = False
+            row = (name, metric, b, c, change)
+            rows.append(row + (worse,))
+            if worse:
+                regressions.append(row)
+    return regressions, rows
+
+
+def print_comparison(regressions, rows, tolerance):
+    for name, metric, b, c, change, worse in rows:
+        mark = "저하" if worse else ""
+        print(f"{name:24s} {metric:17s} {b:12.3f} -> {c:12.3f} ({change:+7.1%}) {mark}")
+    if regressions:
+        print(f"[벤치마크] 허용 오차 {tolerance:.0%}를 넘는 저하 {len(regressions)}건")
+    else:
+        print(f"[벤치마크] 허용 오차 {tolerance:.0%} 안에서 저하 없음")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="파이프라인 단계별 성능 벤치마크")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_run = sub.add_parser('run', help="벤치마크 실행")
+    p_run.add_argument("--stage", action='append', help="이름에 이 문자열이 들어간 단계만 실행(여러 번 지정 가능)")
+    p_run.add_argument("--quick", action='store_true', help="반복 횟수를 1/5로 줄여 빠르게 실행")
+    p_run.add_argument("--threads", type=int, default=1, help="OpenCV 내부 스레드 수(기본 1)")
+    p_run.add_argument("-o", "--output", help="결과를 저장할 JSON 경로")
+    p_run.add_argument("--compare", help="이 기준 파일과 비교")
+    p_run.add_argument("--tolerance", type=float, default=0.15, help="허용 저하 비율(기본 0.15)")
+
+    p_cmp = sub.add_parser('compare', help="두 결과 파일 비교")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--tolerance", type=float, default=0.15, help="허용 저하 비율(기본 0.15)")
+    p_cmp.add_argument("--metrics", default=",".join(DEFAULT_COMPARE_METRICS),
+                       help=f"비교할 지표(쉼표 구분, 사용 가능: {', '.join(METRIC_DIRECTIONS)})")
+
+    sub.add_parser('list', help="단계 목록")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name, (_, iterations, items) in STAGES.items():
+            print(f"{name:24s} 반복 {iterations}" + (f", 호출당 {items}개" if items > 1 else ""))
+        return 0
+
+    if args.command == 'compare':
+        metrics = tuple(m.strip() for m in args.metrics.split(',') if m.strip())
+        regressions, rows = compare(load(args.baseline), load(args.current), args.tolerance, metrics)
+        print_comparison(regressions, rows, args.tolerance)
+        return 1 if regressions else 0
+
+    report = run(args.stage, scale=0.2 if args.quick else 1.0, threads=args.threads)
+    if args.output:
+        save(report, args.output)
+        print(f"[벤치마크] 결과 저장: {args.output}")
+    if args.compare:
+        regressions, rows = compare(load(args.compare), report, args.tolerance)
+        print_comparison(regressions, rows, args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,28 @@ ELBOW_MIN_DEG = 80         # 팔꿈치 권장 범위 하한
 ELBOW_MAX_DEG = 100        # 팔꿈치 권장 범위 상한
 EYE_DOWN_NOSE_DIFF = 0.04  # 코와 눈 y차이가 이 값보다 크면 "고개 숙임"으로 판단(정규화 좌표)
 SLUMP_Z_THRESHOLD = -0.25  # 라운드 숄더 z차 임계값(환경에 따라 조정)
+MIN_VISIBILITY = 0.5       # 관절 visibility가 이 값보다 낮으면 해당 항목 판단을 보류(UNKNOWN)
+
+# 상태 코드: 배치 분석(analyze_batch)에서 문자열 대신 정수 배열로 상태를 다룹니다.
+# UNKNOWN은 필요한 관절이 잘 보이지 않아 판단을 보류한 상태로, 자세 문제로 취급하지 않습니다.
+STATUS_NAMES = ('GOOD', 'FORWARD_HEAD', 'SLUMPED', 'ELBOW_ANGLE_ISSUE', 'LOOKING_DOWN', 'UNKNOWN')
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+GOOD, FORWARD_HEAD, SLUMPED, ELBOW_ANGLE_ISSUE, LOOKING_DOWN, UNKNOWN = range(len(STATUS_NAMES))
+
+
+def is_issue(status):
+    """상태(이름)가 사용자에게 알릴 자세 문제인지 여부. 'GOOD'과 'UNKNOWN'은 문제가 아닙니다."""
+    return status not in ('GOOD', 'UNKNOWN')
+
+
+def _hidden(landmarks, indices, min_visibility):
+    """
+    min_visibility가 주어지고 랜드마크에 visibility(4번째 값)가 있을 때,
+    지정한 관절 중 하나라도 임계값보다 낮으면 True를 반환합니다.
+    """
+    if min_visibility is None:
+        return False
+    return any(len(landmarks[i]) > 3 and landmarks[i][3] < min_visibility for i in indices)
 
 
 def calculate_angle(a, b, c):
@@ -36,17 +58,68 @@ def calculate_angle(a, b, c):
     return angle
 
 
-def analyze_head_posture(landmarks):
+# ---- 메시지 포맷터 (프레임 단위 분석과 배치 분석이 같은 문구를 사용하도록 공유) ----
+def head_message(status, cva, cva_min=None):
+    """머리/목 상태 코드와 CVA 값으로 안내 문구를 만듭니다."""
+    if status == UNKNOWN:
+        return "목 자세 판단 보류: 귀/어깨가 잘 보이지 않습니다."
+    if status == FORWARD_HEAD:
+        cva_min = CVA_MIN_DEG if cva_min is None else cva_min
+        return f"거북목 주의: CVA {int(cva)}° < {cva_min}°. 귀를 어깨선과 맞추세요."
+    return f"목 자세 양호: CVA {int(cva)}°"
+
+
+def shoulder_message(status):
+    """어깨 상태 코드로 안내 문구를 만듭니다."""
+    if status == UNKNOWN:
+        return "어깨 자세 판단 보류: 어깨/엉덩이가 잘 보이지 않습니다."
+    if status == SLUMPED:
+        return "어깨가 말려 있습니다. 가슴을 펴고 어깨를 뒤로 젖히세요."
+    return "어깨 자세 양호"
+
+
+def elbow_message(status, left_angle, right_angle, ok_left, ok_right, elbow_min=None, elbow_max=None):
+    """팔꿈치 상태 코드와 좌/우 각도로 안내 문구를 만듭니다."""
+    if status == UNKNOWN:
+        return "팔꿈치 각도 판단 보류: 팔이 잘 보이지 않습니다."
+    if status == GOOD:
+        return f"팔꿈치 각도 양호: L {int(left_angle)}°, R {int(right_angle)}°"
+
+    # 어떤 쪽이든 벗어난 경우 메시지 생성
+    elbow_min = ELBOW_MIN_DEG if elbow_min is None else elbow_min
+    elbow_max = ELBOW_MAX_DEG if elbow_max is None else elbow_max
+    issues = []
+    if not ok_left:
+        issues.append(f"왼쪽 {int(left_angle)}°")
+    if not ok_right:
+        issues.append(f"오른쪽 {int(right_angle)}°")
+    return f"팔꿈치 각도 조정: {', '.join(issues)}. {elbow_min}°~{elbow_max}° 유지하세요."
+
+
+def eye_message(status):
+    """시선 상태 코드로 안내 문구를 만듭니다."""
+    if status == UNKNOWN:
+        return "시선 판단 보류: 얼굴이 잘 보이지 않습니다."
+    if status == LOOKING_DOWN:
+        return "모니터를 너무 내려다봅니다. 눈높이에 맞추고 목의 긴장을 풀어주세요."
+    return "시선/눈높이 양호"
+
+
+def analyze_head_posture(landmarks, min_visibility=None):
     """
     머리/목 정렬(CVA) 분석.
-    입력: landmarks - MediaPipe Pose 33개 랜드마크의 [x,y,z] 리스트.
-    반환: (status, message) 튜플. status는 'GOOD' 또는 'FORWARD_HEAD'.
+    입력: landmarks - MediaPipe Pose 33개 랜드마크의 [x,y,z] 리스트(또는 [x,y,z,visibility] LandmarkFrame).
+          min_visibility - 지정하면 귀/어깨 visibility가 이보다 낮을 때 판단을 보류합니다.
+    반환: (status, message) 튜플. status는 'GOOD', 'FORWARD_HEAD' 또는 'UNKNOWN'.
     """
     # MediaPipe 랜드마크 인덱스
     RIGHT_SHOULDER = 12
     LEFT_SHOULDER = 11
     RIGHT_EAR = 8
 
+    if _hidden(landmarks, (RIGHT_SHOULDER, LEFT_SHOULDER, RIGHT_EAR), min_visibility):
+        return 'UNKNOWN', head_message(UNKNOWN, 0)
+
     # 올바른 랜드마크 인덱스로 접근
     shoulder_r = landmarks[RIGHT_SHOULDER]  # [x, y, z] 좌표
     shoulder_l = landmarks[LEFT_SHOULDER]   # [x, y, z] 좌표
@@ -65,16 +138,17 @@ def analyze_head_posture(landmarks):
     cva = calculate_angle(horizontal_point, shoulder_center, ear_r[:2])
 
     if cva < CVA_MIN_DEG:
-        return 'FORWARD_HEAD', f"거북목 주의: CVA {int(cva)}° < {CVA_MIN_DEG}°. 귀를 어깨선과 맞추세요."
-    return 'GOOD', f"목 자세 양호: CVA {int(cva)}°"
+        return 'FORWARD_HEAD', head_message(FORWARD_HEAD, cva)
+    return 'GOOD', head_message(GOOD, cva)
 
 
-def analyze_shoulder_posture(landmarks):
+def analyze_shoulder_posture(landmarks, min_visibility=None):
     """
     어깨 말림(라운드 숄더) 추정.
-    - 입력: landmarks - MediaPipe Pose 33개 랜드마크의 [x,y,z] 리스트.
+    - 입력: landmarks - MediaPipe Pose 33개 랜드마크의 [x,y,z] 리스트(또는 LandmarkFrame).
+            min_visibility - 지정하면 어깨/엉덩이 visibility가 이보다 낮을 때 판단을 보류합니다.
     - 방법: 어깨 평균 z와 엉덩이 평균 z를 비교해 어깨가 카메라 쪽으로 과도하게 돌출되었는지 확인.
-    - 반환: (status, message) 튜플. status는 'GOOD' 또는 'SLUMPED'.
+    - 반환: (status, message) 튜플. status는 'GOOD', 'SLUMPED' 또는 'UNKNOWN'.
     주의: z축 방향/부호는 장비에 따라 달라 환경 보정이 필요할 수 있습니다.
     """
     # MediaPipe 랜드마크 인덱스
@@ -83,6 +157,9 @@ def analyze_shoulder_posture(landmarks):
     RIGHT_HIP = 24
     LEFT_HIP = 23
 
+    if _hidden(landmarks, (RIGHT_SHOULDER, LEFT_SHOULDER, RIGHT_HIP, LEFT_HIP), min_visibility):
+        return 'UNKNOWN', shoulder_message(UNKNOWN)
+
     # 올바른 랜드마크 인덱스로 접근
     shoulder_r = landmarks[RIGHT_SHOULDER]  # [x, y, z] 좌표
     shoulder_l = landmarks[LEFT_SHOULDER]   # [x, y, z] 좌표
@@ -95,19 +172,18 @@ def analyze_shoulder_posture(landmarks):
 
     # 임계값 설정 (환경에 따라 조정 필요)
     if shoulder_z_avg < hip_z_avg + SLUMP_Z_THRESHOLD:
-        return 'SLUMPED', "어깨가 말려 있습니다. 가슴을 펴고 어깨를 뒤로 젖히세요."
-
-    return 'GOOD', "어깨 자세 양호"
-
+        return 'SLUMPED', shoulder_message(SLUMPED)
 
+    return 'GOOD', shoulder_message(GOOD)
 
 
-def analyze_elbow_posture(landmarks):
+def analyze_elbow_posture(landmarks, min_visibility=None):
     """
     팔꿈치 각도 분석.
-    - 입력: landmarks - MediaPipe Pose 33개 랜드마크 [x,y,z] 리스트.
+    - 입력: landmarks - MediaPipe Pose 33개 랜드마크 [x,y,z] 리스트(또는 LandmarkFrame).
+            min_visibility - 지정하면 visibility가 낮은 쪽 팔은 평가에서 제외합니다.
     - 방법: 어깨-팔꿈치-손목 각도를 좌/우 각각 계산하여 권장 범위 비교.
-    - 반환: (status, message). 'GOOD' 또는 'ELBOW_ANGLE_ISSUE'.
+    - 반환: (status, message). 'GOOD', 'ELBOW_ANGLE_ISSUE' 또는 양팔 모두 안 보이면 'UNKNOWN'.
     """
     # 팔꿈치 각도: 어깨-팔꿈치-손목
     # 웹캠 좌우 반전으로 인해 RIGHT와 LEFT를 교차하여 사용합니다.
@@ -118,36 +194,158 @@ def analyze_elbow_posture(landmarks):
     left_angle = calculate_angle(landmarks[LEFT_SHOULDER][:2], landmarks[LEFT_ELBOW][:2], landmarks[LEFT_WRIST][:2])
     right_angle = calculate_angle(landmarks[RIGHT_SHOULDER][:2], landmarks[RIGHT_ELBOW][:2], landmarks[RIGHT_WRIST][:2])
 
-    ok_left = ELBOW_MIN_DEG <= left_angle <= ELBOW_MAX_DEG
-    ok_right = ELBOW_MIN_DEG <= right_angle <= ELBOW_MAX_DEG
+    # 잘 보이지 않는 쪽 팔은 평가하지 않습니다(양호로 간주).
+    hidden_left = _hidden(landmarks, (LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST), min_visibility)
+    hidden_right = _hidden(landmarks, (RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST), min_visibility)
+    if hidden_left and hidden_right:
+        return 'UNKNOWN', elbow_message(UNKNOWN, left_angle, right_angle, False, False)
 
-    if ok_left and ok_right:
-        return 'GOOD', f"팔꿈치 각도 양호: L {int(left_angle)}°, R {int(right_angle)}°"
+    ok_left = hidden_left or ELBOW_MIN_DEG <= left_angle <= ELBOW_MAX_DEG
+    ok_right = hidden_right or ELBOW_MIN_DEG <= right_angle <= ELBOW_MAX_DEG
 
-    # 어떤 쪽이든 벗어난 경우 메시지 생성
-    issues = []
-    if not ok_left:
-        issues.append(f"왼쪽 {int(left_angle)}°")
-    if not ok_right:
-        issues.append(f"오른쪽 {int(right_angle)}°")
-    return 'ELBOW_ANGLE_ISSUE', f"팔꿈치 각도 조정: {', '.join(issues)}. {ELBOW_MIN_DEG}°~{ELBOW_MAX_DEG}° 유지하세요."
+    if ok_left and ok_right:
+        return 'GOOD', elbow_message(GOOD, left_angle, right_angle, ok_left, ok_right)
+    return 'ELBOW_ANGLE_ISSUE', elbow_message(ELBOW_ANGLE_ISSUE, left_angle, right_angle, ok_left, ok_right)
 
 
-def analyze_eye_level(landmarks):
+def analyze_eye_level(landmarks, min_visibility=None):
     """
     시선/눈높이 분석: 모니터를 과도하게 내려다보는지 추정.
-    - 입력: landmarks - MediaPipe Pose 33개 랜드마크 [x,y,z] 리스트.
+    - 입력: landmarks - MediaPipe Pose 33개 랜드마크 [x,y,z] 리스트(또는 LandmarkFrame).
+            min_visibility - 지정하면 코/눈 visibility가 이보다 낮을 때 판단을 보류합니다.
     - 방법: 코와 양쪽 눈의 y좌표 차이를 계산하여 임계값보다 크면 'LOOKING_DOWN'.
-    - 반환: (status, message). 'GOOD' 또는 'LOOKING_DOWN'.
+    - 반환: (status, message). 'GOOD', 'LOOKING_DOWN' 또는 'UNKNOWN'.
     """
     # 코와 눈 위치로 고개 숙임 추정
     NOSE = 0
     LEFT_EYE, RIGHT_EYE = 2, 5
 
+    if _hidden(landmarks, (NOSE, LEFT_EYE, RIGHT_EYE), min_visibility):
+        return 'UNKNOWN', eye_message(UNKNOWN)
+
     nose_y = landmarks[NOSE][1]
     eye_y = (landmarks[LEFT_EYE][1] + landmarks[RIGHT_EYE][1]) / 2.0
     diff = nose_y - eye_y  # +면 코가 더 아래(고개 숙임)
 
     if diff > EYE_DOWN_NOSE_DIFF:
-        return 'LOOKING_DOWN', "모니터를 너무 내려다봅니다. 눈높이에 맞추고 목의 긴장을 풀어주세요."
-    return 'GOOD', "시선/눈높이 양호"
\ No newline at end of file
+        return 'LOOKING_DOWN', eye_message(LOOKING_DOWN)
+    return 'GOOD', eye_message(GOOD)
+
+
+# ---- 배치(벡터화) 분석 ----
+# MediaPipe 랜드마크 인덱스 (배치 분석용, 프레임 단위 함수와 동일한 인덱스 사용)
+_NOSE = 0
+_LEFT_EYE, _RIGHT_EYE = 2, 5
+_RIGHT_EAR = 8
+_LEFT_SHOULDER, _RIGHT_SHOULDER = 11, 12
+_LEFT_ELBOW, _RIGHT_ELBOW = 13, 14
+_LEFT_WRIST, _RIGHT_WRIST = 15, 16
+_LEFT_HIP, _RIGHT_HIP = 23, 24
+
+
+def _angle_deg(ax, ay, bx, by, cx, cy):
+    """calculate_angle의 벡터화 버전. 각 인자는 같은 길이의 1차원 배열입니다."""
+    radians = np.arctan2(cy - by, cx - bx) - np.arctan2(ay - by, ax - bx)
+    angle = np.abs(radians * 180.0 / np.pi)
+    return np.where(angle > 180.0, 360 - angle, angle)
+
+
+class BatchAnalysis:
+    """
+    analyze_batch의 결과. 모든 값은 길이 N(프레임 수)의 배열입니다.
+    - cva, left_elbow_angle, right_elbow_angle: 각도(도)
+    - shoulder_z_delta: 어깨 평균 z - 엉덩이 평균 z
+    - nose_eye_diff: 코 y - 두 눈 평균 y (+면 고개 숙임)
+    - head_status, shoulder_status, elbow_status, eye_status: 상태 코드(int8, STATUS_NAMES 참조)
+    메시지는 messages(i)를 호출할 때만 생성됩니다.
+    """
+    def __init__(self, landmarks, cva_min, elbow_min, elbow_max, eye_down_diff, slump_z, min_visibility=None):
+        self.cva_min = cva_min
+        self.elbow_min = elbow_min
+        self.elbow_max = elbow_max
+        self.eye_down_diff = eye_down_diff
+        self.slump_z = slump_z
+
+        x = landmarks[:, :, 0]
+        y = landmarks[:, :, 1]
+        z = landmarks[:, :, 2]
+
+        # 머리/목: 어깨 중심에서 수평선과 오른쪽 귀가 이루는 각도
+        center_x = (x[:, _LEFT_SHOULDER] + x[:, _RIGHT_SHOULDER]) / 2
+        center_y = (y[:, _LEFT_SHOULDER] + y[:, _RIGHT_SHOULDER]) / 2
+        self.cva = _angle_deg(center_x - 1, center_y, center_x, center_y,
+                              x[:, _RIGHT_EAR], y[:, _RIGHT_EAR])
+
+        # 어깨: z 평균 비교
+        shoulder_z_avg = (z[:, _LEFT_SHOULDER] + z[:, _RIGHT_SHOULDER]) / 2
+        hip_z_avg = (z[:, _LEFT_HIP] + z[:, _RIGHT_HIP]) / 2
+        self.shoulder_z_delta = shoulder_z_avg - hip_z_avg
+
+        # 팔꿈치: 웹캠 좌우 반전으로 인해 RIGHT와 LEFT를 교차하여 사용합니다.
+        self.left_elbow_angle = _angle_deg(x[:, _RIGHT_SHOULDER], y[:, _RIGHT_SHOULDER],
+                                           x[:, _RIGHT_ELBOW], y[:, _RIGHT_ELBOW],
+                                           x[:, _RIGHT_WRIST], y[:, _RIGHT_WRIST])
+        self.right_elbow_angle = _angle_deg(x[:, _LEFT_SHOULDER], y[:, _LEFT_SHOULDER],
+                                            x[:, _LEFT_ELBOW], y[:, _LEFT_ELBOW],
+                                            x[:, _LEFT_WRIST], y[:, _LEFT_WRIST])
+
+        # 시선: 코와 두 눈의 y 차이
+        self.nose_eye_diff = y[:, _NOSE] - (y[:, _LEFT_EYE] + y[:, _RIGHT_EYE]) / 2.0
+
+        # visibility가 낮은 관절 (프레임 단위 함수의 min_visibility 처리와 동일)
+        if min_visibility is not None and landmarks.shape[2] > 3:
+            hidden = landmarks[:, :, 3] < min_visibility
+        else:
+            hidden = np.zeros(landmarks.shape[:2], dtype=bool)
+        hidden_left = hidden[:, [_RIGHT_SHOULDER, _RIGHT_ELBOW, _RIGHT_WRIST]].any(axis=1)
+        hidden_right = hidden[:, [_LEFT_SHOULDER, _LEFT_ELBOW, _LEFT_WRIST]].any(axis=1)
+
+        # 상태 코드 (비교식은 프레임 단위 함수와 동일하게 유지)
+        self.left_elbow_ok = hidden_left | ((elbow_min <= self.left_elbow_angle) & (self.left_elbow_angle <= elbow_max))
+        self.right_elbow_ok = hidden_right | ((elbow_min <= self.right_elbow_angle) & (self.right_elbow_angle <= elbow_max))
+        self.head_status = np.where(self.cva < cva_min, FORWARD_HEAD, GOOD).astype(np.int8)
+        self.shoulder_status = np.where(shoulder_z_avg < hip_z_avg + slump_z, SLUMPED, GOOD).astype(np.int8)
+        self.elbow_status = np.where(self.left_elbow_ok & self.right_elbow_ok,
+                                     GOOD, ELBOW_ANGLE_ISSUE).astype(np.int8)
+        self.eye_status = np.where(self.nose_eye_diff > eye_down_diff, LOOKING_DOWN, GOOD).astype(np.int8)
+
+        self.head_status[hidden[:, [_RIGHT_SHOULDER, _LEFT_SHOULDER, _RIGHT_EAR]].any(axis=1)] = UNKNOWN
+        self.shoulder_status[hidden[:, [_RIGHT_SHOULDER, _LEFT_SHOULDER, _RIGHT_HIP, _LEFT_HIP]].any(axis=1)] = UNKNOWN
+        self.elbow_status[hidden_left & hidden_right] = UNKNOWN
+        self.eye_status[hidden[:, [_NOSE, _LEFT_EYE, _RIGHT_EYE]].any(axis=1)] = UNKNOWN
+
+    def __len__(self):
+        return len(self.cva)
+
+    def messages(self, i):
+        """
+        i번째 프레임의 분석 결과를 프레임 단위 함수와 같은 형식으로 반환합니다.
+        - 반환: [(status, message), ...] (머리, 어깨, 팔꿈치, 시선 순서)
+        """
+        head = int(self.head_status[i])
+        shoulder = int(self.shoulder_status[i])
+        elbow = int(self.elbow_status[i])
+        eye = int(self.eye_status[i])
+        return [
+            (STATUS_NAMES[head], head_message(head, self.cva[i], self.cva_min)),
+            (STATUS_NAMES[shoulder], shoulder_message(shoulder)),
+            (STATUS_NAMES[elbow], elbow_message(elbow, self.left_elbow_angle[i], self.right_elbow_angle[i],
+                                                self.left_elbow_ok[i], self.right_elbow_ok[i],
+                                                self.elbow_min, self.elbow_max)),
+            (STATUS_NAMES[eye], eye_message(eye)),
+        ]
+
+
+def analyze_batch(landmarks, cva_min=CVA_MIN_DEG, elbow_min=ELBOW_MIN_DEG, elbow_max=ELBOW_MAX_DEG,
+                  eye_down_diff=EYE_DOWN_NOSE_DIFF, slump_z=SLUMP_Z_THRESHOLD, min_visibility=None):
+    """
+    여러 프레임의 랜드마크를 한 번에 분석합니다(녹화 데이터 재분석용).
+    - 입력: landmarks - (N, 33, 3) 또는 visibility를 포함한 (N, 33, 4) 배열(또는 변환 가능한 중첩 리스트).
+            임계값 인자를 생략하면 모듈 상수를 사용합니다.
+            min_visibility - 지정하고 4번째 열이 있으면 잘 보이지 않는 관절의 항목을 UNKNOWN으로 표시합니다.
+    - 반환: BatchAnalysis. 값과 상태 코드는 프레임 단위 analyze_* 함수와 동일합니다.
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    if landmarks.ndim != 3 or landmarks.shape[1] < 33 or landmarks.shape[2] < 3:
+        raise ValueError(f"landmarks는 (N, 33, 3) 형태여야 합니다: {landmarks.shape}")
+    return BatchAnalysis(landmarks, cva_min, elbow_min, elbow_max, eye_down_diff, slump_z, min_visibility)
@@ -0,0 +1,305 @@
+"""
+프레임 루프 밖에서 피드백을 전달하는 이벤트 디스패처.
+- 프레임 루프는 dispatch()로 이벤트를 큐에 넣기만 하고, 장기 실행 작업 스레드 하나가 싱크(sink)들에 전달합니다.
+- 싱크: 콘솔(ConsoleSink), 음성(VoiceSink), JSONL 파일(JsonlFileSink), 로컬 HTTP 웹훅(WebhookSink).
+- 같은 키의 이벤트가 빠르게 반복되면 하나로 합치고(coalesce), 대기 큐가 가득 차면 지정한 정책으로 처리합니다.
+- 싱크별 처리 지연과 큐 대기 지연을 기록합니다(stats()).
+"""
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 대기 큐가 가득 찼을 때의 처리 정책
+DROP_OLDEST = 'drop_oldest'  # 가장 오래된 대기 이벤트를 버리고 새 이벤트를 넣음
+DROP_NEWEST = 'drop_newest'  # 새 이벤트를 버림
+BLOCK = 'block'              # 자리가 날 때까지 호출 측을 대기시킴(오프라인 처리용, 프레임 루프에는 부적합)
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class FeedbackEvent:
+    """
+    피드백 이벤트.
+    - key: 병합(coalesce) 기준 키(예: 상태 코드 이름)
+    - message: 사용자에게 전달할 문구
+    - kind: 이벤트 종류(기본 'posture')
+    - extra: 싱크에 함께 전달할 추가 정보(dict, JSON 직렬화 가능해야 함)
+    """
+    __slots__ = ('key', 'message', 'kind', 'extra', 'timestamp', 'enqueued_at', 'count')
+
+    def __init__(self, key, message, kind='posture', extra=None):
+        self.key = key
+        self.message = message
+        self.kind = kind
+        self.extra = extra or {}
+        self.timestamp = time.time()          # 이벤트 발생 시각(벽시계)
+        self.enqueued_at = time.perf_counter()
+        self.count = 1                        # 병합된 이벤트 수
+
+    def to_dict(self):
+        return {
+            'timestamp': self.timestamp,
+            'kind': self.kind,
+            'key': self.key,
+            'message': self.message,
+            'count': self.count,
+            **self.extra,
+        }
+
+
+# ---- 싱크 ----
+class ConsoleSink:
+    """콘솔에 텍스트 피드백을 출력합니다."""
+    name = 'console'
+
+    def handle(self, event):
+        print(f"[피드백]: {event.message}")
+
+
+class VoiceSink:
+    """FeedbackHandler로 음성 피드백을 제공합니다(합성은 디스패처 작업 스레드에서, 재생은 핸들러의 재생 스레드에서)."""
+    name = 'voice'
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def handle(self, event):
+        self.handler.provide_voice_feedback(event.message)
+
+
+class JsonlFileSink:
+    """이벤트를 한 줄에 하나씩 JSON으로 파일에 추가합니다."""
+    name = 'jsonl'
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def handle(self, event):
+        self._file.write(json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class WebhookSink:
+    """이벤트를 JSON으로 HTTP POST 합니다(로컬 대시보드/알림 서버 연동용)."""
+    name = 'webhook'
+
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def handle(self, event):
+        body = json.dumps(event.to_dict(), ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class StubWebhookServer:
+    """
+    WebhookSink 확인용 로컬 HTTP 서버. 받은 JSON을 received 리스트에 모읍니다.
+    사용법: server = StubWebhookServer().start(); WebhookSink(server.url) ...; server.stop()
+    """
+    def __init__(self, host='127.0.0.1', port=0):
+        self.received = []
+        received = self.received
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                received.append(json.loads(self.rfile.read(length).decode('utf-8')))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass  # 요청 로그를 콘솔에 출력하지 않습니다.
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/feedback"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-webhook", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ---- 디스패처 ----
+class _LatencyStats:
+    """최근 처리 지연(ms)을 모아 평균/백분위를 계산합니다."""
+    def __init__(self, window=256):
+        self.count = 0
+        self.errors = 0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, ms):
+        self.count += 1
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+
+    def summary(self):
+        recent = sorted(self._recent)
+
+        def pct(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))] if recent else 0.0
+
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95),
+            'max_ms': self.max_ms,
+        }
+
+
+class FeedbackDispatcher:
+    """
+    이벤트 기반 피드백 디스패처(작업 스레드 1개).
+    - sinks: 싱크 리스트(handle(event) 메서드와 name 속성, 선택적으로 close())
+    - max_pending: 대기 이벤트 최대 개수
+    - overflow: 대기 큐가 가득 찼을 때의 정책(DROP_OLDEST / DROP_NEWEST / BLOCK)
+    - coalesce_window: 같은 키의 이벤트가 전달된 뒤 이 시간(초) 안에 다시 오면 병합하여 버립니다.
+    대기 중인 같은 키의 이벤트가 있으면 새 이벤트는 그 이벤트에 병합됩니다(문구는 최신으로 갱신).
+    """
+    def __init__(self, sinks, max_pending=32, overflow=DROP_OLDEST, coalesce_window=1.0):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"알 수 없는 overflow 정책: {overflow} (사용 가능: {', '.join(OVERFLOW_POLICIES)})")
+        self.sinks = list(sinks)
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.coalesce_window = coalesce_window
+
+        self._pending = OrderedDict()  # key -> FeedbackEvent (먼저 들어온 순서)
+        self._last_delivered = {}      # key -> 마지막 전달 시각(perf_counter)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        self.accepted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.queue_latency = _LatencyStats()
+        self.sink_latency = {sink.name: _LatencyStats() for sink in self.sinks}
+
+    def start(self):
+        """작업 스레드를 시작합니다."""
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="feedback-dispatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def dispatch(self, event):
+        """
+        이벤트를 대기 큐에 넣습니다(프레임 루프에서 호출, BLOCK 정책이 아니면 대기하지 않음).
+        - 반환: 새 이벤트로 받아들였으면 True, 병합되거나 버려졌으면 False
+        """
+        with self._cond:
+            # BLOCK 정책에서 기다리는 동안 큐가 바뀌므로, 병합/한도 확인은 깨어날 때마다 다시 합니다.
+            while True:
+                pending = self._pending.get(event.key)
+                if pending is not None:
+                    pending.message = event.message
+                    pending.extra = event.extra
+                    pending.count += 1
+                    self.coalesced += 1
+                    return False
+                last = self._last_delivered.get(event.key)
+                if last is not None and event.enqueued_at - last < self.coalesce_window:
+                    self.coalesced += 1
+                    return False
+                if len(self._pending) < self.max_pending:
+                    break
+                if self.overflow == DROP_OLDEST:
+                    self._pending.popitem(last=False)
+                    self.dropped += 1
+                    break
+                if self.overflow == DROP_NEWEST or not self._running:
+                    self.dropped += 1
+                    return False
+                self._cond.wait(0.1)
+            self._pending[event.key] = event
+            self.accepted += 1
+            self._cond.notify_all()
+            return True
+
+    def _worker(self):
+        """대기 이벤트를 하나씩 꺼내 모든 싱크에 전달하고, 종료할 때 싱크를 닫습니다."""
+        try:
+            self._deliver_loop()
+        finally:
+            self._close_sinks()
+
+    def _deliver_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and self._running:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+                _, event = self._pending.popitem(last=False)
+                self._cond.notify_all()  # BLOCK 정책으로 대기 중인 호출 측을 깨웁니다.
+
+            start = time.perf_counter()
+            self.queue_latency.record((start - event.enqueued_at) * 1000.0)
+            for sink in self.sinks:
+                t0 = time.perf_counter()
+                try:
+                    sink.handle(event)
+                except Exception as e:
+                    self.sink_latency[sink.name].errors += 1
+                    print(f"[피드백] {sink.name} 싱크 오류: {e}")
+                self.sink_latency[sink.name].record((time.perf_counter() - t0) * 1000.0)
+            with self._cond:
+                self._last_delivered[event.key] = time.perf_counter()
+
+    def _close_sinks(self):
+        for sink in self.sinks:
+            close = getattr(sink, 'close', None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    print(f"[피드백] {sink.name} 싱크 닫기 오류: {e}")
+
+    def stop(self, timeout=2.0):
+        """
+        남은 이벤트를 전달한 뒤(timeout 내) 작업 스레드를 종료합니다.
+        싱크는 작업 스레드가 끝날 때 닫으므로, timeout이 지나도 전달 중인 싱크가 먼저 닫히지 않습니다.
+        - 반환: 작업 스레드가 종료되었으면 True
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is None:
+            self._close_sinks()
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def stats(self):
+        """수락/병합/버림 수와 큐 대기 지연, 싱크별 처리 지연 요약을 반환합니다."""
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            'accepted': self.accepted,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'pending': pending,
+            'queue': self.queue_latency.summary(),
+            'sinks': {name: s.summary() for name, s in self.sink_latency.items()},
+        }
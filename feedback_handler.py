@@ -1,70 +1,100 @@
 """
-피드백 유틸리티: 텍스트 출력과 gTTS+pygame을 이용한 음성 안내 제공.
+피드백 유틸리티: 텍스트 출력과 TTS+pygame을 이용한 음성 안내 제공.
 - 콘솔 텍스트 피드백 출력
-- gTTS로 생성한 mp3를 임시 파일로 저장 후 별도 스레드에서 재생
+- 문구 단위 TTS 캐시(tts_cache)에서 오디오를 가져와 별도 스레드에서 메모리로부터 재생
 - 과도한 반복 방지를 위한 쿨다운 적용
+- pygame은 재생 스레드에서 불러오고 초기화하므로, 생성자가 오디오 준비를 기다리지 않습니다.
 """
-from gtts import gTTS
+import io
+import queue
 import threading
-import os
 import time
-import pygame
-import tempfile
+
+from tts_cache import TTSAudioCache, make_backend
 
 
 class FeedbackHandler:
     """
     피드백 처리 클래스.
     - provide_text_feedback: 텍스트 메시지를 콘솔에 출력
-    - provide_voice_feedback: 한국어 TTS 음성을 생성·재생(쿨다운 포함)
-    내부적으로 pygame.mixer를 초기화하고, 재생은 백그라운드 스레드에서 수행합니다.
+    - provide_voice_feedback: 한국어 TTS 음성을 캐시에서 가져와 재생(쿨다운 포함)
+    pygame.mixer 초기화와 재생은 장기 실행 재생 스레드 하나가 백그라운드에서 수행합니다.
+    준비가 끝나면 ready가 설정되고, 초기화에 실패하면 audio_error에 원인이 남습니다.
+    - tts_backend: 'gtts'(온라인) 또는 'pyttsx3'(오프라인)
+    - tts_cache: 직접 구성한 TTSAudioCache(생략 시 기본 디스크 캐시 사용)
+    - prewarm: True이면 시작 시 ergonomics_rules의 고정 문구를 백그라운드에서 미리 합성
     """
-    def __init__(self):
+    def __init__(self, tts_backend='gtts', lang='ko', tts_cache=None, prewarm=True):
         self.last_feedback_time = 0  # 마지막으로 음성 피드백을 제공한 시간
         self.feedback_cooldown = 10  # 초 단위, 피드백 간 최소 간격 (10초)
-        pygame.mixer.init()  # pygame의 mixer 모듈을 초기화합니다.
+        self.ready = threading.Event()  # 오디오 준비 완료(성공/실패 모두) 신호
+        self.audio_error = None
+        self.tts_cache = tts_cache or TTSAudioCache(make_backend(tts_backend), lang=lang)
+        if prewarm:
+            self.tts_cache.prewarm()
+        # 재생 대기열과 장기 실행 재생 스레드(알림마다 스레드를 새로 만들지 않습니다).
+        self._play_queue = queue.Queue(maxsize=2)
+        self._player = threading.Thread(target=self._player_loop, name="audio-player", daemon=True)
+        self._player.start()
 
     def provide_text_feedback(self, message):
         """콘솔에 텍스트 피드백을 출력합니다."""
         print(f"[피드백]: {message}")
 
-    def _play_audio_task(self, filename):
+    def wait_ready(self, timeout=None):
+        """오디오 초기화가 끝날 때까지 기다립니다. 사용할 수 있으면 True를 반환합니다."""
+        return self.ready.wait(timeout) and self.audio_error is None
+
+    def _player_loop(self):
+        """pygame.mixer를 초기화한 뒤, 재생 대기열에서 오디오 묶음을 꺼내 순서대로 재생하는 재생 스레드 본체입니다."""
+        play_queue = self._play_queue
+        try:
+            import pygame
+            pygame.mixer.init()  # pygame의 mixer 모듈을 초기화합니다.
+            self._pygame = pygame
+        except Exception as e:
+            self.audio_error = e
+            print(f"오디오 초기화 오류: {e}")
+        finally:
+            self.ready.set()
+        while True:
+            clips = play_queue.get()
+            if self.audio_error is None:
+                self._play_audio_task(clips)
+
+    def _play_audio_task(self, clips):
         """
-        별도의 스레드에서 오디오 파일을 재생하는 내부 함수입니다.
-        재생이 끝나면 임시 파일을 삭제합니다.
+        문구 조각 오디오(bytes)를 순서대로 재생하는 내부 함수입니다(재생 스레드에서 호출).
+        캐시된 바이트를 메모리에서 바로 로드하므로 임시 파일을 만들지 않습니다.
         """
+        pygame = self._pygame
         try:
-            pygame.mixer.music.load(filename)  # 오디오 파일을 로드합니다.
-            pygame.mixer.music.play()  # 오디오를 재생합니다.
-
-            # 재생이 완료될 때까지 대기합니다.
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
+            for data in clips:
+                # 오디오를 메모리에서 로드합니다. (namehint로 형식을 알려줍니다)
+                pygame.mixer.music.load(io.BytesIO(data), self.tts_cache.backend.ext)
+                pygame.mixer.music.play()  # 오디오를 재생합니다.
 
-            os.remove(filename)  # 재생 후 임시 파일을 삭제합니다.
+                # 재생이 완료될 때까지 대기합니다.
+                while pygame.mixer.music.get_busy():
+                    time.sleep(0.02)
         except Exception as e:
             print(f"오디오 재생 오류: {e}")
 
     def provide_voice_feedback(self, message):
         """
-        gTTS를 이용해 음성 피드백을 생성하고 재생합니다.
-        쿨다운 시간이 지나야만 새로운 피드백을 제공합니다.
+        TTS 캐시를 이용해 음성 피드백을 가져와 재생 대기열에 넣습니다.
+        캐시에 없는 문구 조각만 새로 합성하며(호출 스레드에서 수행), 쿨다운 시간이 지나야만 새로운 피드백을 제공합니다.
+        프레임 루프에서는 직접 호출하지 말고 feedback_dispatcher.VoiceSink를 통해 호출합니다.
         """
         current_time = time.time()
         if current_time - self.last_feedback_time > self.feedback_cooldown:
             self.last_feedback_time = current_time  # 마지막 피드백 시간을 갱신합니다.
             try:
-                tts = gTTS(text=message, lang='ko')  # 한국어 음성을 생성합니다.
-
-                # 임시 디렉토리에 고유한 파일명으로 mp3 파일을 저장합니다.
-                temp_dir = tempfile.gettempdir()
-                filename = os.path.join(temp_dir, f"alert_{int(time.time())}.mp3")
-                tts.save(filename)
-
-                # 별도의 스레드에서 오디오 재생을 실행하여 메인 루프가 멈추지 않도록 합니다.
-                audio_thread = threading.Thread(target=self._play_audio_task, args=(filename,))
-                audio_thread.daemon = True  # 메인 프로그램 종료 시 스레드도 함께 종료되도록 설정
-                audio_thread.start()
+                clips = self.tts_cache.get_clips(message)  # 문구 조각별 오디오(캐시 적중 시 즉시 반환)
 
+                # 재생 스레드에 넘깁니다. 이미 재생 대기 중인 안내가 많으면 이번 안내는 건너뜁니다.
+                self._play_queue.put_nowait(clips)
+            except queue.Full:
+                print("오디오 재생 대기열이 가득 차 안내를 건너뜁니다.")
             except Exception as e:
-                print(f"gTTS 오류: {e}")
\ No newline at end of file
+                print(f"TTS 오류: {e}")
\ No newline at end of file
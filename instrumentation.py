@@ -0,0 +1,287 @@
+"""
+핫패스 계측: 이름 붙은 시간 구간(span)과 최근 구간 지연 히스토그램.
+- Instrumentation.span('infer.find_pose')를 with 문으로 감싸면 해당 구간의 소요 시간이 기록됩니다.
+- 구간별로 HDR 히스토그램처럼 로그 간격 버킷(옥타브당 16개, 상대 오차 약 4%)에 기록하고,
+  최근 window_seconds 동안의 값만 모아 p50/p90/p99를 계산합니다(슬라이스 단위로 오래된 값을 버림).
+- draw_hud(img): 프레임에 FPS와 구간별 p50/p99를 표시합니다.
+- MetricsExporter: 주기적으로 JSONL(한 줄에 한 번의 스냅샷)과 Prometheus 텍스트 형식 파일(node_exporter textfile collector 용)을 씁니다.
+비활성(enabled=False) 상태에서는 span()이 공유 no-op 객체를 돌려주므로 운영 환경에서도 그대로 두어도 부담이 거의 없습니다.
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+_BUCKETS_PER_OCTAVE = 16
+_NUM_BUCKETS = _BUCKETS_PER_OCTAVE * 27  # 1µs ~ 약 134초
+# 버킷 대표값(µs): 버킷 경계의 기하 평균
+_BUCKET_VALUES_US = 2.0 ** ((np.arange(_NUM_BUCKETS) + 0.5) / _BUCKETS_PER_OCTAVE)
+_PROM_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _bucket(seconds):
+    us = seconds * 1e6
+    if us < 1.0:
+        return 0
+    return min(int(math.log2(us) * _BUCKETS_PER_OCTAVE), _NUM_BUCKETS - 1)
+
+
+class RollingHistogram:
+    """
+    최근 window_seconds 동안의 지연 분포. slices개의 시간 조각으로 나누어 기록하고,
+    가장 오래된 조각을 비우며 창을 밀어냅니다. 누적 개수/합계/최댓값은 시작 이후 전체 기준입니다.
+    """
+    def __init__(self, window_seconds=60.0, slices=6):
+        self.slice_seconds = window_seconds / slices
+        # 기록 경로를 가볍게 하기 위해 조각별 개수는 파이썬 리스트로 두고, 분위수 계산 때만 배열로 합칩니다.
+        self._counts = [[0] * _NUM_BUCKETS for _ in range(slices)]
+        self._slice = 0
+        self._slice_started = time.monotonic()
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _advance(self, now):
+        """현재 시각까지 지난 조각을 비우며 창을 이동합니다(잠금 상태에서 호출)."""
+        passed = int((now - self._slice_started) / self.slice_seconds)
+        if passed <= 0:
+            return
+        slices = len(self._counts)
+        for k in range(1, min(passed, slices) + 1):
+            self._counts[(self._slice + k) % slices] = [0] * _NUM_BUCKETS
+        self._slice = (self._slice + passed) % slices
+        self._slice_started += passed * self.slice_seconds
+
+    def record(self, seconds):
+        now = time.monotonic()
+        index = _bucket(seconds)
+        with self._lock:
+            if now - self._slice_started >= self.slice_seconds:
+                self._advance(now)
+            self._counts[self._slice][index] += 1
+            self.count += 1
+            self.sum_seconds += seconds
+            if seconds > self.max_seconds:
+                self.max_seconds = seconds
+
+    def window_counts(self):
+        """창 안의 버킷별 개수."""
+        with self._lock:
+            self._advance(time.monotonic())
+            return np.array(self._counts, dtype=np.int64).sum(axis=0)
+
+    def quantiles(self, qs=DEFAULT_QUANTILES):
+        """창 안 값의 분위수(초). 값이 없으면 None 리스트."""
+        counts = self.window_counts()
+        total = counts.sum()
+        if total == 0:
+            return [None] * len(qs)
+        cumulative = np.cumsum(counts)
+        ranks = np.maximum(np.ceil(np.asarray(qs) * total), 1)
+        indices = np.searchsorted(cumulative, ranks)
+        return [float(v) / 1e6 for v in _BUCKET_VALUES_US[indices]]
+
+    def summary(self, qs=DEFAULT_QUANTILES):
+        """창 기준 분위수(ms)와 개수, 전체 기준 누적 값을 dict로 반환합니다."""
+        counts = self.window_counts()
+        values = self.quantiles(qs)
+        row = {f"p{round(q * 100):d}_ms": (None if v is None else v * 1000.0) for q, v in zip(qs, values)}
+        row.update(window_count=int(counts.sum()), count=self.count, sum_ms=self.sum_seconds * 1000.0,
+                   max_ms=self.max_seconds * 1000.0)
+        return row
+
+
+class _NullSpan:
+    """비활성 계측용 no-op 컨텍스트 매니저(공유 인스턴스)."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('_hist', '_t0')
+
+    def __init__(self, hist):
+        self._hist = hist
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._hist.record(time.perf_counter() - self._t0)
+        return False
+
+
+class Instrumentation:
+    """
+    구간 계측기. 여러 스레드에서 동시에 사용할 수 있습니다.
+    - span(name): with 문으로 구간 시간을 기록
+    - record(name, seconds): 직접 측정한 시간을 기록(예: 캡처→표시 지연)
+    - tick(): 표시한 프레임 하나를 기록(FPS 계산용)
+    - snapshot(): {'fps', 'stages': {이름: summary}} 반환
+    """
+    def __init__(self, enabled=True, window_seconds=60.0, slices=6):
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.slices = slices
+        self._hists = {}
+        self._lock = threading.Lock()
+        self._frame_times = deque()
+        self._started = time.time()
+
+    def histogram(self, name):
+        hist = self._hists.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._hists.setdefault(name, RollingHistogram(self.window_seconds, self.slices))
+        return hist
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self.histogram(name))
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def tick(self):
+        """표시 프레임 하나를 기록합니다(최근 2초 기준 FPS)."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            self._frame_times.append(now)
+            while self._frame_times and now - self._frame_times[0] > 2.0:
+                self._frame_times.popleft()
+
+    def fps(self):
+        with self._lock:
+            times = list(self._frame_times)
+        if len(times) < 2:
+            return 0.0
+        return (len(times) - 1) / max(times[-1] - times[0], 1e-6)
+
+    def snapshot(self):
+        with self._lock:
+            names = sorted(self._hists)
+        return {
+            'time': time.time(),
+            'uptime_s': time.time() - self._started,
+            'fps': self.fps(),
+            'stages': {name: self._hists[name].summary() for name in names},
+        }
+
+    def draw_hud(self, img, org=None, font_scale=0.45):
+        """
+        프레임 오른쪽 위에 FPS와 구간별 p50/p99(ms)를 그립니다(ASCII, cv2.putText).
+        배경은 글자 영역만 어둡게 처리합니다.
+        """
+        if not self.enabled:
+            return img
+        snap = self.snapshot()
+        lines = [f"FPS {snap['fps']:5.1f}"]
+        for name, row in snap['stages'].items():
+            if row['p50_ms'] is None:
+                continue
+            lines.append(f"{name:22s} p50 {row['p50_ms']:6.1f}  p99 {row['p99_ms']:6.1f} ms")
+        line_h = int(22 * font_scale / 0.45)
+        width = int(max(len(s) for s in lines) * 9.5 * font_scale / 0.45)
+        h, w = img.shape[:2]
+        x, y = org if org is not None else (max(w - width - 10, 0), 10)
+        box = img[y:y + line_h * len(lines) + 8, x:x + width + 10]
+        box[:] = box // 3
+        for i, text in enumerate(lines):
+            cv2.putText(img, text, (x + 5, y + line_h * (i + 1)), cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+                        (255, 255, 255), 1, cv2.LINE_AA)
+        return img
+
+
+def prometheus_text(snapshot, prefix="posture"):
+    """스냅샷을 Prometheus 텍스트 노출 형식(summary)으로 만듭니다."""
+    out = [
+        f"# HELP {prefix}_fps Displayed frames per second.",
+        f"# TYPE {prefix}_fps gauge",
+        f"{prefix}_fps {snapshot['fps']:.3f}",
+        f"# HELP {prefix}_stage_seconds Stage latency over the rolling window.",
+        f"# TYPE {prefix}_stage_seconds summary",
+    ]
+    for name, row in snapshot['stages'].items():
+        label = f'stage="{_PROM_NAME_RE.sub("_", name)}"'
+        for key, q in (('p50_ms', '0.5'), ('p90_ms', '0.9'), ('p99_ms', '0.99')):
+            if row.get(key) is not None:
+                out.append(f'{prefix}_stage_seconds{{{label},quantile="{q}"}} {row[key] / 1000.0:.6f}')
+        out.append(f"{prefix}_stage_seconds_sum{{{label}}} {row['sum_ms'] / 1000.0:.6f}")
+        out.append(f"{prefix}_stage_seconds_count{{{label}}} {row['count']}")
+    out.append(f"# HELP {prefix}_stage_max_seconds Largest stage latency since start.")
+    out.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+    for name, row in snapshot['stages'].items():
+        out.append(f'{prefix}_stage_max_seconds{{stage="{_PROM_NAME_RE.sub("_", name)}"}} {row["max_ms"] / 1000.0:.6f}')
+    return "\n".join(out) + "\n"
+
+
+class MetricsExporter:
+    """
+    interval초마다 계측 스냅샷을 파일로 내보내는 백그라운드 스레드.
+    - jsonl_path: 스냅샷을 한 줄씩 덧붙일 JSONL 파일
+    - prom_path: Prometheus 텍스트 형식 파일(임시 파일에 쓴 뒤 교체)
+    """
+    def __init__(self, instrumentation, jsonl_path=None, prom_path=None, interval=10.0):
+        self.instrumentation = instrumentation
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.jsonl_path or self.prom_path:
+            self._thread = threading.Thread(target=self._loop, name="metrics-exporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def export(self):
+        """스냅샷 하나를 즉시 내보냅니다."""
+        snapshot = self.instrumentation.snapshot()
+        try:
+            if self.jsonl_path:
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+            if self.prom_path:
+                tmp = self.prom_path + ".tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    f.write(prometheus_text(snapshot))
+                os.replace(tmp, self.prom_path)
+        except OSError as e:
+            print(f"[계측] 내보내기 오류: {e}")
+
+    def stop(self):
+        """스레드를 멈추고 마지막 스냅샷을 내보냅니다."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self.export()
+
+
+DISABLED = Instrumentation(enabled=False)  # 계측을 쓰지 않는 곳의 기본값
@@ -0,0 +1,188 @@
+"""
+랜드마크 시간 필터와 상태 히스테리시스.
+- OneEuroFilter: 33개 관절 전체를 한 번에 처리하는 벡터화 One-Euro 필터(Casiez et al., 2012).
+  느린 움직임에서는 강하게 평활해 떨림을 없애고, 빠른 움직임에서는 차단 주파수를 높여 지연을 줄입니다.
+  predict(t)는 필터가 추정한 속도로 추론 프레임 사이의 랜드마크를 외삽합니다.
+- LandmarkSmoother: LandmarkFrame 단위로 필터를 적용하고, 새 추론 결과가 없는 프레임에서는 예측 프레임을 돌려줍니다.
+- StatusStateMachine: 항목별(목/어깨/팔꿈치/시선) 상태 코드에 히스테리시스를 적용하여,
+  일정 시간 유지된 상태만 확정합니다(각도 숫자가 포함된 문구가 아니라 상태로 비교하므로 작은 떨림에 타이머가 초기화되지 않음).
+추론을 5~10 Hz로 낮춰도 화면 표시와 알림이 깜빡이지 않도록 하는 것이 목적입니다.
+"""
+import numpy as np
+
+from ergonomics_rules import is_issue
+from landmark_frame import LandmarkRing, NUM_LANDMARKS, VISIBILITY
+
+
+def _smoothing_factor(dt, cutoff):
+    """차단 주파수 cutoff(Hz)와 시간 간격 dt(초)에 대한 지수 평활 계수(배열 연산)."""
+    tau = 1.0 / (2.0 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    벡터화 One-Euro 필터. 모든 원소(관절×좌표)가 같은 시각에 갱신됩니다.
+    - shape: 입력 배열 모양(기본 (33, 4))
+    - min_cutoff: 정지 상태 차단 주파수(Hz). 낮을수록 떨림이 줄고 지연이 늘어납니다.
+    - beta: 속도 계수. 클수록 빠른 움직임에서 지연이 줄어듭니다(정규화 좌표/초 기준).
+    - d_cutoff: 속도 추정용 차단 주파수(Hz)
+    """
+    def __init__(self, shape=(NUM_LANDMARKS, 4), min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = np.zeros(shape, dtype=np.float32)     # 평활된 값
+        self.velocity = np.zeros(shape, dtype=np.float32)  # 평활된 속도(단위/초)
+        self.timestamp = None
+
+    def reset(self):
+        """다음 입력부터 새로 시작합니다(사람을 놓쳤거나 시간 간격이 너무 클 때)."""
+        self.timestamp = None
+        self.velocity.fill(0.0)
+
+    def __call__(self, x, t):
+        """
+        시각 t(초)의 관측 x로 상태를 갱신하고 평활된 값(내부 버퍼)을 반환합니다.
+        첫 입력이나 같은 시각의 중복 입력은 그대로 받아들입니다.
+        """
+        if self.timestamp is None:
+            self.value[:] = x
+            self.velocity.fill(0.0)
+            self.timestamp = t
+            return self.value
+        dt = t - self.timestamp
+        if dt <= 0:
+            return self.value
+        dx = (x - self.value) / dt
+        self.velocity += _smoothing_factor(dt, self.d_cutoff) * (dx - self.velocity)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        self.value += _smoothing_factor(dt, cutoff) * (x - self.value)
+        self.timestamp = t
+        return self.value
+
+    def predict(self, t, out=None, max_horizon=0.3):
+        """
+        마지막 갱신 이후 시각 t의 값을 평활 속도로 선형 외삽합니다.
+        외삽 시간은 max_horizon(초)으로 제한하여 추론이 멈췄을 때 랜드마크가 멀리 달아나지 않게 합니다.
+        """
+        if out is None:
+            out = np.empty_like(self.value)
+        if self.timestamp is None:
+            out[:] = self.value
+            return out
+        horizon = min(max(t - self.timestamp, 0.0), max_horizon)
+        np.multiply(self.velocity, horizon, out=out)
+        out += self.value
+        return out
+
+
+class LandmarkSmoother:
+    """
+    LandmarkFrame 단위 필터.
+    - process(frame, t): frame이 새 추론 결과이면 필터를 갱신하고, 직전과 같은 결과(추론 건너뜀)이면 시각 t로 예측합니다.
+    - 반환 프레임은 내부 LandmarkRing 버퍼이므로 ring_size 프레임 뒤에 재사용됩니다.
+    - visibility 열도 평활하지만 외삽하지는 않습니다.
+    """
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0, max_predict_seconds=0.3,
+                 reset_seconds=1.0, ring_size=8):
+        self.filter = OneEuroFilter((NUM_LANDMARKS, 4), min_cutoff, beta, d_cutoff)
+        self.max_predict_seconds = max_predict_seconds
+        self.reset_seconds = reset_seconds
+        self._ring = LandmarkRing(ring_size)
+        self._source_timestamp = None  # 마지막으로 반영한 추론 결과의 timestamp
+        self.updates = 0
+        self.predictions = 0
+
+    def update(self, frame, t):
+        """새 추론 결과로 필터를 갱신하고 평활된 프레임을 반환합니다. 감지 실패 프레임이면 필터를 초기화합니다."""
+        out = self._ring.next()
+        self._source_timestamp = frame.timestamp
+        if not frame:
+            self.filter.reset()
+            return out.invalidate(t)
+        if self.filter.timestamp is not None and t - self.filter.timestamp > self.reset_seconds:
+            self.filter.reset()
+        out.data[:] = self.filter(frame.data, t)
+        out.valid = True
+        out.timestamp = t
+        self.updates += 1
+        return out
+
+    def predict(self, t):
+        """마지막 갱신 이후 시각 t의 예측 프레임을 반환합니다(필터 상태는 바꾸지 않음)."""
+        out = self._ring.next()
+        if self.filter.timestamp is None or t - self.filter.timestamp > self.reset_seconds:
+            return out.invalidate(t)
+        self.filter.predict(t, out=out.data, max_horizon=self.max_predict_seconds)
+        out.data[:, VISIBILITY] = self.filter.value[:, VISIBILITY]
+        out.valid = True
+        out.timestamp = t
+        self.predictions += 1
+        return out
+
+    def process(self, frame, t):
+        """
+        파이프라인용: frame.timestamp가 바뀌었으면 update, 아니면 predict.
+        - frame: 감지기의 LandmarkFrame
+        - t: 현재 프레임의 캡처 시각(time.perf_counter() 기준)
+        """
+        if frame.timestamp != self._source_timestamp:
+            return self.update(frame, t)
+        return self.predict(t)
+
+
+class StatusStateMachine:
+    """
+    항목별 상태 히스테리시스.
+    - 관측 상태가 확정 상태와 다르면 후보로 두고, 문제 상태는 on_seconds, 양호 상태는 off_seconds 동안 유지되어야 확정합니다.
+    - UNKNOWN(판단 보류)은 후보/확정 상태를 바꾸지 않습니다(일시적으로 가려져도 알림이 깜빡이지 않음).
+    - repeat_seconds가 주어지면 확정된 문제가 계속될 때 그 간격으로 다시 알립니다.
+    update()는 이번 호출에서 새로 확정되었거나 반복 알림 시점이 된 (항목, 상태) 리스트를 반환합니다.
+    """
+    def __init__(self, on_seconds=2.0, off_seconds=1.0, repeat_seconds=None):
+        self.on_seconds = on_seconds
+        self.off_seconds = off_seconds
+        self.repeat_seconds = repeat_seconds
+        self.confirmed = {}    # 항목 → 확정 상태
+        self._candidate = {}   # 항목 → (후보 상태, 후보 시작 시각)
+        self._alerted_at = {}  # 항목 → 마지막 알림 시각
+
+    def reset(self):
+        self.confirmed.clear()
+        self._candidate.clear()
+        self._alerted_at.clear()
+
+    def update(self, statuses, t):
+        """
+        - statuses: {항목: 상태 이름} (예: {'head': 'FORWARD_HEAD', ...})
+        - t: 현재 시각(초)
+        """
+        alerts = []
+        for item, status in statuses.items():
+            if status == 'UNKNOWN':
+                continue
+            confirmed = self.confirmed.get(item, 'GOOD')
+            if status == confirmed:
+                self._candidate.pop(item, None)
+                if is_issue(status) and self.repeat_seconds is not None and \
+                        t - self._alerted_at.get(item, t) >= self.repeat_seconds:
+                    self._alerted_at[item] = t
+                    alerts.append((item, status))
+                continue
+            candidate, since = self._candidate.get(item, (None, t))
+            if candidate != status:
+                self._candidate[item] = (status, t)
+                since = t
+            hold = self.on_seconds if is_issue(status) else self.off_seconds
+            if t - since >= hold:
+                self.confirmed[item] = status
+                self._candidate.pop(item, None)
+                if is_issue(status):
+                    self._alerted_at[item] = t
+                    alerts.append((item, status))
+        return alerts
+
+    def active_issues(self):
+        """확정된 문제 상태가 있는 항목 리스트(처음 확정된 순서)."""
+        return [item for item, status in self.confirmed.items() if is_issue(status)]
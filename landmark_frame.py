@@ -0,0 +1,170 @@
+"""
+배열 기반 랜드마크 프레임.
+- LandmarkFrame: 33개 관절의 (x, y, z, visibility)를 담는 (33, 4) float32 버퍼. 프레임마다 새로 만들지 않고 재사용합니다.
+- landmarks[RIGHT_SHOULDER]처럼 인덱싱하면 행 뷰(view)를 돌려주므로 ergonomics_rules의 분석 함수에 그대로(복사 없이) 넘길 수 있습니다.
+- LandmarkRing: 파이프라인 단계 사이에서 프레임을 복사 없이 넘기기 위한 미리 할당된 프레임 묶음.
+"""
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+# 열 인덱스
+X, Y, Z, VISIBILITY = 0, 1, 2, 3
+
+# MediaPipe Pose 랜드마크 이름 (인덱스 순서)
+LANDMARK_NAMES = (
+    'nose', 'left_eye_inner', 'left_eye', 'left_eye_outer', 'right_eye_inner', 'right_eye', 'right_eye_outer',
+    'left_ear', 'right_ear', 'mouth_left', 'mouth_right',
+    'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow', 'left_wrist', 'right_wrist',
+    'left_pinky', 'right_pinky', 'left_index', 'right_index', 'left_thumb', 'right_thumb',
+    'left_hip', 'right_hip', 'left_knee', 'right_knee', 'left_ankle', 'right_ankle',
+    'left_heel', 'right_heel', 'left_foot_index', 'right_foot_index',
+)
+LANDMARK_INDEX = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+
+# 자주 쓰는 관절 인덱스
+NOSE = 0
+LEFT_EYE, RIGHT_EYE = 2, 5
+LEFT_EAR, RIGHT_EAR = 7, 8
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+# NormalizedLandmarkList 직렬화 바이트의 관절 하나당 레코드 길이별 기대 태그(fill_from_proto 빠른 경로용).
+# 관절 하나 = 0x0a(필드1, length-delimited) + 길이 + [태그 + float32] × (x, y, z, visibility[, presence])
+_PROTO_RECORD_TAGS = {
+    2 + 5 * k: ((0, b'\x0a'), (1, bytes((5 * k,))), (2, b'\x0d'), (7, b'\x15'), (12, b'\x1d'), (17, b'\x25'))
+    for k in (4, 5)
+}
+_PROTO_EXPECTED = {
+    n: tuple((pos, tag * NUM_LANDMARKS) for pos, tag in tags) for n, tags in _PROTO_RECORD_TAGS.items()
+}
+
+
+class LandmarkFrame:
+    """
+    한 프레임의 랜드마크. data는 (33, 4) float32 [x, y, z, visibility] 버퍼이며 fill()로 제자리 갱신됩니다.
+    - 감지 실패 프레임은 valid=False이고, bool(frame)과 len(frame)이 각각 False/0이 되어 기존 리스트 API와 같게 동작합니다.
+    - 분석 함수는 frame[i][0], frame[i][:2]처럼 기존 [x, y, z] 리스트와 같은 방식으로 접근할 수 있습니다.
+    """
+    __slots__ = ('data', 'valid', 'timestamp', '_pixels', '_pixel_scale')
+
+    def __init__(self):
+        self.data = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self.valid = False
+        self.timestamp = 0.0
+        self._pixels = np.zeros((NUM_LANDMARKS, 2), dtype=np.int32)
+        self._pixel_scale = np.ones(2, dtype=np.float32)
+
+    def fill(self, landmarks, timestamp=0.0):
+        """
+        MediaPipe 랜드마크 시퀀스(x, y, z, visibility 속성)로 버퍼를 제자리 갱신합니다.
+        landmarks가 비어 있으면 valid=False로 표시합니다.
+        """
+        self.timestamp = timestamp
+        if not landmarks:
+            self.valid = False
+            return self
+        self.data[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks]
+        self.valid = True
+        return self
+
+    def fill_from_proto(self, landmark_list, timestamp=0.0):
+        """
+        MediaPipe NormalizedLandmarkList(pose_landmarks)로 버퍼를 갱신합니다.
+        직렬화 바이트의 레이아웃이 예상과 같으면 관절별 파이썬 속성 접근 없이 strided 뷰로 한 번에 복사하고,
+        다르면(필드 누락 등) fill()로 처리합니다.
+        """
+        raw = landmark_list.SerializeToString()
+        n = len(raw) // NUM_LANDMARKS
+        expected = _PROTO_EXPECTED.get(n)
+        if expected is None or len(raw) != n * NUM_LANDMARKS or \
+                any(raw[pos::n] != tags for pos, tags in expected):
+            return self.fill(landmark_list.landmark, timestamp)
+        # 각 레코드의 오프셋 3부터 5바이트 간격으로 x, y, z, visibility(float32 little-endian)가 놓여 있습니다.
+        self.data[:] = np.ndarray((NUM_LANDMARKS, 4), dtype='<f4', buffer=raw, offset=3, strides=(n, 5))
+        self.timestamp = timestamp
+        self.valid = True
+        return self
+
+    def invalidate(self, timestamp=0.0):
+        """감지 실패 프레임으로 표시합니다."""
+        self.timestamp = timestamp
+        self.valid = False
+        return self
+
+    def __getitem__(self, index):
+        """index번째 관절의 [x, y, z, visibility] 행 뷰(복사 없음)."""
+        return self.data[index]
+
+    def __len__(self):
+        return NUM_LANDMARKS if self.valid else 0
+
+    def __bool__(self):
+        return self.valid
+
+    def __iter__(self):
+        return iter(self.data if self.valid else ())
+
+    def __array__(self, dtype=None, copy=None):
+        # np.array(frame)는 copy=True로 호출하므로, 재사용 버퍼를 넘기지 않고 복사본을 돌려줍니다.
+        if copy:
+            return self.data.astype(dtype or self.data.dtype, copy=True)
+        return self.data if dtype is None else self.data.astype(dtype, copy=False)
+
+    def point(self, name):
+        """이름(예: 'right_shoulder')으로 관절 행 뷰를 반환합니다."""
+        return self.data[LANDMARK_INDEX[name]]
+
+    @property
+    def xyz(self):
+        """(33, 3) 좌표 뷰."""
+        return self.data[:, :3]
+
+    @property
+    def visibility(self):
+        """(33,) visibility 뷰."""
+        return self.data[:, VISIBILITY]
+
+    def is_visible(self, indices, min_visibility=0.5):
+        """지정한 관절이 모두 min_visibility 이상인지 확인합니다."""
+        return bool((self.data[indices, VISIBILITY] >= min_visibility).all())
+
+    def pixels(self, width, height):
+        """
+        픽셀 좌표 (33, 2) int32 뷰를 반환합니다. 내부 버퍼를 재사용하므로 다음 호출 전까지만 유효합니다.
+        """
+        self._pixel_scale[0] = width
+        self._pixel_scale[1] = height
+        np.multiply(self.data[:, :2], self._pixel_scale, out=self._pixels, casting='unsafe')
+        return self._pixels
+
+    def copy(self):
+        """버퍼를 복사한 독립 프레임(오래 보관해야 하는 경우용)."""
+        frame = LandmarkFrame()
+        frame.data[:] = self.data
+        frame.valid = self.valid
+        frame.timestamp = self.timestamp
+        return frame
+
+    def tolist(self):
+        """기존 형식의 [[x, y, z], ...] 리스트(감지 실패 시 빈 리스트)."""
+        return self.data[:, :3].tolist() if self.valid else []
+
+
+class LandmarkRing:
+    """
+    미리 할당한 LandmarkFrame 묶음을 돌아가며 사용합니다.
+    파이프라인에서 동시에 살아 있는 프레임 수(큐 크기 × 단계 수)보다 size를 크게 잡으면
+    하위 단계가 읽는 동안 버퍼가 덮어써지지 않습니다.
+    """
+    def __init__(self, size=8):
+        self._frames = [LandmarkFrame() for _ in range(size)]
+        self._next = 0
+
+    def next(self):
+        """다음 차례의 프레임 버퍼를 반환합니다."""
+        frame = self._frames[self._next]
+        self._next = (self._next + 1) % len(self._frames)
+        return frame
@@ -5,197 +5,349 @@ PyCharm 프로젝트 설정 및 라이브러리 설치 안내
    pip install opencv-python mediapipe numpy gTTS playsound pillow pygame
    - 음성 피드백은 gTTS + pygame mixer를 사용합니다.
 3) 실행: python main.py (또는 PyCharm에서 Run)
+   - 녹화 영상 일괄 분석(헤드리스): python batch_analysis.py <영상 또는 디렉터리> -o <결과 디렉터리>
+   - 랜드마크 세션 기록 후 임계값을 바꿔 재분석: python main.py --record today.plog
+     → python session_log.py reanalyze today.plog --cva-min 65
+     → python threshold_sweep.py today.plog --labels labels.csv  (임계값 조합 수천 개를 한 번에 평가/보정)
+   - 자세 규칙을 설정 파일로 조정(저장하면 바로 반영): python main.py --rules rules.json
+   - 일/시간별 자세 통계 저장 후 보고: python main.py --analytics → python analytics_store.py report --from 2026-10-01
+   - 창 없이 하루 종일 저전력으로 실행(헤드리스, 안정 시 1초에 한 번 추론): python background_service.py
+   - 여러 작업 공간 동시 모니터링(헤드리스): python stream_server.py <카메라 번호/URL/영상 ...> --workers 4
+   - 시작 시간 측정(모듈 로드, 첫 프레임, 모델/오디오 준비): python -m benchmarks.bench_startup
 팁:
 - q 키를 누르면 종료됩니다.
 - MediaPipe Pose로 33개 랜드마크를 검출하여 화면에 시각화합니다.
 - 계산된 각도를 기준 임계값과 비교하여 텍스트/음성 피드백을 제공합니다.
+- 창과 카메라는 바로 열리고, 포즈 모델과 오디오는 백그라운드에서 준비됩니다(그동안 화면에 'Warming up' 표시).
 """
-import cv2
 import time
-import os
-import warnings
+
+_STARTED_AT = time.perf_counter()  # 시작 시간 측정 기준(무거운 모듈을 불러오기 전)
+
+import argparse
+import cv2
 import numpy as np
-from typing import List, Tuple
+import warnings
 
 # Protobuf/3rd-party deprecation warnings can spam the console; hide them.
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 # Filter specific noisy protobuf UserWarning: 'SymbolDatabase.GetPrototype() is deprecated.'
 warnings.filterwarnings("ignore", message=".*GetPrototype\(\) is deprecated.*")
 
-# PIL (Pillow) for proper Korean text rendering on frames
-try:
-    from PIL import ImageFont, ImageDraw, Image
-    PIL_AVAILABLE = True
-except Exception:
-    PIL_AVAILABLE = False
-
 # 다른 모듈에서 클래스와 함수를 가져옵니다.
-from pose_detector import PoseDetector  # 자세 감지 모듈
+from pose_detector import PoseDetector, DeferredDetector  # 자세 감지 모듈(백그라운드 예열)
+from adaptive_scheduler import AdaptiveInferenceScheduler  # 지연 예산 기반 추론 스케줄러
 from ergonomics_rules import (  # 인체공학 규칙 분석 모듈
     analyze_head_posture,
     analyze_shoulder_posture,
     analyze_elbow_posture,
     analyze_eye_level,
+    is_issue,
+    MIN_VISIBILITY,
 )
 from feedback_handler import FeedbackHandler  # 피드백 처리 모듈
-
-# ---- Text rendering helpers (support Korean) ----
-_warned_text_fallback = False  # 한글 폰트 경고 메시지가 한 번만 출력되도록 하는 플래그
+from feedback_dispatcher import (  # 프레임 루프 밖 피드백 전달
+    FeedbackDispatcher,
+    FeedbackEvent,
+    ConsoleSink,
+    VoiceSink,
+    JsonlFileSink,
+    WebhookSink,
+)
+from pipeline import PosturePipeline  # 캡처/추론/분석/표시 파이프라인
+from renderer import draw_text_multiline  # 한글 텍스트 오버레이 (스프라이트 캐시)
+from landmark_filter import LandmarkSmoother, StatusStateMachine  # 랜드마크 평활/예측, 상태 히스테리시스
+from instrumentation import Instrumentation, MetricsExporter, DISABLED  # 구간 계측/HUD/내보내기
+from rule_engine import RuleEngine  # 선언형 규칙(설정 파일, 자동 다시 읽기)
+from session_log import SessionRecorder  # 랜드마크 세션 기록(메모리 매핑 재분석용)
+from analytics_store import AnalyticsStore, DEFAULT_DB_PATH  # 분/시/일 롤업 통계 저장소
 
 
-def _find_korean_font() -> str | None:
+def analyze_items(landmarks, min_visibility=None):
     """
-    시스템에서 한글 렌더링이 가능한 폰트를 탐색해 경로를 반환합니다.
-    - macOS/Windows/Linux의 대표 경로를 순회합니다.
-    - 찾지 못하면 None을 반환합니다.
+    랜드마크로 4가지 항목(목, 어깨, 시선, 팔꿈치)을 분석합니다.
+    landmarks는 [x,y,z] 리스트 또는 LandmarkFrame입니다.
+    min_visibility를 지정하면 visibility가 낮은 관절의 항목은 판단을 보류(UNKNOWN)합니다.
+    노트북 전면 카메라에서는 엉덩이가 화면 밖이라 어깨 항목이 늘 보류되므로 기본값은 None(보류 안 함)입니다.
+    - 반환: [(항목, 상태, 문구)] 리스트. 랜드마크가 없으면 빈 리스트.
     """
-    candidates = [
-        "/System/Library/Fonts/AppleSDGothicNeo.ttc",  # macOS default
-        "/Library/Fonts/AppleSDGothicNeo.ttc",
-        os.path.expanduser("~/Library/Fonts/AppleSDGothicNeo.ttc"),
-        "/Library/Fonts/NanumGothic.ttf",
-        "/System/Library/Fonts/Supplemental/NanumGothic.ttf",
-        "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
-        "/usr/share/fonts/truetype/noto/NotoSansKR-Regular.otf",
-        "C:/Windows/Fonts/malgun.ttf",  # Windows
+    if not landmarks:
+        return []
+    return [
+        ('head',) + analyze_head_posture(landmarks, min_visibility),
+        ('shoulder',) + analyze_shoulder_posture(landmarks, min_visibility),
+        ('eye',) + analyze_eye_level(landmarks, min_visibility),
+        ('elbow',) + analyze_elbow_posture(landmarks, min_visibility),
     ]
-    for p in candidates:
-        if os.path.exists(p):
-            return p
-    return None
 
-_KR_FONT_PATH = _find_korean_font()  # 시스템에서 한글 폰트 경로를 찾습니다.
 
-
-def draw_text_multiline(
-    img: np.ndarray,
-    lines: List[Tuple[str, Tuple[int, int, int]]],
-    org: Tuple[int, int] = (10, 30),
-    font_size: int = 24,
-    line_gap: int = 6,
-) -> None:
+def analyze_posture(landmarks):
     """
-    프레임에 여러 줄의 텍스트를 그립니다.
-    lines의 각 항목은 (text, bgr_color) 형식입니다. PIL을 사용하여 한글을 올바르게 렌더링합니다.
+    랜드마크로 4가지 항목(목, 어깨, 시선, 팔꿈치)을 분석합니다(한 프레임만 보고 판단, 히스테리시스 없음).
+    - 반환: (current_status, current_issue, overlay_lines).
+            current_status/current_issue는 음성/1순위 피드백용 첫 번째 문제의 상태와 메시지(없으면 None),
+            overlay_lines는 화면에 표시할 (text, bgr_color) 리스트입니다.
     """
-    global _warned_text_fallback
-
-    if PIL_AVAILABLE and _KR_FONT_PATH:
-        # 이미지를 BGR에서 RGB로 변환하고 PIL 이미지로 만듭니다.
-        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        pil_img = Image.fromarray(rgb)
-        draw = ImageDraw.Draw(pil_img)
-        try:
-            font = ImageFont.truetype(_KR_FONT_PATH, font_size)
-        except Exception:
-            font = ImageFont.load_default()  # 폰트 로드 실패 시 기본 폰트 사용
-
-        x, y = org
-        for text, bgr in lines:
-            color_rgb = (bgr[2], bgr[1], bgr[0])  # BGR을 RGB로 변환
-            draw.text((x, y), text, fill=color_rgb, font=font)
-            # 텍스트의 높이를 측정하여 다음 줄의 y 좌표를 계산합니다.
-            try:
-                bbox = draw.textbbox((0, 0), text, font=font)
-                h = bbox[3] - bbox[1]
-            except Exception:
-                h = font_size + 4
-            y += h + line_gap
-
-        # 이미지를 다시 OpenCV BGR 형식으로 변환합니다.
-        img[:] = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+    items = analyze_items(landmarks)
+    if not items:
+        return None, None, []
+    return _summarize([(status, msg) for _, status, msg in items])
+
+
+def _summarize(issues):
+    """(상태, 문구) 리스트에서 1순위 문제와 화면 문구(상위 3개 문제 또는 '좋은 자세입니다.')를 만듭니다."""
+    current_status = None  # 현재 프레임에서 감지된 문제의 상태
+    current_issue = None  # 현재 프레임에서 감지된 문제
+    overlay_lines = []  # 화면에 표시할 텍스트 라인
+
+    # 음성/1순위 피드백용 첫 번째 문제를 선택합니다.
+    for status, msg in issues:
+        if is_issue(status):
+            current_status, current_issue = status, msg
+            break
+
+    if current_issue is None:
+        # 모든 상태가 양호한 경우
+        overlay_lines = [("좋은 자세입니다.", (0, 200, 0))]
     else:
-        # PIL을 사용할 수 없으면 OpenCV의 기본 폰트를 사용합니다 (한글 깨짐 발생 가능).
-        if not _warned_text_fallback:
-            print("[안내] 한글 텍스트가 물음표(????)로 보이면 'pip install pillow' 설치 및 한글 폰트(Apple SD Gothic 등)를 시스템에 설치해 주세요.")
-            _warned_text_fallback = True
-        x, y = org
-        for text, bgr in lines:
-            cv2.putText(img, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, bgr, 2)
-            y += int(font_size * 1.4) + line_gap
-
-def main():
+        # 화면에는 상위 3개의 이슈를 동시에 표시합니다.
+        for status, msg in issues:
+            if is_issue(status):
+                overlay_lines.append((msg, (0, 0, 255)))
+                if len(overlay_lines) >= 3:
+                    break
+    return current_status, current_issue, overlay_lines
+
+
+class PostureFeedback:
     """
-    메인 루프: 웹캠 프레임에서 포즈를 추정하고 4가지 항목(목, 어깨, 팔꿈치, 시선)을 분석해 피드백 제공합니다.
-    노트북 전면 카메라 한계로 등/허리 평가는 제외됩니다. 'q' 키로 종료.
+    평활된 랜드마크로 자세를 분석하고, 항목별 상태 히스테리시스로 화면 문구와 피드백 이벤트를 안정화합니다.
+    - 화면: 상태가 DISPLAY_ON_SECONDS(문제) / DISPLAY_OFF_SECONDS(양호) 동안 유지되어야 문구가 바뀝니다.
+    - 피드백: 문제가 ISSUE_THRESHOLD_SECONDS 이상 지속되면 이벤트를 보내고, 계속되면 같은 간격으로 반복합니다.
+    상태는 문구가 아니라 상태 코드로 비교하므로 각도 숫자가 조금 흔들려도 타이머가 초기화되지 않습니다.
+    파이프라인의 분석 단계 스레드에서 호출되며, 피드백 전달은 FeedbackDispatcher에 큐잉만 합니다.
     """
-    cap = cv2.VideoCapture(0)  # 웹캠을 엽니다 (0은 기본 카메라).
-    detector = PoseDetector()  # 자세 감지기 객체를 생성합니다.
-    feedback = FeedbackHandler()  # 피드백 처리기 객체를 생성합니다.
+    ISSUE_THRESHOLD_SECONDS = 2.0  # 동일한 문제가 지속될 때 피드백을 제공하기 위한 시간 임계값
+    ISSUE_CLEAR_SECONDS = 1.0      # 문제가 해소된 것으로 확정하기 위한 시간
+    DISPLAY_ON_SECONDS = 0.3
+    DISPLAY_OFF_SECONDS = 0.5
 
-    last_posture_issue = None  # 마지막으로 감지된 자세 문제
-    issue_start_time = None  # 문제가 시작된 시간
-    ISSUE_THRESHOLD_SECONDS = 2.0  # 동일한 문제가 지속될 때 피드백을 제공하기 위한 시간 임계값 (3초)
+    def __init__(self, dispatcher, smoother=None, instrumentation=None, recorder=None, rules=None, analytics=None,
+                 min_visibility=None):
+        self.dispatcher = dispatcher  # FeedbackDispatcher
+        self.min_visibility = min_visibility  # analyze_items의 판단 보류 기준(None이면 보류 안 함)
+        self.analytics = analytics  # AnalyticsStore (분석 결과를 분/시/일 롤업으로 저장, None이면 저장 안 함)
+        self.rules = rules  # RuleEngine (None이면 ergonomics_rules의 분석 함수 사용)
+        self.recorder = recorder  # SessionRecorder (평활 전 원본 랜드마크를 기록, None이면 기록 안 함)
+        self.smoother = smoother  # LandmarkSmoother (None이면 원본 랜드마크 사용)
+        self.instrumentation = instrumentation or DISABLED  # 구간 계측(analysis.*)
+        self.alert_state = StatusStateMachine(self.ISSUE_THRESHOLD_SECONDS, self.ISSUE_CLEAR_SECONDS,
+                                              repeat_seconds=self.ISSUE_THRESHOLD_SECONDS)
+        self.display_state = StatusStateMachine(self.DISPLAY_ON_SECONDS, self.DISPLAY_OFF_SECONDS)
+        self._issue_messages = {}  # 항목 → 마지막으로 관측한 문제 문구
 
-    while cap.isOpened():  # 웹캠이 열려있는 동안 루프를 실행합니다.
-        success, img = cap.read()  # 웹캠에서 프레임을 읽습니다.
-        if not success:
-            break
+    def update(self, items, t):
+        """항목별 분석 결과로 상태를 갱신하고, 확정된 문제의 피드백 이벤트를 보냅니다."""
+        if not items:
+            # 사람이 보이지 않으면 상태를 초기화합니다.
+            self.alert_state.reset()
+            self.display_state.reset()
+            self._issue_messages.clear()
+            return
+        statuses = {}
+        for item, status, msg in items:
+            statuses[item] = status
+            if is_issue(status):
+                self._issue_messages[item] = msg
+        self.display_state.update(statuses, t)
+        for item, status in self.alert_state.update(statuses, t):
+            extra = None
+            if self.rules is not None:
+                extra = {'item': item, 'severity': self.rules.severity(item)}
+            self.dispatcher.dispatch(FeedbackEvent(status, self._issue_messages[item], extra=extra))
 
-        img = cv2.flip(img, 1)  # 프레임을 좌우로 반전시켜 거울 모드로 만듭니다.
-        img = detector.find_pose(img, draw=True)  # 프레임에서 자세를 감지하고 랜드마크를 그립니다.
-        landmarks = detector.find_landmarks(img)  # 감지된 랜드마크 좌표를 가져옵니다.
-
-        current_issue = None  # 현재 프레임에서 감지된 문제
-        overlay_lines = []  # 화면에 표시할 텍스트 라인
-        if landmarks:
-            # 자세 분석: 4가지 항목을 평가합니다.
-            head_status, head_msg = analyze_head_posture(landmarks)
-            shoulder_status, shoulder_msg = analyze_shoulder_posture(landmarks)
-            eye_status, eye_msg = analyze_eye_level(landmarks)
-            elbow_status, elbow_msg = analyze_elbow_posture(landmarks)
-
-            issues = [
-                (head_status, head_msg),
-                (shoulder_status, shoulder_msg),
-                (eye_status, eye_msg),
-                (elbow_status, elbow_msg),
-            ]
-
-            # 음성/1순위 피드백용 첫 번째 문제를 선택합니다.
-            for status, msg in issues:
-                if status != 'GOOD':
-                    current_issue = msg
-                    break
+    def analyze(self, packet):
+        """파이프라인 분석 단계: 랜드마크를 평활/예측하고 자세를 분석한 뒤 프레임에 문구를 그립니다."""
+        instr = self.instrumentation
+        if self.recorder is not None:
+            with instr.span('analysis.record'):
+                self.recorder.append(packet.landmarks)
+        if self.smoother is not None:
+            with instr.span('analysis.smooth'):
+                packet.landmarks = self.smoother.process(packet.landmarks, packet.capture_time)
+        with instr.span('analysis.rules'):
+            items = (analyze_items(packet.landmarks, self.min_visibility) if self.rules is None
+                     else self.rules.evaluate(packet.landmarks))
+        self.update(items, packet.capture_time)
+        if self.analytics is not None:
+            with instr.span('analysis.analytics'):
+                self.analytics.record(items, packet.landmarks)
 
-            if current_issue is None:
-                # 모든 상태가 양호한 경우
-                overlay_lines = [("좋은 자세입니다.", (0, 200, 0))]
-            else:
-                # 화면에는 상위 3개의 이슈를 동시에 표시합니다.
-                for status, msg in issues:
-                    if status != 'GOOD':
-                        overlay_lines.append((msg, (0, 0, 255)))
-                        if len(overlay_lines) >= 3:
-                            break
+        if items:
+            # 화면 문구는 히스테리시스로 확정된 상태를 기준으로 만듭니다.
+            shown = [(self.display_state.confirmed.get(item, 'GOOD'), item) for item, _, _ in items]
+            packet.current_status, packet.current_issue, packet.overlay_lines = _summarize(
+                [(status, self._issue_messages.get(item)) for status, item in shown])
+        else:
+            packet.current_status, packet.current_issue, packet.overlay_lines = None, None, []
 
         # 화면에 텍스트 피드백을 표시합니다.
-        if overlay_lines:
-            draw_text_multiline(img, overlay_lines, org=(10, 30), font_size=40, line_gap=8)
-
-        # 피드백 로직
-        if current_issue and "좋은 자세입니다." not in current_issue:
-            if current_issue != last_posture_issue:
-                # 새로운 문제가 감지되면, 문제와 시작 시간을 기록합니다.
-                last_posture_issue = current_issue
-                issue_start_time = time.time()
-            elif time.time() - issue_start_time > ISSUE_THRESHOLD_SECONDS:
-                # 동일한 문제가 3초 이상 지속되면 텍스트 및 음성 피드백을 제공합니다.
-                feedback.provide_text_feedback(current_issue)
-                feedback.provide_voice_feedback(current_issue)
-                issue_start_time = time.time()  # 피드백 후 타이머를 리셋합니다.
-        else:
-            # 문제가 없으면 상태를 초기화합니다.
-            last_posture_issue = None
-            issue_start_time = None
+        if packet.overlay_lines:
+            with instr.span('analysis.text'):
+                draw_text_multiline(packet.img, packet.overlay_lines, org=(10, 30), font_size=40, line_gap=8)
+        return packet
 
-        cv2.imshow("Ergonomic Workspace Analyzer", img)  # 화면에 이미지를 표시합니다.
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):  # 'q' 키를 누르면 루프를 종료합니다.
-            break
+def parse_args(argv=None):
+    """명령행 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(description="실시간 인체공학 자세 분석")
+    parser.add_argument("--tts-backend", default='gtts', help="음성 합성 백엔드: gtts(온라인) 또는 pyttsx3(오프라인)")
+    parser.add_argument("--feedback-log", help="피드백 이벤트를 JSONL로 기록할 파일 경로")
+    parser.add_argument("--webhook", help="피드백 이벤트를 POST할 로컬 HTTP 주소")
+    parser.add_argument("--budget-ms", type=float, default=40.0, help="프레임당 추론 지연 예산(ms, 기본 40)")
+    parser.add_argument("--no-adaptive", action='store_true', help="적응형 추론 스케줄러 없이 매 프레임 전체 해상도로 추론")
+    parser.add_argument("--inference-hz", type=float, default=None,
+                        help="초당 최대 추론 횟수(예: 8). 사이 프레임은 랜드마크 예측으로 보간합니다.")
+    parser.add_argument("--no-smoothing", action='store_true', help="랜드마크 시간 필터/예측을 끕니다")
+    parser.add_argument("--instrument", action='store_true', help="단계별 지연 계측을 켭니다(종료 시 요약 출력)")
+    parser.add_argument("--hud", action='store_true', help="화면에 FPS와 단계별 p50/p99를 표시합니다(계측 켜짐)")
+    parser.add_argument("--metrics-jsonl", help="계측 스냅샷을 주기적으로 덧붙일 JSONL 파일(계측 켜짐)")
+    parser.add_argument("--metrics-prom", help="Prometheus 텍스트 형식으로 주기적으로 쓸 파일(계측 켜짐)")
+    parser.add_argument("--min-visibility", type=float, nargs='?', const=MIN_VISIBILITY, default=None,
+                        help=f"관절 visibility가 이 값보다 낮은 항목은 판단을 보류합니다(값 생략 시 {MIN_VISIBILITY}, 기본: 끔). --rules와 함께 쓰면 규칙 파일의 값 대신 적용합니다")
+    parser.add_argument("--rules", help="선언형 규칙 파일(예: rules.json). 저장하면 실행 중에 다시 읽습니다.")
+    parser.add_argument("--record", help="랜드마크를 세션 로그(.plog)에 덧붙여 기록할 경로(session_log.py로 재분석)")
+    parser.add_argument("--record-hz", type=float, default=10.0, help="세션 로그 최대 기록 빈도(Hz, 기본 10)")
+    parser.add_argument("--analytics", nargs='?', const=DEFAULT_DB_PATH,
+                        help=f"분석 결과를 시계열 통계 저장소(SQLite)에 기록합니다(경로 생략 시 {DEFAULT_DB_PATH})")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="계측 내보내기 주기(초, 기본 10)")
+    parser.add_argument("--source", default='0', help="카메라 번호 또는 영상 파일/스트림 주소(기본 0)")
+    parser.add_argument("--no-window", action='store_true', help="창을 띄우지 않습니다(시작 시간 측정/CI용)")
+    parser.add_argument("--startup-report", action='store_true',
+                        help="첫 프레임, 모델 준비, 오디오 준비까지 걸린 시간을 출력합니다")
+    return parser.parse_args(argv)
+
+
+WINDOW_NAME = "Ergonomic Workspace Analyzer"
+
+
+def _open_source(source):
+    """숫자면 카메라 번호로, 아니면 파일/스트림 주소로 엽니다."""
+    return cv2.VideoCapture(int(source) if source.isdigit() else source)
+
+
+def _draw_warmup_banner(img, detector, feedback):
+    """모델/오디오가 준비 중이거나 실패했으면 화면 아래에 상태를 표시합니다(ASCII라 폰트 없이 그립니다)."""
+    if detector.error is not None:
+        text = "Pose model unavailable"
+    else:
+        pending = [name for name, waiting in (('pose model', detector.warming_up),
+                                             ('audio', not feedback.ready.is_set())) if waiting]
+        if not pending:
+            return
+        text = "Warming up: " + ", ".join(pending)
+    org = (10, img.shape[0] - 15)
+    cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 4, cv2.LINE_AA)
+    cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 220, 255), 2, cv2.LINE_AA)
+
+
+class _StartupReport:
+    """시작 시점(_STARTED_AT)부터 각 준비 단계까지 걸린 시간을 한 번씩 출력합니다."""
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.reported = set()
+
+    def mark(self, name, done=True):
+        if self.enabled and done and name not in self.reported:
+            self.reported.add(name)
+            print(f"[시작] {name} {(time.perf_counter() - _STARTED_AT) * 1000.0:.0f} ms", flush=True)
+
+
+def build_dispatcher(args, feedback):
+    """명령행 인자에 따라 싱크를 구성한 FeedbackDispatcher를 만듭니다."""
+    sinks = [ConsoleSink(), VoiceSink(feedback)]
+    if args.feedback_log:
+        sinks.append(JsonlFileSink(args.feedback_log))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    return FeedbackDispatcher(sinks)
+
+
+def main(argv=None):
+    """
+    메인 루프: 웹캠 프레임에서 포즈를 추정하고 4가지 항목(목, 어깨, 팔꿈치, 시선)을 분석해 피드백 제공합니다.
+    캡처/추론/분석/표시는 PosturePipeline의 단계별 스레드로 동작하며, 추론이 느리면 오래된 프레임은 버려집니다.
+    피드백(콘솔/음성/파일/웹훅)은 FeedbackDispatcher 작업 스레드에서 전달되어 프레임 루프를 막지 않습니다.
+    노트북 전면 카메라 한계로 등/허리 평가는 제외됩니다. 'q' 키로 종료.
+    """
+    args = parse_args(argv)
+    startup = _StartupReport(args.startup_report)
+    startup.mark('imported')
+    if not args.no_window:
+        # 모델을 기다리지 않고 창부터 띄웁니다.
+        cv2.namedWindow(WINDOW_NAME)
+        cv2.imshow(WINDOW_NAME, np.zeros((480, 640, 3), dtype=np.uint8))
+        cv2.waitKey(1)
+    cap = _open_source(args.source)  # 웹캠을 엽니다 (0은 기본 카메라).
+
+    def build_detector():
+        detector = PoseDetector().warm_up()  # 자세 감지기 객체를 생성하고 예열합니다.
+        if not args.no_adaptive:
+            # 정적 장면 건너뛰기/ROI 자르기/입력 축소/모델 크기 조정으로 지연 예산을 지킵니다.
+            detector = AdaptiveInferenceScheduler(detector, budget_ms=args.budget_ms,
+                                                  max_inference_hz=args.inference_hz)
+        return detector
+
+    detector = DeferredDetector(build_detector)  # 준비될 때까지 프레임은 추론 없이 그대로 표시됩니다.
+    instrumentation = Instrumentation(
+        enabled=bool(args.instrument or args.hud or args.metrics_jsonl or args.metrics_prom))
+    exporter = MetricsExporter(instrumentation, args.metrics_jsonl, args.metrics_prom,
+                               interval=args.metrics_interval).start()
+    feedback = FeedbackHandler(tts_backend=args.tts_backend)  # 피드백 처리기 객체를 생성합니다.
+    dispatcher = build_dispatcher(args, feedback).start()
+    recorder = SessionRecorder(args.record, min_interval=1.0 / args.record_hz) if args.record else None
+    analytics = AnalyticsStore(args.analytics).start() if args.analytics else None
+    session = PostureFeedback(dispatcher, smoother=None if args.no_smoothing else LandmarkSmoother(),
+                              instrumentation=instrumentation, recorder=recorder,
+                              rules=RuleEngine(args.rules, min_visibility=args.min_visibility) if args.rules else None, analytics=analytics,
+                              min_visibility=args.min_visibility)
+
+    pipeline = PosturePipeline(cap, detector, session.analyze, instrumentation=instrumentation).start()
+    try:
+        for packet in pipeline.frames():
+            startup.mark('first_frame')
+            startup.mark('model_ready', detector.ready.is_set())
+            startup.mark('audio_ready', feedback.ready.is_set())
+            _draw_warmup_banner(packet.img, detector, feedback)
+            if args.hud:
+                instrumentation.draw_hud(packet.img)
+            if args.no_window:
+                continue
+            with instrumentation.span('display.imshow'):
+                cv2.imshow(WINDOW_NAME, packet.img)  # 화면에 이미지를 표시합니다.
 
-    cap.release()  # 웹캠을 해제합니다.
-    cv2.destroyAllWindows()  # 모든 창을 닫습니다.
+            if cv2.waitKey(1) & 0xFF == ord('q'):  # 'q' 키를 누르면 루프를 종료합니다.
+                break
+    finally:
+        pipeline.stop()
+        dispatcher.stop()
+        print(f"[파이프라인] {pipeline.format_stats()}")
+        print(f"[피드백] {dispatcher.stats()}")
+        if detector.detector is not None and not args.no_adaptive:
+            print(f"[추론 스케줄러] {detector.stats()}")
+        exporter.stop()
+        if recorder is not None:
+            recorder.close()
+            print(f"[세션 기록] {args.record}: {recorder.count}개 레코드")
+        if analytics is not None:
+            analytics.stop()
+            print(f"[분석 저장소] {args.analytics}: {analytics.stats()}")
+        if instrumentation.enabled:
+            for name, row in instrumentation.snapshot()['stages'].items():
+                print(f"[계측] {name}: p50 {row['p50_ms'] or 0:.1f}ms p99 {row['p99_ms'] or 0:.1f}ms "
+                      f"max {row['max_ms']:.1f}ms n={row['count']}")
+        cap.release()  # 웹캠을 해제합니다.
+        cv2.destroyAllWindows()  # 모든 창을 닫습니다.
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
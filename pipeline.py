@@ -0,0 +1,251 @@
+"""
+캡처 / 포즈 추론 / 분석·피드백 / 화면 표시를 단계별 스레드로 분리한 파이프라인.
+- 각 단계는 크기가 제한된 LatestQueue로 연결되며, 큐가 가득 차면 가장 오래된 프레임을 버리고 최신 프레임을 유지합니다.
+- 추론이 느려도 카메라 드라이버 버퍼에 프레임이 쌓이지 않으므로 화면 지연이 약 1회 추론 시간 수준으로 유지됩니다.
+- 화면 표시(cv2.imshow)는 macOS 제약 때문에 호출한 스레드(메인 스레드)에서 frames()를 순회하며 수행합니다.
+"""
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from instrumentation import DISABLED
+
+
+class LatestQueue:
+    """
+    최신 항목 우선 큐. maxsize를 넘으면 가장 오래된 항목을 버리고 dropped를 증가시킵니다.
+    close() 이후 큐가 비면 get()은 None을 반환하여 하위 단계에 종료를 알립니다.
+    """
+    def __init__(self, maxsize=1):
+        self._items = deque()
+        self._maxsize = maxsize
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0  # 오래되어 버려진 항목 수
+
+    def put(self, item):
+        """항목을 넣습니다. 가득 차 있으면 가장 오래된 항목을 버립니다."""
+        with self._cond:
+            if self._closed:
+                return
+            while len(self._items) >= self._maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        가장 오래된(남아 있는 것 중) 항목을 꺼냅니다.
+        - 반환: 항목. 닫힌 큐가 비었거나 timeout이 지나면 None.
+        """
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        """큐를 닫습니다. 남은 항목은 계속 꺼낼 수 있습니다."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class FramePacket:
+    """파이프라인 단계 사이를 오가는 프레임 단위 데이터."""
+    __slots__ = ('index', 'capture_time', 'img', 'landmarks', 'overlay_lines', 'current_status', 'current_issue')
+
+    def __init__(self, index, capture_time, img):
+        self.index = index                # 캡처 순번
+        self.capture_time = capture_time  # time.perf_counter() 기준 캡처 시각
+        self.img = img                    # BGR 프레임
+        self.landmarks = []               # 추론 단계에서 채워지는 랜드마크(LandmarkFrame)
+        self.overlay_lines = []           # 분석 단계에서 채워지는 화면 표시 문구
+        self.current_status = None        # 분석 단계에서 선택한 1순위 문제의 상태
+        self.current_issue = None         # 분석 단계에서 선택한 1순위 문제
+
+
+class _StageStats:
+    """단계별 처리 수와 처리 시간(이동 평균)을 기록합니다."""
+    def __init__(self):
+        self.processed = 0
+        self.busy_ms = 0.0  # 지수 이동 평균 처리 시간(ms)
+
+    def record(self, elapsed_s):
+        ms = elapsed_s * 1000.0
+        self.busy_ms = ms if self.processed == 0 else 0.9 * self.busy_ms + 0.1 * ms
+        self.processed += 1
+
+
+class _WorkerStage(threading.Thread):
+    """입력 큐에서 패킷을 꺼내 func(packet)을 적용한 뒤 출력 큐로 넘기는 단계 스레드."""
+    def __init__(self, name, func, in_queue, out_queue, stop_event):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.stats = _StageStats()
+        self.error = None
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                packet = self.in_queue.get(timeout=0.1)
+                if packet is None:
+                    if self.in_queue.closed:
+                        break
+                    continue
+                t0 = time.perf_counter()
+                packet = self.func(packet)
+                self.stats.record(time.perf_counter() - t0)
+                if packet is not None:
+                    self.out_queue.put(packet)
+        except Exception as e:
+            self.error = e
+            print(f"[파이프라인] {self.name} 단계 오류: {e}")
+        finally:
+            self.out_queue.close()
+
+
+class PosturePipeline:
+    """
+    캡처 → 포즈 추론 → 분석/피드백 → 표시 4단계 파이프라인.
+    - cap: cv2.VideoCapture 호환 객체 (read() 제공)
+    - detector: PoseDetector
+    - analyze: FramePacket을 받아 overlay_lines/current_issue를 채우고 프레임에 문구를 그린 뒤 반환하는 함수
+    - queue_size: 단계 사이 큐 크기(기본 1 = 항상 최신 프레임만 유지)
+    - mirror: True이면 캡처 직후 좌우 반전(거울 모드)
+    - instrumentation: instrumentation.Instrumentation(생략 시 비활성). capture.read / infer.find_pose /
+      display 구간과 latency.capture_to_display를 기록합니다.
+    사용법: start() 후 메인 스레드에서 frames()를 순회하며 cv2.imshow를 호출하고, 끝나면 stop().
+    """
+    def __init__(self, cap, detector, analyze, queue_size=1, mirror=True, instrumentation=None):
+        self.cap = cap
+        self.detector = detector
+        self.mirror = mirror
+        self.instrumentation = instrumentation or DISABLED
+        self._stop = threading.Event()
+
+        self.infer_queue = LatestQueue(queue_size)
+        self.analysis_queue = LatestQueue(queue_size)
+        self.display_queue = LatestQueue(queue_size)
+
+        self.capture_stats = _StageStats()
+        self._capture_thread = threading.Thread(target=self._capture_loop, name="capture", daemon=True)
+        self._stages = [
+            _WorkerStage("inference", self._infer, self.infer_queue, self.analysis_queue, self._stop),
+            _WorkerStage("analysis", analyze, self.analysis_queue, self.display_queue, self._stop),
+        ]
+        self.display_stats = _StageStats()
+        self.latency_ms = 0.0  # 캡처→표시 지연(지수 이동 평균)
+        self._started_at = None
+
+    def _capture_loop(self):
+        """카메라 프레임을 최대 속도로 읽어 추론 큐에 넣습니다(오래된 프레임은 큐에서 버려짐)."""
+        index = 0
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                with self.instrumentation.span('capture.read'):
+                    success, img = self.cap.read()
+                if not success:
+                    break
+                if self.mirror:
+                    img = cv2.flip(img, 1)
+                self.infer_queue.put(FramePacket(index, t0, img))
+                self.capture_stats.record(time.perf_counter() - t0)
+                index += 1
+        except Exception as e:
+            print(f"[파이프라인] capture 단계 오류: {e}")
+        finally:
+            self.infer_queue.close()
+
+    def _infer(self, packet):
+        """포즈 추론 단계: 랜드마크를 그리고 좌표를 패킷에 저장합니다."""
+        with self.instrumentation.span('infer.find_pose'):
+            packet.img = self.detector.find_pose(packet.img, draw=True)
+        packet.landmarks = self.detector.find_landmark_frame()  # 재사용 버퍼(복사 없음)
+        return packet
+
+    def start(self):
+        """모든 작업 스레드를 시작합니다."""
+        self._started_at = time.perf_counter()
+        for stage in self._stages:
+            stage.start()
+        self._capture_thread.start()
+        return self
+
+    def frames(self):
+        """
+        표시할 프레임 패킷을 순서대로 내보내는 제너레이터(메인 스레드에서 사용).
+        캡처가 끝나고 모든 큐가 비거나 stop()이 호출되면 종료됩니다.
+        """
+        while not self._stop.is_set():
+            packet = self.display_queue.get(timeout=0.1)
+            if packet is None:
+                if self.display_queue.closed:
+                    break
+                continue
+            t0 = time.perf_counter()
+            latency = (t0 - packet.capture_time) * 1000.0
+            self.latency_ms = latency if self.display_stats.processed == 0 else 0.9 * self.latency_ms + 0.1 * latency
+            self.instrumentation.record('latency.capture_to_display', latency / 1000.0)
+            self.instrumentation.tick()
+            yield packet
+            # 호출 측(imshow/waitKey)이 패킷을 처리하는 데 걸린 시간을 표시 단계 시간으로 기록합니다.
+            elapsed = time.perf_counter() - t0
+            self.display_stats.record(elapsed)
+            self.instrumentation.record('display', elapsed)
+
+    def stop(self, timeout=1.0):
+        """작업 스레드를 종료하고 합류를 기다립니다."""
+        self._stop.set()
+        for q in (self.infer_queue, self.analysis_queue, self.display_queue):
+            q.close()
+        self._capture_thread.join(timeout)
+        for stage in self._stages:
+            stage.join(timeout)
+
+    def stats(self):
+        """
+        단계별 통계를 반환합니다.
+        - 반환: {단계명: {'processed', 'fps', 'busy_ms', 'dropped'}} 와 'latency_ms'(캡처→표시).
+                dropped는 해당 단계의 입력 큐에서 최신 프레임에 밀려 버려진 수입니다.
+        """
+        elapsed = max(time.perf_counter() - (self._started_at or time.perf_counter()), 1e-6)
+        rows = [("capture", self.capture_stats, 0)]
+        rows += [(stage.name, stage.stats, stage.in_queue.dropped) for stage in self._stages]
+        rows.append(("display", self.display_stats, self.display_queue.dropped))
+        report = {
+            name: {
+                'processed': s.processed,
+                'fps': s.processed / elapsed,
+                'busy_ms': s.busy_ms,
+                'dropped': dropped,
+            }
+            for name, s, dropped in rows
+        }
+        report['latency_ms'] = self.latency_ms
+        return report
+
+    def format_stats(self):
+        """stats()를 콘솔 출력용 문자열로 만듭니다."""
+        report = self.stats()
+        parts = [
+            f"{name}: {v['fps']:.1f}fps {v['busy_ms']:.1f}ms drop={v['dropped']}"
+            for name, v in report.items() if name != 'latency_ms'
+        ]
+        return " | ".join(parts) + f" | latency {report['latency_ms']:.0f}ms"
@@ -2,40 +2,109 @@
 Pose detection utility using MediaPipe Pose.
 - Provides a lightweight wrapper to detect and draw pose landmarks.
 - Returns 33 landmarks as normalized [x, y, z] per frame when available.
+- find_landmark_frame() returns a reusable (33, 4) float32 LandmarkFrame (x, y, z, visibility) without per-frame lists.
+- mediapipe is imported on first PoseDetector construction (it takes about a second to import);
+  DeferredDetector builds and warms up the detector in a background thread so the window can open immediately.
 Note: Designed for front-facing laptop cameras; depth(z) is approximate.
 """
+import threading
+import time
+
 import cv2
-import mediapipe as mp
+import numpy as np
+
+from landmark_frame import LandmarkRing
+from renderer import draw_skeleton
+
+
+def _mp_pose():
+    """mediapipe.solutions.pose 모듈(처음 필요할 때 불러옵니다)."""
+    import mediapipe as mp
+    return mp.solutions.pose
+
 
 class PoseDetector:
     """
     MediaPipe Pose 래퍼 클래스.
     - find_pose: 입력 프레임에서 포즈를 추정하고, 옵션에 따라 랜드마크를 그립니다.
     - find_landmarks: 추정된 33개 랜드마크의 [x,y,z] 리스트를 반환합니다.
+    - find_landmark_frame: 추정된 랜드마크를 재사용 버퍼(LandmarkFrame)로 반환합니다(복사 없음).
     """
-    def __init__(self, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    def __init__(self, min_detection_confidence=0.5, min_tracking_confidence=0.5, ring_size=8, model_complexity=1):
         """
         PoseDetector 클래스의 생성자입니다. MediaPipe Pose 모델을 초기화합니다.
         - min_detection_confidence: 자세 감지가 성공한 것으로 간주되는 최소 신뢰도 값.
         - min_tracking_confidence: 랜드마크 추적이 성공한 것으로 간주되는 최소 신뢰도 값.
+        - ring_size: 돌려 쓰는 LandmarkFrame 버퍼 수(파이프라인에서 동시에 처리 중인 프레임 수보다 커야 함).
+        - model_complexity: MediaPipe Pose 모델 크기(0: lite, 1: full, 2: heavy).
         """
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(min_detection_confidence=min_detection_confidence,
-                                      min_tracking_confidence=min_tracking_confidence)
-        self.mp_drawing = mp.solutions.drawing_utils
+        self.mp_pose = _mp_pose()
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.model_complexity = model_complexity
+        self.pose = self._create_pose()
+        self._ring = LandmarkRing(ring_size)
+        self.landmark_frame = self._ring.next().invalidate()
 
-    def find_pose(self, img, draw=True):
+    def _create_pose(self):
+        return self.mp_pose.Pose(model_complexity=self.model_complexity,
+                                 min_detection_confidence=self.min_detection_confidence,
+                                 min_tracking_confidence=self.min_tracking_confidence)
+
+    def set_model_complexity(self, model_complexity):
+        """
+        MediaPipe 모델 크기를 바꿉니다(그래프를 다시 만들므로 자주 호출하지 마세요).
+        새 그래프를 만들 수 없으면(모델 파일 다운로드 실패 등) 기존 그래프를 유지하고 예외를 다시 발생시킵니다.
+        """
+        if model_complexity == self.model_complexity:
+            return
+        previous = self.model_complexity
+        self.model_complexity = model_complexity
+        try:
+            pose = self._create_pose()
+        except Exception:
+            self.model_complexity = previous
+            raise
+        self.pose.close()
+        self.pose = pose
+
+    def find_pose(self, img, draw=True, roi=None, scale=1.0):
         """
         입력 프레임에서 포즈를 추정하고, draw=True이면 랜드마크를 프레임에 그려 반환합니다.
         - 입력: img (BGR ndarray), draw (bool)
+                roi - (x0, y0, x1, y1) 픽셀 영역을 지정하면 그 영역만 잘라 추론합니다.
+                scale - 1보다 작으면 추론 입력을 축소합니다.
         - 반환: 랜드마크가 그려진(또는 원본) BGR 이미지
+        랜드마크는 roi/scale과 관계없이 항상 전체 프레임 기준 정규화 좌표로 저장됩니다.
+        (self.results는 MediaPipe 원본 결과이므로 roi 기준 좌표입니다)
         """
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  # MediaPipe는 RGB 이미지를 사용하므로 변환합니다.
+        h, w = img.shape[:2]
+        x0, y0, x1, y1 = roi if roi is not None else (0, 0, w, h)
+        src = img[y0:y1, x0:x1] if roi is not None else img
+        if scale != 1.0:
+            src = cv2.resize(src, (max(int(src.shape[1] * scale), 1), max(int(src.shape[0] * scale), 1)),
+                             interpolation=cv2.INTER_AREA)
+        img_rgb = cv2.cvtColor(src, cv2.COLOR_BGR2RGB)  # MediaPipe는 RGB 이미지를 사용하므로 변환합니다.
         self.results = self.pose.process(img_rgb)  # 자세 추정을 수행합니다.
-        if self.results.pose_landmarks and draw:
+
+        # 결과를 다음 차례의 재사용 버퍼에 채웁니다(이전 프레임 버퍼는 하위 단계가 계속 읽을 수 있음).
+        frame = self._ring.next()
+        if self.results.pose_landmarks:
+            frame.fill_from_proto(self.results.pose_landmarks, time.perf_counter())
+            if roi is not None:
+                # 잘라낸 영역 기준 좌표를 전체 프레임 기준으로 되돌립니다(z는 x와 같은 폭 기준 스케일).
+                cw, ch = x1 - x0, y1 - y0
+                frame.data[:, 0] = (frame.data[:, 0] * cw + x0) / w
+                frame.data[:, 1] = (frame.data[:, 1] * ch + y0) / h
+                frame.data[:, 2] *= cw / w
+        else:
+            frame.invalidate(time.perf_counter())
+        self.landmark_frame = frame
+
+        if frame and draw:
             # 감지된 랜드마크가 있고 draw 옵션이 True이면, 프레임에 랜드마크와 연결선을 그립니다.
-            self.mp_drawing.draw_landmarks(img, self.results.pose_landmarks,
-                                           self.mp_pose.POSE_CONNECTIONS)
+            # (연결선은 cv2.polylines 한 번으로 그립니다. renderer.draw_skeleton 참고)
+            draw_skeleton(img, frame.data, visibility=frame.visibility)
         return img
 
     def find_landmarks(self, img):
@@ -44,9 +113,80 @@ class PoseDetector:
         - 입력: img (랜드마크가 감지된 이미지 프레임, 현재 구현에서는 사용되지 않음)
         - 반환: 랜드마크 좌표 리스트. 랜드마크가 없으면 빈 리스트를 반환.
         """
-        landmark_list = []
-        if self.results.pose_landmarks:
-            for lm in self.results.pose_landmarks.landmark:
-                # 각 랜드마크의 정규화된 x, y, z 좌표를 리스트에 추가합니다.
-                landmark_list.append([lm.x, lm.y, lm.z])
-        return landmark_list
\ No newline at end of file
+        # 재사용 버퍼에서 정규화된 x, y, z 좌표만 리스트로 만듭니다.
+        return self.landmark_frame.tolist()
+
+    def find_landmark_frame(self):
+        """
+        마지막 find_pose 결과를 LandmarkFrame(33×[x, y, z, visibility] float32 버퍼)으로 반환합니다.
+        - 복사 없이 분석 함수/렌더러/기록기에 그대로 넘길 수 있습니다. 감지 실패 시 bool(frame)이 False입니다.
+        - 버퍼는 ring_size 프레임 뒤에 재사용되므로 오래 보관하려면 frame.copy()를 사용하세요.
+        """
+        return self.landmark_frame
+
+    def warm_up(self, size=(480, 640)):
+        """
+        빈 프레임으로 한 번 추론해 그래프 초기화(모델 로드, 인터프리터 준비) 비용을 미리 치릅니다.
+        결과 랜드마크는 버립니다. 반환: self
+        """
+        self.find_pose(np.zeros((size[0], size[1], 3), dtype=np.uint8), draw=False)
+        self.landmark_frame = self._ring.next().invalidate()
+        return self
+
+
+class DeferredDetector:
+    """
+    PoseDetector(또는 AdaptiveInferenceScheduler)를 백그라운드 스레드에서 만들고 예열하는 대리 객체.
+    - factory: 검출기를 만들어 반환하는 함수(예열까지 포함해도 됨)
+    준비되기 전에는 find_pose가 프레임을 그대로 돌려주고 find_landmark_frame은 빈(미검출) 프레임을 돌려주므로,
+    파이프라인은 바로 시작해 "준비 중" 상태를 표시할 수 있습니다.
+    준비 후에는 모든 호출과 속성(stats 등)을 실제 검출기에 넘깁니다. 생성에 실패하면 error에 예외가 남습니다.
+    """
+    def __init__(self, factory):
+        self.detector = None
+        self.error = None
+        self.ready = threading.Event()
+        self.load_seconds = None
+        self._empty = LandmarkRing(1).next().invalidate()
+        self._thread = threading.Thread(target=self._load, args=(factory,), name="detector-warmup", daemon=True)
+        self._thread.start()
+
+    def _load(self, factory):
+        t0 = time.perf_counter()
+        try:
+            self.detector = factory()
+        except Exception as e:
+            self.error = e
+            print(f"[시작] 포즈 모델을 준비하지 못했습니다: {e}")
+        finally:
+            self.load_seconds = time.perf_counter() - t0
+            self.ready.set()
+
+    @property
+    def warming_up(self):
+        return not self.ready.is_set()
+
+    def wait(self, timeout=None):
+        """준비될 때까지 기다립니다. 준비되었으면 True."""
+        return self.ready.wait(timeout)
+
+    def find_pose(self, img, draw=True):
+        if self.detector is None:
+            return img
+        return self.detector.find_pose(img, draw=draw)
+
+    def find_landmark_frame(self):
+        if self.detector is None:
+            return self._empty
+        return self.detector.find_landmark_frame()
+
+    def find_landmarks(self, img):
+        if self.detector is None:
+            return []
+        return self.detector.find_landmarks(img)
+
+    def __getattr__(self, name):
+        detector = self.__dict__.get('detector')
+        if detector is None:
+            raise AttributeError(f"검출기가 아직 준비되지 않았습니다: {name}")
+        return getattr(detector, name)
@@ -0,0 +1,254 @@
+"""
+프레임 오버레이 렌더링 유틸리티.
+- 한글 텍스트: 폰트 객체와 (text, color, size)별로 미리 래스터화한 텍스트 스프라이트를 캐시하고,
+  텍스트가 차지하는 영역(ROI)만 프레임에 제자리(in-place) 알파 블렌딩합니다.
+- 스켈레톤: 미리 계산한 연결 인덱스 배열로 cv2.polylines 한 번, cv2.circle로 관절을 그립니다.
+- 시작 시간을 줄이기 위해 Pillow는 첫 텍스트를 그릴 때 불러오고, 한글 폰트 탐색 결과는 디스크에 캐시합니다.
+"""
+import importlib.util
+import json
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+# PIL (Pillow) for proper Korean text rendering on frames (imported lazily by _pil())
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+ImageFont = ImageDraw = Image = None
+
+
+def _pil():
+    """Pillow 모듈을 처음 필요할 때 불러옵니다."""
+    global ImageFont, ImageDraw, Image
+    if Image is None:
+        from PIL import ImageFont, ImageDraw, Image
+    return ImageFont, ImageDraw, Image
+
+# MediaPipe Pose의 POSE_CONNECTIONS와 동일한 연결(관절 인덱스 쌍). mediapipe를 불러오지 않고 사용하기 위해 고정합니다.
+POSE_CONNECTIONS = np.array([
+    (0, 1), (0, 4), (1, 2), (2, 3), (3, 7), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (11, 23), (12, 14), (12, 24), (13, 15), (14, 16),
+    (15, 17), (15, 19), (15, 21), (16, 18), (16, 20), (16, 22), (17, 19), (18, 20),
+    (23, 24), (23, 25), (24, 26), (25, 27), (26, 28), (27, 29), (27, 31),
+    (28, 30), (28, 32), (29, 31), (30, 32),
+], dtype=np.intp)
+
+# mp.solutions.drawing_utils 기본 스타일과 같은 색(BGR)
+LANDMARK_COLOR = (0, 0, 255)
+CONNECTION_COLOR = (224, 224, 224)
+
+_warned_text_fallback = False  # 한글 폰트 경고 메시지가 한 번만 출력되도록 하는 플래그
+
+
+FONT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ergonomic_posture", "font.json")
+# 대표 경로에 없을 때 훑어볼 폰트 디렉터리와 한글 폰트 파일 이름 단서(소문자)
+_FONT_DIRS = (
+    "/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts"),
+    "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.local/share/fonts"),
+    os.path.expanduser("~/.fonts"), "C:/Windows/Fonts",
+)
+_FONT_NAME_HINTS = ('applesdgothicneo', 'nanumgothic', 'nanumbarungothic', 'notosanscjk', 'notosanskr',
+                    'malgun', 'undotum', 'gulim')
+_FONT_EXTS = ('.ttf', '.ttc', '.otf')
+
+
+def _find_korean_font() -> str | None:
+    """
+    시스템에서 한글 렌더링이 가능한 폰트를 탐색해 경로를 반환합니다.
+    - macOS/Windows/Linux의 대표 경로를 먼저 확인하고, 없으면 폰트 디렉터리를 훑어 이름으로 찾습니다.
+    - 찾지 못하면 None을 반환합니다.
+    """
+    candidates = [
+        "/System/Library/Fonts/AppleSDGothicNeo.ttc",  # macOS default
+        "/Library/Fonts/AppleSDGothicNeo.ttc",
+        os.path.expanduser("~/Library/Fonts/AppleSDGothicNeo.ttc"),
+        "/Library/Fonts/NanumGothic.ttf",
+        "/System/Library/Fonts/Supplemental/NanumGothic.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/truetype/noto/NotoSansKR-Regular.otf",
+        "C:/Windows/Fonts/malgun.ttf",  # Windows
+    ]
+    for p in candidates:
+        if os.path.exists(p):
+            return p
+    for root_dir in _FONT_DIRS:
+        for root, _, files in os.walk(root_dir):
+            for name in sorted(files):
+                lower = name.lower()
+                if lower.endswith(_FONT_EXTS) and any(hint in lower for hint in _FONT_NAME_HINTS):
+                    return os.path.join(root, name)
+    return None
+
+
+def _font_dirs_stamp():
+    """폰트 디렉터리별 수정 시각(폰트 설치/삭제 감지용)."""
+    return {d: os.stat(d).st_mtime for d in _FONT_DIRS if os.path.isdir(d)}
+
+
+_KR_FONT_PATH = None
+_font_resolved = False
+
+
+def korean_font_path() -> str | None:
+    """
+    한글 폰트 경로(없으면 None). 처음 호출할 때 찾고, 결과를 메모리와 FONT_CACHE_PATH에 캐시합니다.
+    디스크 캐시는 찾은 파일이 그대로 있고 폰트 디렉터리 수정 시각이 같을 때만 사용합니다.
+    폰트는 보통 하위 디렉터리에 설치되어 최상위 수정 시각이 바뀌지 않으므로, 찾지 못한 결과(None)는 디스크에 남기지 않습니다.
+    """
+    global _KR_FONT_PATH, _font_resolved
+    if _font_resolved:
+        return _KR_FONT_PATH
+    stamp = _font_dirs_stamp()
+    try:
+        with open(FONT_CACHE_PATH, encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('dirs') == stamp and cached['path'] is not None and os.path.exists(cached['path']):
+            _KR_FONT_PATH, _font_resolved = cached['path'], True
+            return _KR_FONT_PATH
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    _KR_FONT_PATH, _font_resolved = _find_korean_font(), True
+    if _KR_FONT_PATH is None:
+        return None
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+        tmp = FONT_CACHE_PATH + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'path': _KR_FONT_PATH, 'dirs': stamp}, f)
+        os.replace(tmp, FONT_CACHE_PATH)
+    except OSError:
+        pass
+    return _KR_FONT_PATH
+
+
+@lru_cache(maxsize=16)
+def get_font(path, size):
+    """(경로, 크기)별 폰트 객체를 캐시하여 반환합니다. 로드 실패 시 기본 폰트를 사용합니다."""
+    ImageFont = _pil()[0]
+    try:
+        return ImageFont.truetype(path, size)
+    except Exception:
+        return ImageFont.load_default()  # 폰트 로드 실패 시 기본 폰트 사용
+
+
+class TextSprite:
+    """
+    미리 래스터화한 한 줄 텍스트.
+    - offset: draw.text((x, y))로 그렸을 때 글자 영역의 (x, y) 오프셋
+    - height: 다음 줄 y 좌표 계산용 높이(textbbox 기준)
+    - inv_alpha / premult: ROI 블렌딩용 (1 - alpha), color * alpha (float32)
+    """
+    __slots__ = ('offset', 'height', 'inv_alpha', 'premult')
+
+    def __init__(self, text, bgr, font):
+        _, ImageDraw, Image = _pil()
+        bbox = font.getbbox(text)
+        w, h = max(bbox[2] - bbox[0], 1), max(bbox[3] - bbox[1], 1)
+        mask = Image.new('L', (w, h), 0)
+        ImageDraw.Draw(mask).text((-bbox[0], -bbox[1]), text, fill=255, font=font)
+        alpha = np.asarray(mask, dtype=np.float32)[:, :, None] / 255.0
+        self.offset = (bbox[0], bbox[1])
+        self.height = bbox[3] - bbox[1]
+        self.inv_alpha = 1.0 - alpha
+        self.premult = alpha * np.array(bgr, dtype=np.float32)
+
+    def blend(self, img, x, y):
+        """프레임의 (x, y) 위치에 스프라이트를 제자리 알파 블렌딩합니다(프레임 밖으로 나간 부분은 잘라냄)."""
+        x0, y0 = x + self.offset[0], y + self.offset[1]
+        h, w = self.inv_alpha.shape[:2]
+        ix0, iy0 = max(x0, 0), max(y0, 0)
+        ix1, iy1 = min(x0 + w, img.shape[1]), min(y0 + h, img.shape[0])
+        if ix0 >= ix1 or iy0 >= iy1:
+            return
+        sx, sy = ix0 - x0, iy0 - y0
+        roi = img[iy0:iy1, ix0:ix1]
+        inv = self.inv_alpha[sy:sy + iy1 - iy0, sx:sx + ix1 - ix0]
+        pre = self.premult[sy:sy + iy1 - iy0, sx:sx + ix1 - ix0]
+        roi[:] = (roi * inv + pre + 0.5).astype(np.uint8)
+
+
+class SpriteCache:
+    """(text, color, size, font_path) → TextSprite LRU 캐시."""
+    def __init__(self, max_items=256):
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def get(self, text, bgr, size, font_path):
+        key = (text, tuple(bgr), size, font_path)
+        sprite = self._items.get(key)
+        if sprite is not None:
+            self._items.move_to_end(key)
+            return sprite
+        sprite = TextSprite(text, bgr, get_font(font_path, size))
+        self._items[key] = sprite
+        if len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self._items.clear()
+
+
+_sprite_cache = SpriteCache()
+
+
+def draw_text_multiline(
+    img: np.ndarray,
+    lines: List[Tuple[str, Tuple[int, int, int]]],
+    org: Tuple[int, int] = (10, 30),
+    font_size: int = 24,
+    line_gap: int = 6,
+    font_path: str | None = None,
+) -> None:
+    """
+    프레임에 여러 줄의 텍스트를 그립니다.
+    lines의 각 항목은 (text, bgr_color) 형식입니다. PIL로 래스터화한 스프라이트를 캐시하여 한글을 올바르게 렌더링하고,
+    텍스트 영역만 프레임에 블렌딩합니다(전체 프레임 색 공간 변환 없음).
+    """
+    global _warned_text_fallback
+
+    font_path = font_path or korean_font_path()
+    if PIL_AVAILABLE and font_path:
+        x, y = org
+        for text, bgr in lines:
+            sprite = _sprite_cache.get(text, bgr, font_size, font_path)
+            sprite.blend(img, x, y)
+            # 텍스트의 높이로 다음 줄의 y 좌표를 계산합니다.
+            y += sprite.height + line_gap
+    else:
+        # PIL을 사용할 수 없으면 OpenCV의 기본 폰트를 사용합니다 (한글 깨짐 발생 가능).
+        if not _warned_text_fallback:
+            print("[안내] 한글 텍스트가 물음표(????)로 보이면 'pip install pillow' 설치 및 한글 폰트(Apple SD Gothic 등)를 시스템에 설치해 주세요.")
+            _warned_text_fallback = True
+        x, y = org
+        for text, bgr in lines:
+            cv2.putText(img, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, bgr, 2)
+            y += int(font_size * 1.4) + line_gap
+
+
+def draw_skeleton(img, landmarks, visibility=None, min_visibility=0.5,
+                  connections=POSE_CONNECTIONS, radius=2, thickness=2):
+    """
+    정규화 좌표 랜드마크로 스켈레톤을 그립니다.
+    - landmarks: (33, 2 이상) 배열 또는 리스트(정규화 x, y)
+    - visibility: (33,) 배열(선택). min_visibility 미만 관절과 그 연결선은 그리지 않습니다.
+    """
+    h, w = img.shape[:2]
+    pts = np.asarray(landmarks, dtype=np.float32)[:, :2] * np.array([w, h], dtype=np.float32)
+    pts = pts.astype(np.int32)
+
+    if visibility is not None:
+        visible = np.asarray(visibility) >= min_visibility
+        connections = connections[visible[connections].all(axis=1)]
+        pts_to_draw = pts[visible]
+    else:
+        pts_to_draw = pts
+
+    if len(connections):
+        cv2.polylines(img, pts[connections], False, CONNECTION_COLOR, thickness)
+    for x, y in pts_to_draw.tolist():
+        cv2.circle(img, (x, y), radius, LANDMARK_COLOR, thickness)
+    return img
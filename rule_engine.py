@@ -0,0 +1,450 @@
+"""
+선언형 자세 규칙 엔진.
+- 특징(중점, 이동한 점, 세 점 각도, 좌표 성분, 차이)과 규칙(임계값, 심각도, 우선순위, 문구)을 JSON 설정 파일(rules.json)에 선언합니다.
+- 설정은 중복을 제거한 특징 그래프로 컴파일됩니다. 정의가 같은 특징은 이름이 달라도 한 노드를 공유하고,
+  프레임마다 필요한 노드만 한 번씩 계산합니다(판단 보류된 규칙이 쓰는 특징은 계산하지 않음).
+- 파일이 바뀌면(mtime) 다음 평가 때 다시 컴파일합니다. 설정이 잘못되었으면 이전 규칙을 그대로 씁니다.
+기본 rules.json은 ergonomics_rules의 네 분석 함수(목, 어깨, 시선, 팔꿈치)를 같은 결과가 나오도록 옮긴 것입니다.
+
+설정 형식:
+- constants: 이름 → 숫자. 특징 인자, 조건, 문구에서 이름으로 참조합니다(min_visibility는 판단 보류 기준, 생략하면 보류 안 함).
+- features: 이름 → {"op": 연산, "args": [...]}. 인자는 관절 이름(landmark_frame.LANDMARK_NAMES), 다른 특징,
+  '이름.x'/'이름.y'/'이름.z'/'이름.visibility'(좌표 성분), 상수 이름 또는 숫자입니다.
+  연산: midpoint(a, b), offset(p, dx, dy), angle(a, 꼭짓점 b, c; 2D, 0~180°), component(p, 축), delta(a, b) = a - b
+- rules: {"item", "status", "priority"(작을수록 먼저), "severity", "requires"(관절 목록), "checks", "messages"}
+  checks의 각 항목은 {"requires", "issue_if", "message"}이며 issue_if는 {"lhs", "op", "rhs"[, "offset"]}입니다.
+  op는 <, <=, >, >=(lhs op rhs + offset) 또는 between/outside(rhs = [하한, 상한], 경계 포함)입니다.
+  requires의 관절이 잘 보이지 않는 검사는 건너뛰고, 모든 검사를 건너뛰면 UNKNOWN입니다.
+  messages는 GOOD/ISSUE/UNKNOWN 문구(str.format 형식)이며 {이름:d}는 소수점 아래를 버립니다.
+  ISSUE 문구의 {failed}는 문제가 된 검사들의 message를 ', '로 이은 것입니다.
+사용 예:
+   python main.py --rules rules.json
+   python rule_engine.py rules.json      # 컴파일된 특징 그래프 출력
+"""
+import json
+import operator
+import os
+import string
+import sys
+import time
+
+import numpy as np
+
+from ergonomics_rules import calculate_angle, STATUS_CODES
+from landmark_frame import LANDMARK_INDEX, NUM_LANDMARKS
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+_AXES = {'x': 0, 'y': 1, 'z': 2, 'visibility': 3}
+_COMPARE = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+
+# ---- 특징 연산 (프레임 단위 분석 함수와 같은 순서/자료형으로 계산해 결과가 같도록 유지) ----
+def _midpoint(a, b):
+    return (a[:3] + b[:3]) / 2
+
+
+def _offset(p, dx, dy):
+    out = p[:3].copy()
+    out[0] = p[0] + dx
+    out[1] = p[1] + dy
+    return out
+
+
+def _angle(a, b, c):
+    return calculate_angle(a[:2], b[:2], c[:2])
+
+
+def _component(p, axis):
+    return p[_AXES[axis]]
+
+
+def _delta(a, b):
+    return a - b
+
+
+# 연산 이름 → (함수, 인자 종류). 'p'는 특징/관절, 'n'은 숫자(상수 이름 가능), 'a'는 축 이름
+_OPS = {
+    'midpoint': (_midpoint, 'pp'),
+    'offset': (_offset, 'pnn'),
+    'angle': (_angle, 'ppp'),
+    'component': (_component, 'pa'),
+    'delta': (_delta, 'pp'),
+}
+
+
+class _Template:
+    """미리 해석한 문구 템플릿. {이름:d}는 int()로 소수점 아래를 버린 뒤 형식화합니다."""
+    def __init__(self, text, resolve):
+        self.parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            if field is None:
+                self.parts.append((literal, None, ''))
+            elif field == 'failed':
+                self.parts.append((literal, 'failed', spec))
+            else:
+                self.parts.append((literal, resolve(field), spec))
+
+    def render(self, frame, failed=''):
+        out = []
+        for literal, ref, spec in self.parts:
+            out.append(literal)
+            if ref is None:
+                continue
+            value = failed if ref == 'failed' else frame.operand(ref)
+            if spec.endswith('d') and not isinstance(value, (int, np.integer)):
+                value = int(value)
+            out.append(format(value, spec))
+        return "".join(out)
+
+
+class _Frame:
+    """한 프레임의 특징 값 메모(노드마다 최대 한 번 계산)."""
+    __slots__ = ('data', 'nodes', 'values')
+
+    def __init__(self, data, nodes):
+        self.data = data
+        self.nodes = nodes
+        self.values = [None] * len(nodes)
+
+    def get(self, node):
+        value = self.values[node]
+        if value is None:
+            fn, args = self.nodes[node]
+            if fn is None:
+                value = self.data[args]  # 관절 행 뷰
+            else:
+                value = fn(*[self.get(a) if kind == 'node' else a for kind, a in args])
+            self.values[node] = value
+        return value
+
+    def operand(self, ref):
+        kind, value = ref
+        return self.get(value) if kind == 'node' else value
+
+
+class _Check:
+    __slots__ = ('requires', 'compare', 'lhs', 'rhs', 'offset', 'message')
+
+
+class _Rule:
+    __slots__ = ('item', 'status', 'priority', 'severity', 'checks', 'good', 'issue', 'unknown')
+
+
+class CompiledRules:
+    """
+    컴파일된 규칙 묶음(불변). evaluate(landmarks)는 analyze_items와 같은 [(항목, 상태, 문구)]를 반환합니다.
+    - nodes: 특징 그래프 노드 목록(중복 제거됨), names: 특징 이름 → 노드 번호
+    """
+    def __init__(self, config):
+        if not isinstance(config, dict):
+            raise ValueError("규칙 설정은 JSON 객체여야 합니다")
+        self.constants = dict(config.get('constants', {}))
+        for name, value in self.constants.items():
+            if not isinstance(value, (int, float)):
+                raise ValueError(f"상수 {name}의 값이 숫자가 아닙니다: {value!r}")
+        self.min_visibility = self.constants.get('min_visibility')
+        self._features = config.get('features', {})
+        if not isinstance(self._features, dict):
+            raise ValueError("features는 JSON 객체여야 합니다")
+        rule_specs = config.get('rules', [])
+        if not isinstance(rule_specs, list):
+            raise ValueError("rules는 배열이어야 합니다")
+        self.nodes = []        # (함수, 인자) 또는 관절이면 (None, 인덱스)
+        self.node_names = []   # 노드별 대표 이름(출력용)
+        self._keys = {}        # 구조 키 → 노드 번호(중복 제거)
+        self.names = {}        # 특징/관절 이름 → 노드 번호
+        self._visiting = set()
+        for name in self._features:
+            self._feature(name)
+        self.rules = sorted((self._rule(spec) for spec in rule_specs), key=lambda r: r.priority)
+        self.severity = {rule.item: rule.severity for rule in self.rules}
+        self._trial()
+
+    def _trial(self):
+        """모든 관절이 보이는 임의 프레임으로 한 번 평가해, 비교/문구 형식 오류를 평가 전에 ValueError로 알립니다."""
+        data = np.random.default_rng(0).uniform(0.2, 0.8, (NUM_LANDMARKS, 4))
+        data[:, 3] = 1.0
+        try:
+            self.evaluate(data)
+        except Exception as e:
+            raise ValueError(f"규칙을 평가할 수 없습니다: {e!r}") from None
+
+    # ---- 컴파일 ----
+    def _add(self, key, node, name):
+        index = self._keys.get(key)
+        if index is None:
+            index = self._keys[key] = len(self.nodes)
+            self.nodes.append(node)
+            self.node_names.append(name)
+        return index
+
+    def _feature(self, name):
+        """특징/관절 이름을 노드 번호로 바꿉니다(필요하면 정의를 컴파일)."""
+        if name in self.names:
+            return self.names[name]
+        if name in LANDMARK_INDEX:
+            index = self._add(('landmark', LANDMARK_INDEX[name]), (None, LANDMARK_INDEX[name]), name)
+        elif '.' in name and name.rsplit('.', 1)[1] in _AXES:
+            base, axis = name.rsplit('.', 1)
+            index = self._node('component', [base, axis], name)
+        elif name in self._features:
+            if name in self._visiting:
+                raise ValueError(f"특징 정의가 순환합니다: {name}")
+            spec = self._features[name]
+            if not isinstance(spec, dict) or spec.get('op') not in _OPS:
+                raise ValueError(f"특징 {name}: op는 {', '.join(_OPS)} 중 하나여야 합니다")
+            self._visiting.add(name)
+            try:
+                index = self._node(spec['op'], spec.get('args', []), name)
+            finally:
+                self._visiting.discard(name)
+        else:
+            raise ValueError(f"알 수 없는 특징/관절 이름: {name}")
+        self.names[name] = index
+        return index
+
+    def _number(self, value, where):
+        if isinstance(value, str):
+            if value not in self.constants:
+                raise ValueError(f"{where}: 알 수 없는 상수 {value}")
+            return self.constants[value]
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"{where}: 숫자가 아닙니다: {value!r}")
+        return value
+
+    def _node(self, op, args, name):
+        fn, kinds = _OPS[op]
+        if not isinstance(args, list) or len(args) != len(kinds):
+            raise ValueError(f"특징 {name}: {op}의 인자는 {len(kinds)}개여야 합니다")
+        compiled = []
+        for kind, arg in zip(kinds, args):
+            if kind == 'p':
+                compiled.append(('node', self._feature(arg)))
+            elif kind == 'n':
+                compiled.append(('const', self._number(arg, f"특징 {name}")))
+            else:
+                if arg not in _AXES:
+                    raise ValueError(f"특징 {name}: 축은 {', '.join(_AXES)} 중 하나여야 합니다")
+                compiled.append(('const', arg))
+        key = (op,) + tuple(compiled)
+        return self._add(key, (fn, tuple(compiled)), name)
+
+    def _operand(self, value, where):
+        """조건/문구의 피연산자: 상수 이름이나 숫자면 ('const', 값), 아니면 ('node', 번호)."""
+        if isinstance(value, str) and value not in self.constants:
+            return ('node', self._feature(value))
+        return ('const', self._number(value, where))
+
+    def _requires(self, names, where):
+        if not isinstance(names, list):
+            raise ValueError(f"{where}: requires는 관절 이름 배열이어야 합니다")
+        for name in names:
+            if name not in LANDMARK_INDEX:
+                raise ValueError(f"{where}: 알 수 없는 관절 {name}")
+        return np.array([LANDMARK_INDEX[name] for name in names], dtype=np.intp)
+
+    @staticmethod
+    def _expect(value, kind, where, what):
+        """설정 값의 JSON 자료형을 확인합니다(틀리면 ValueError)."""
+        if not isinstance(value, kind):
+            raise ValueError(f"{where}: {what}의 형식이 잘못되었습니다: {value!r}")
+        return value
+
+    def _rule(self, spec):
+        self._expect(spec, dict, "규칙", "규칙 정의(JSON 객체)")
+        try:
+            rule = _Rule()
+            rule.item = self._expect(spec['item'], str, "규칙", "item(문자열)")
+            where = f"규칙 {rule.item}"
+            if spec['status'] not in STATUS_CODES:
+                raise ValueError(f"{where}: 알 수 없는 상태 {spec['status']}")
+            rule.status = spec['status']
+            rule.priority = self._expect(spec.get('priority', 0), (int, float), where, "priority(숫자)")
+            rule.severity = self._expect(spec.get('severity', 'warning'), str, where, "severity(문자열)")
+            base = self._expect(spec.get('requires', []), list, where, "requires(배열)")
+            resolve = lambda field: self._operand(field, where)
+            rule.checks = []
+            for check_spec in self._expect(spec['checks'], list, where, "checks(배열)"):
+                self._expect(check_spec, dict, where, "검사(JSON 객체)")
+                check = _Check()
+                check.requires = self._requires(
+                    base + self._expect(check_spec.get('requires', []), list, where, "requires(배열)"), where)
+                cond = self._expect(check_spec['issue_if'], dict, where, "issue_if(JSON 객체)")
+                op = cond['op']
+                check.lhs = self._operand(cond['lhs'], where)
+                check.offset = None
+                if op in ('between', 'outside'):
+                    rhs = cond['rhs']
+                    if not isinstance(rhs, list) or len(rhs) != 2:
+                        raise ValueError(f"{where}: {op}의 rhs는 [하한, 상한]이어야 합니다: {rhs!r}")
+                    low, high = rhs
+                    check.rhs = (self._operand(low, where), self._operand(high, where))
+                elif op in _COMPARE:
+                    check.rhs = self._operand(cond['rhs'], where)
+                    if 'offset' in cond:
+                        check.offset = self._operand(cond['offset'], where)
+                else:
+                    raise ValueError(f"{where}: 알 수 없는 비교 연산 {op}")
+                check.compare = op
+                check.message = _Template(self._expect(check_spec.get('message', ''), str, where, "message(문자열)"),
+                                          resolve)
+                rule.checks.append(check)
+            if not rule.checks:
+                raise ValueError(f"{where}: checks가 비어 있습니다")
+            messages = self._expect(spec['messages'], dict, where, "messages(JSON 객체)")
+            rule.good, rule.issue, rule.unknown = (
+                _Template(self._expect(messages[key], str, where, f"messages.{key}(문자열)"), resolve)
+                for key in ('GOOD', 'ISSUE', 'UNKNOWN'))
+        except KeyError as e:
+            raise ValueError(f"규칙 {spec.get('item', '?')}: 필수 항목 {e}이 없습니다") from None
+        return rule
+
+    # ---- 평가 ----
+
+    @staticmethod
+    def _issue(frame, check):
+        value = frame.operand(check.lhs)
+        if check.compare == 'outside':
+            low, high = check.rhs
+            return not (frame.operand(low) <= value <= frame.operand(high))
+        if check.compare == 'between':
+            low, high = check.rhs
+            return frame.operand(low) <= value <= frame.operand(high)
+        rhs = frame.operand(check.rhs)
+        if check.offset is not None:
+            rhs = rhs + frame.operand(check.offset)
+        return _COMPARE[check.compare](value, rhs)
+
+    def evaluate(self, landmarks):
+        """랜드마크([x,y,z(,visibility)] 리스트 또는 LandmarkFrame)를 평가합니다. 랜드마크가 없으면 빈 리스트."""
+        if landmarks is None or not len(landmarks):
+            return []
+        frame = _Frame(np.asarray(landmarks), self.nodes)
+        # 관절별 판단 보류 여부는 프레임마다 한 번만 계산합니다.
+        hidden = None
+        if self.min_visibility is not None and frame.data.shape[1] > 3:
+            hidden = frame.data[:, 3] < self.min_visibility
+        out = []
+        for rule in self.rules:
+            failed = []
+            evaluated = False
+            for check in rule.checks:
+                if hidden is not None and len(check.requires) and hidden[check.requires].any():
+                    continue
+                evaluated = True
+                if self._issue(frame, check):
+                    failed.append(check)
+            if not evaluated:
+                out.append((rule.item, 'UNKNOWN', rule.unknown.render(frame)))
+            elif failed:
+                text = ", ".join(check.message.render(frame) for check in failed)
+                out.append((rule.item, rule.status, rule.issue.render(frame, text)))
+            else:
+                out.append((rule.item, 'GOOD', rule.good.render(frame)))
+        return out
+
+    def describe(self):
+        """특징 그래프와 규칙을 사람이 읽을 수 있는 줄 목록으로 만듭니다."""
+        lines = [f"특징 노드 {len(self.nodes)}개 (이름 {len(self.names)}개)"]
+        aliases = {}
+        for name, index in self.names.items():
+            aliases.setdefault(index, []).append(name)
+        for index, (fn, args) in enumerate(self.nodes):
+            if fn is None:
+                body = f"landmark[{args}]"
+            else:
+                parts = [self.node_names[a] if kind == 'node' else repr(a) for kind, a in args]
+                body = f"{fn.__name__.lstrip('_')}({', '.join(parts)})"
+            lines.append(f"  #{index:<3d} {body:50s} {', '.join(aliases.get(index, []))}")
+        lines.append(f"규칙 {len(self.rules)}개")
+        for rule in self.rules:
+            lines.append(f"  {rule.priority:4} {rule.item:10s} {rule.status:18s} {rule.severity:8s} 검사 {len(rule.checks)}개")
+        return lines
+
+
+def load_rules(path):
+    """JSON 규칙 파일을 읽어 CompiledRules로 컴파일합니다(잘못된 설정이면 ValueError)."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    try:
+        return CompiledRules(config)
+    except (TypeError, AttributeError, IndexError) as e:
+        # 형식 검사에서 빠진 구조 오류도 설정 오류로 다룹니다.
+        raise ValueError(f"규칙 설정 형식이 잘못되었습니다: {e}") from e
+
+
+class RuleEngine:
+    """
+    규칙 파일을 감시하며 평가하는 엔진.
+    - evaluate(landmarks): [(항목, 상태, 문구)] 반환(main.analyze_items와 같은 형식)
+    - reload_interval초마다 파일 mtime/크기를 확인하고, 바뀌었으면 다시 컴파일합니다.
+      다시 읽기에 실패하면 메시지를 출력하고 이전 규칙을 계속 사용합니다.
+    - severity(item): 항목 규칙의 심각도(없으면 None)
+    - min_visibility: 지정하면 설정 파일의 min_visibility 상수 대신 이 판단 보류 기준을 씁니다(명령행 옵션용).
+    파이프라인의 분석 단계 스레드 하나에서 호출하는 것을 가정합니다(컴파일 결과는 통째로 교체).
+    """
+    def __init__(self, path=DEFAULT_RULES_PATH, reload_interval=1.0, min_visibility=None):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.min_visibility = min_visibility
+        self._stamp = self._stat()
+        self.compiled = self._load()
+        self._checked = time.monotonic()
+        self.reloads = 0
+
+    def _load(self):
+        compiled = load_rules(self.path)
+        if self.min_visibility is not None:
+            compiled.min_visibility = self.min_visibility
+        return compiled
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def check_reload(self):
+        """파일이 바뀌었으면 다시 컴파일합니다. 새 규칙을 적용했으면 True."""
+        self._checked = time.monotonic()
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            compiled = self._load()
+        except Exception as e:  # 실행 중인 분석 단계가 멈추지 않도록 어떤 오류든 이전 규칙을 유지합니다.
+            print(f"[규칙] 다시 읽기 실패(이전 규칙 유지): {e}")
+            return False
+        self.compiled = compiled
+        self.reloads += 1
+        print(f"[규칙] {self.path} 다시 읽음: 규칙 {len(compiled.rules)}개, 특징 노드 {len(compiled.nodes)}개")
+        return True
+
+    def evaluate(self, landmarks):
+        if time.monotonic() - self._checked >= self.reload_interval:
+            self.check_reload()
+        return self.compiled.evaluate(landmarks)
+
+    __call__ = evaluate
+
+    def severity(self, item):
+        return self.compiled.severity.get(item)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else DEFAULT_RULES_PATH
+    try:
+        compiled = load_rules(path)
+    except (OSError, ValueError) as e:
+        print(f"[규칙] {path}: {e}")
+        return 1
+    print("\n".join(compiled.describe()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+랜드마크 세션 기록/재생.
+- SessionRecorder: 타임스탬프가 붙은 랜드마크 프레임(visibility 포함)을 고정 길이 레코드로 파일 끝에 덧붙입니다.
+- SessionLog: 파일을 메모리 매핑(np.memmap)으로 열어 복사 없이 임의 접근하고, 시간 범위로 잘라 다시 분석합니다.
+  영상이나 포즈 모델 없이 임계값(CVA_MIN_DEG, SLUMP_Z_THRESHOLD 등)을 바꿔 지난 세션을 재분석할 수 있습니다.
+
+파일 형식(.plog, 리틀 엔디언):
+- 헤더 64바이트: magic 'POSELOG1', version(u2), 관절 수(u2), 채널 수(u2), 예약(u2), 레코드 길이(u4), 헤더 길이(u4), 생성 시각(f8)
+- 레코드 272바이트: 타임스탬프(f8, UNIX 초) + 랜드마크 (33, 4) float16 [x, y, z, visibility]. 미검출 프레임은 NaN.
+- 색인(.plog.idx): index_every개 레코드마다 (타임스탬프 f8, 레코드 번호 i8). 없거나 짧으면 데이터에서 다시 만듭니다.
+10 Hz로 8시간 기록하면 약 78 MB입니다(float16 좌표 오차는 정규화 좌표 기준 약 0.0005).
+사용 예:
+   python main.py --record today.plog
+   python session_log.py info today.plog
+   python session_log.py reanalyze today.plog --cva-min 65 --from 09:00 --to 12:00
+"""
+import argparse
+import datetime
+import os
+import struct
+import time
+
+import numpy as np
+
+from ergonomics_rules import (
+    analyze_batch,
+    CVA_MIN_DEG,
+    ELBOW_MIN_DEG,
+    ELBOW_MAX_DEG,
+    EYE_DOWN_NOSE_DIFF,
+    SLUMP_Z_THRESHOLD,
+    MIN_VISIBILITY,
+    STATUS_NAMES,
+)
+from landmark_frame import NUM_LANDMARKS
+
+MAGIC = b'POSELOG1'
+VERSION = 1
+HEADER_SIZE = 64
+_HEADER = struct.Struct('<8sHHHHIId')  # magic, version, 관절 수, 채널 수, 예약, 레코드 길이, 헤더 길이, 생성 시각
+RECORD_DTYPE = np.dtype([('t', '<f8'), ('lm', '<f2', (NUM_LANDMARKS, 4))])
+INDEX_DTYPE = np.dtype([('t', '<f8'), ('n', '<i8')])
+_MISSING = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float16)
+
+
+def _index_path(path):
+    return path + ".idx"
+
+
+def _read_header(f):
+    raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError("세션 로그 헤더가 없습니다")
+    magic, version, joints, channels, _, record_size, header_size, created = _HEADER.unpack_from(raw)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("세션 로그 형식이 아닙니다")
+    if joints != NUM_LANDMARKS or channels != 4 or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"지원하지 않는 레코드 구성입니다: joints={joints}, channels={channels}, record={record_size}")
+    return header_size, created
+
+
+class SessionRecorder:
+    """
+    세션 기록기(파일 끝에 덧붙이기 전용). 같은 경로의 기존 파일이 있으면 이어서 기록합니다.
+    - min_interval: 레코드 사이 최소 간격(초). 0.1이면 최대 10 Hz로 기록합니다.
+    - flush_every: 이 개수만큼 쌓이면 파일에 씁니다(중단 시 잃는 레코드 수 상한).
+    - index_every: 색인 간격(레코드 수)
+    with 문으로 사용하거나 끝에 close()를 호출하세요.
+    """
+    def __init__(self, path, min_interval=0.1, flush_every=64, index_every=1024):
+        self.path = path
+        self.min_interval = min_interval
+        self.flush_every = flush_every
+        self.index_every = index_every
+        self._buffer = np.zeros(flush_every, dtype=RECORD_DTYPE)
+        self._buffered = 0
+        self._last_t = None
+        self._last_source = None
+
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        if exists:
+            with open(path, 'rb') as f:
+                header_size, _ = _read_header(f)
+            size = os.path.getsize(path)
+            self.count = (size - header_size) // RECORD_DTYPE.itemsize
+            # 마지막 레코드가 잘려 있으면(기록 중 중단) 잘라냅니다.
+            if header_size + self.count * RECORD_DTYPE.itemsize != size:
+                os.truncate(path, header_size + self.count * RECORD_DTYPE.itemsize)
+            self._file = open(path, 'ab')
+            _rebuild_index(path, header_size, self.count, index_every)
+        else:
+            self.count = 0
+            self._file = open(path, 'wb')
+            self._file.write(_HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS, 4, 0, RECORD_DTYPE.itemsize,
+                                          HEADER_SIZE, time.time()).ljust(HEADER_SIZE, b'\0'))
+            self._file.flush()
+            open(_index_path(path), 'wb').close()
+        self._index = open(_index_path(path), 'ab')
+
+    def append(self, landmarks, timestamp=None):
+        """
+        프레임 하나를 기록합니다.
+        - landmarks: LandmarkFrame, (33, 4) 배열 또는 미검출을 뜻하는 None/빈 프레임
+        - timestamp: UNIX 시각(초). 생략하면 LandmarkFrame.timestamp(perf_counter 기준)를 현재 벽시계 시각으로 환산합니다.
+        같은 추론 결과(LandmarkFrame.timestamp가 같음)가 반복되거나 min_interval 안이면 건너뛰고 False를 반환합니다.
+        """
+        source = getattr(landmarks, 'timestamp', None)
+        if source and source == self._last_source:
+            return False
+        if timestamp is None:
+            timestamp = time.time() - (time.perf_counter() - source) if source else time.time()
+        if self._last_t is not None and timestamp - self._last_t < self.min_interval:
+            return False
+        self._last_source = source
+        self._last_t = timestamp
+
+        record = self._buffer[self._buffered]
+        record['t'] = timestamp
+        if landmarks is None or (hasattr(landmarks, 'valid') and not landmarks.valid) or len(landmarks) == 0:
+            record['lm'] = _MISSING
+        else:
+            record['lm'] = np.asarray(landmarks, dtype=np.float32)[:, :4]
+        if (self.count + self._buffered) % self.index_every == 0:
+            self._index.write(np.array([(timestamp, self.count + self._buffered)], dtype=INDEX_DTYPE).tobytes())
+        self._buffered += 1
+        if self._buffered == self.flush_every:
+            self.flush()
+        return True
+
+    def flush(self):
+        """버퍼의 레코드를 파일에 씁니다."""
+        if self._buffered:
+            self._file.write(self._buffer[:self._buffered].tobytes())
+            self.count += self._buffered
+            self._buffered = 0
+        self._file.flush()
+        self._index.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _rebuild_index(path, header_size, count, index_every):
+    """데이터 파일에서 색인을 다시 만듭니다(색인이 없거나 데이터보다 짧을 때)."""
+    index_path = _index_path(path)
+    expected = (count + index_every - 1) // index_every
+    if os.path.exists(index_path) and os.path.getsize(index_path) == expected * INDEX_DTYPE.itemsize:
+        return
+    index = np.zeros(expected, dtype=INDEX_DTYPE)
+    if count:
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=header_size, shape=(count,))
+        index['n'] = np.arange(0, count, index_every)
+        index['t'] = records['t'][::index_every]
+        del records
+    with open(index_path, 'wb') as f:
+        f.write(index.tobytes())
+
+
+class SessionLog:
+    """
+    메모리 매핑한 세션 로그(읽기 전용). 레코드는 필요할 때 디스크에서 읽히며 복사하지 않습니다.
+    - timestamps: (N,) float64 뷰, landmarks: (N, 33, 4) float16 뷰
+    - between(start, end): 시간 범위 [start, end)의 레코드 구간(slice)
+    - window(start, end): 시간 범위의 SessionLog 뷰
+    - analyze(...): 시간 범위를 배치 분석(ergonomics_rules.analyze_batch)
+    """
+    def __init__(self, path, _records=None, _index=None, created=None):
+        self.path = path
+        if _records is not None:
+            self.records, self.index, self.created = _records, _index, created
+            return
+        with open(path, 'rb') as f:
+            header_size, self.created = _read_header(f)
+        count = (os.path.getsize(path) - header_size) // RECORD_DTYPE.itemsize
+        self.records = (np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=header_size, shape=(count,))
+                        if count else np.zeros(0, dtype=RECORD_DTYPE))
+        index_path = _index_path(path)
+        index = np.fromfile(index_path, dtype=INDEX_DTYPE) if os.path.exists(index_path) else None
+        if index is None or len(index) < 2 or index['n'][-1] >= count:
+            index = None  # 색인이 맞지 않으면 타임스탬프 열을 직접 이진 탐색합니다.
+        self.index = index
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records['t']
+
+    @property
+    def landmarks(self):
+        return self.records['lm']
+
+    def _search(self, t):
+        """타임스탬프가 t 이상인 첫 레코드 번호. 색인으로 구간을 좁힌 뒤 그 구간만 이진 탐색합니다."""
+        if self.index is None:
+            return int(np.searchsorted(self.timestamps, t))
+        block = int(np.searchsorted(self.index['t'], t, side='right')) - 1
+        if block < 0:
+            return 0
+        lo = int(self.index['n'][block])
+        hi = int(self.index['n'][block + 1]) if block + 1 < len(self.index) else len(self.records)
+        return lo + int(np.searchsorted(self.records['t'][lo:hi], t))
+
+    def between(self, start=None, end=None):
+        """시간 범위 [start, end)(UNIX 초)의 레코드 slice."""
+        lo = 0 if start is None else self._search(start)
+        hi = len(self.records) if end is None else self._search(end)
+        return slice(lo, max(lo, hi))
+
+    def window(self, start=None, end=None):
+        """시간 범위의 SessionLog 뷰(메모리 매핑 유지)."""
+        sl = self.between(start, end)
+        return SessionLog(self.path, _records=self.records[sl], _index=None, created=self.created)
+
+    def analyze(self, start=None, end=None, chunk=200000, **thresholds):
+        """
+        시간 범위를 배치 분석합니다. thresholds는 analyze_batch 인자(cva_min, slump_z 등)입니다.
+        min_visibility를 주지 않으면 실시간 모드 기본값처럼 판단을 보류하지 않습니다.
+        - 반환: dict(timestamps, detected, 상태 열(미검출 -1)과 수치 열(미검출 NaN))
+        메모리 사용을 제한하기 위해 chunk개 레코드씩 float32로 변환해 처리합니다.
+        """
+        records = self.records[self.between(start, end)]
+        n = len(records)
+        out = {'timestamps': np.asarray(records['t'], dtype=np.float64), 'detected': np.zeros(n, dtype=bool)}
+        for name in ('head_status', 'shoulder_status', 'elbow_status', 'eye_status'):
+            out[name] = np.full(n, -1, dtype=np.int8)
+        for name in ('cva', 'shoulder_z_delta', 'left_elbow_angle', 'right_elbow_angle', 'nose_eye_diff'):
+            out[name] = np.full(n, np.nan, dtype=np.float32)
+        for lo in range(0, n, chunk):
+            lms = records['lm'][lo:lo + chunk].astype(np.float32)
+            detected = ~np.isnan(lms).any(axis=(1, 2))
+            out['detected'][lo:lo + len(lms)] = detected
+            if not detected.any():
+                continue
+            result = analyze_batch(lms[detected], **thresholds)
+            rows = np.flatnonzero(detected) + lo
+            for name in ('head_status', 'shoulder_status', 'elbow_status', 'eye_status',
+                         'cva', 'shoulder_z_delta', 'left_elbow_angle', 'right_elbow_angle', 'nose_eye_diff'):
+                out[name][rows] = getattr(result, name)
+        return out
+
+
+def summarize(result):
+    """
+    analyze() 결과를 항목별 상태 비율과 대략적인 지속 시간(초)으로 요약합니다.
+    지속 시간은 각 레코드가 다음 레코드까지(최대 1초) 유지된 것으로 계산합니다.
+    """
+    t = result['timestamps']
+    dt = np.minimum(np.diff(t, append=t[-1] if len(t) else 0.0), 1.0) if len(t) else t
+    summary = {'records': int(len(t)), 'detected': int(result['detected'].sum()),
+               'seconds': float(dt.sum()) if len(t) else 0.0}
+    for item in ('head', 'shoulder', 'elbow', 'eye'):
+        status = result[f'{item}_status']
+        row = {}
+        for code, name in enumerate(STATUS_NAMES):
+            mask = status == code
+            if mask.any():
+                row[name] = {'ratio': float(mask.sum() / max(summary['detected'], 1)),
+                             'seconds': float(dt[mask].sum())}
+        summary[item] = row
+    return summary
+
+
+def _parse_time(text, reference):
+    """'HH:MM[:SS]'(기록 날짜 기준) 또는 ISO 날짜/시각, 또는 UNIX 초를 UNIX 초로 바꿉니다."""
+    if text is None:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    if len(text) <= 8 and ':' in text:
+        day = datetime.datetime.fromtimestamp(reference).date()
+        return datetime.datetime.combine(day, datetime.time.fromisoformat(text)).timestamp()
+    return datetime.datetime.fromisoformat(text).timestamp()
+
+
+def _format_time(t):
+    return datetime.datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="랜드마크 세션 로그 정보/재분석")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_info = sub.add_parser('info', help="세션 로그 정보")
+    p_info.add_argument("path")
+    p_re = sub.add_parser('reanalyze', help="임계값을 바꿔 세션 재분석")
+    p_re.add_argument("path")
+    p_re.add_argument("--from", dest='start', help="시작 시각(HH:MM, ISO 시각 또는 UNIX 초)")
+    p_re.add_argument("--to", dest='end', help="끝 시각(HH:MM, ISO 시각 또는 UNIX 초)")
+    p_re.add_argument("--cva-min", type=float, default=CVA_MIN_DEG)
+    p_re.add_argument("--elbow-min", type=float, default=ELBOW_MIN_DEG)
+    p_re.add_argument("--elbow-max", type=float, default=ELBOW_MAX_DEG)
+    p_re.add_argument("--eye-down-diff", type=float, default=EYE_DOWN_NOSE_DIFF)
+    p_re.add_argument("--slump-z", type=float, default=SLUMP_Z_THRESHOLD)
+    p_re.add_argument("--min-visibility", type=float, nargs='?', const=MIN_VISIBILITY, default=None,
+                      help=f"관절 visibility가 이 값보다 낮은 항목은 판단을 보류합니다(값 생략 시 {MIN_VISIBILITY}, 기본: 끔)")
+    p_re.add_argument("--output", help="프레임별 결과를 저장할 .npz 경로")
+    args = parser.parse_args(argv)
+
+    log = SessionLog(args.path)
+    if args.command == 'info':
+        size = os.path.getsize(args.path)
+        print(f"{args.path}: {len(log)}개 레코드, {size / 1e6:.1f} MB")
+        if len(log):
+            t = log.timestamps
+            print(f"  기간 {_format_time(t[0])} ~ {_format_time(t[-1])} ({(t[-1] - t[0]) / 3600:.2f}시간)")
+            detected = int((~np.isnan(log.landmarks[:, 0, 0])).sum())
+            print(f"  검출 프레임 {detected} ({detected / len(log):.0%})")
+        return
+
+    reference = float(log.timestamps[0]) if len(log) else time.time()
+    start, end = _parse_time(args.start, reference), _parse_time(args.end, reference)
+    t0 = time.perf_counter()
+    result = log.analyze(start, end, cva_min=args.cva_min, elbow_min=args.elbow_min, elbow_max=args.elbow_max,
+                         eye_down_diff=args.eye_down_diff, slump_z=args.slump_z, min_visibility=args.min_visibility)
+    elapsed = time.perf_counter() - t0
+    summary = summarize(result)
+    print(f"[재분석] {summary['records']}개 레코드(검출 {summary['detected']}), 약 {summary['seconds'] / 60:.1f}분, "
+          f"{elapsed:.2f}초 소요")
+    for item in ('head', 'shoulder', 'elbow', 'eye'):
+        parts = [f"{name} {v['ratio']:.1%} ({v['seconds'] / 60:.1f}분)" for name, v in summary[item].items()]
+        print(f"  {item:8s} " + ", ".join(parts))
+    if args.output:
+        np.savez_compressed(args.output, **result)
+        print(f"[재분석] 프레임별 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+"""
+여러 작업 공간을 한 대의 서버에서 모니터링하는 다중 스트림 분석 서버(헤드리스).
+- 입력 N개(카메라 번호, rtsp:// 등 URL, 영상 파일)를 스트림마다 캡처 스레드가 읽어 크기 1의 LatestQueue에 최신 프레임만 유지합니다.
+- 고정 개수의 작업 프로세스가 포즈 추론을 맡습니다. 스케줄러는 쉬고 있는 작업 프로세스에 배정된 스트림 중
+  가장 오래 차례를 받지 못한 스트림의 프레임을 먼저 보내며, 스트림당 동시에 하나만 추론하므로 결과 순서가 유지됩니다.
+- 풀이 포화되면 각 스트림의 목표 추론 빈도를 풀 전체 처리량 / 살아 있는 스트림 수로 낮추고(밀린 프레임은 큐에서 버려짐)
+  어떤 스트림도 멈추지 않습니다. 스트림 수가 작업 프로세스 수로 나누어떨어지지 않으면, 스트림이 하나 더 배정된
+  작업 프로세스의 스트림은 목표보다 조금 낮은 빈도를 받을 수 있습니다.
+- 랜드마크 평활/상태 히스테리시스/피드백 상태(PostureFeedback)는 스트림마다 따로 유지하며, 피드백 이벤트에는 스트림 이름이 붙습니다.
+- 스트림별 FPS, 큐 깊이, 버린 프레임 수, 추론/지연 시간을 주기적으로 출력합니다.
+MediaPipe 추적은 직전 프레임에 의존하므로, 각 스트림은 시작할 때 배정된 스트림이 가장 적은 작업 프로세스에 고정되고
+그 프로세스가 스트림별 PoseDetector를 따로 둡니다. 따라서 추적 그래프는 스트림당 하나만 생기고 연속 프레임이 같은 그래프로 갑니다.
+스트림이 끝나 배정 수 차이가 2 이상이 되면, 추론 중이 아닌 스트림 하나를 옮기고 이전 프로세스의 그래프는 닫습니다.
+사용 예:
+   python stream_server.py 0 1 rtsp://192.168.0.10/stream desk3.mp4 --workers 4 --max-fps 10
+"""
+import argparse
+import multiprocessing
+import threading
+import time
+from collections import deque
+from functools import partial
+
+import cv2
+
+from feedback_dispatcher import FeedbackDispatcher, FeedbackEvent, ConsoleSink, JsonlFileSink, WebhookSink
+from landmark_filter import LandmarkSmoother
+from landmark_frame import LandmarkRing
+from main import PostureFeedback, analyze_items
+from pipeline import LatestQueue, FramePacket
+
+_worker_detectors = {}  # 작업 프로세스마다: 이 프로세스에 고정된 스트림 번호 → PoseDetector
+
+
+def parse_source(text):
+    """'0' 같은 숫자는 카메라 번호로, 나머지는 URL/파일 경로로 해석합니다."""
+    return int(text) if text.isdigit() else text
+
+
+def _init_worker():
+    """작업 프로세스 초기화: OpenCV 내부 스레드를 1개로 제한합니다(PoseDetector는 스트림별로 필요할 때 생성)."""
+    cv2.setNumThreads(1)
+
+
+def _detect(task):
+    """
+    작업 프로세스에서 한 프레임을 추론합니다.
+    - task: (스트림 번호, 프레임 순번, BGR 프레임)
+    - 반환: (스트림 번호, 프레임 순번, (33, 4) 랜드마크 또는 None, 추론 시간(초), 오류 문자열 또는 None)
+    추론 중 예외는 여기서 잡아 반환값에 담으므로, 서버는 실패한 스트림을 정확히 풀어 줄 수 있습니다.
+    """
+    stream_id, index, img = task
+    t0 = time.perf_counter()
+    try:
+        from pose_detector import PoseDetector
+        detector = _worker_detectors.get(stream_id)
+        if detector is None:
+            detector = _worker_detectors[stream_id] = PoseDetector()
+        detector.find_pose(img, draw=False)
+        frame = detector.find_landmark_frame()
+        return stream_id, index, (frame.data.copy() if frame else None), time.perf_counter() - t0, None
+    except Exception as e:
+        return stream_id, index, None, time.perf_counter() - t0, repr(e)
+
+
+def _forget(stream_id):
+    """작업 프로세스에서 다른 프로세스로 옮겨졌거나 끝난 스트림의 PoseDetector를 닫습니다."""
+    detector = _worker_detectors.pop(stream_id, None)
+    if detector is not None:
+        detector.pose.close()
+
+
+class _StreamDispatcher:
+    """PostureFeedback의 이벤트에 스트림 이름을 붙여 공용 디스패처로 넘깁니다(스트림끼리 병합되지 않도록 키도 구분)."""
+    def __init__(self, dispatcher, name):
+        self.dispatcher = dispatcher
+        self.name = name
+
+    def dispatch(self, event):
+        return self.dispatcher.dispatch(FeedbackEvent(
+            f"{self.name}:{event.key}", f"[{self.name}] {event.message}", kind=event.kind,
+            extra={**event.extra, 'stream': self.name, 'status': event.key}))
+
+
+class Stream:
+    """스트림 하나의 캡처 스레드, 최신 프레임 큐, 분석 상태와 통계."""
+    def __init__(self, index, source, name, dispatcher, max_width=640, loop=False, min_visibility=None):
+        self.index = index
+        self.source = source
+        self.name = name
+        self.max_width = max_width
+        self.loop = loop
+        self.queue = LatestQueue(1)
+        self.session = PostureFeedback(_StreamDispatcher(dispatcher, name), smoother=LandmarkSmoother(),
+                                       min_visibility=min_visibility)
+        self._ring = LandmarkRing(4)
+        self._thread = threading.Thread(target=self._capture_loop, name=f"capture-{name}", daemon=True)
+        self._stop = threading.Event()
+
+        # 스케줄러 상태
+        self.worker = None  # 배정된 작업 프로세스 번호(추적 그래프 고정)
+        self.inflight = False
+        self.last_served = 0.0
+        self.next_due = 0.0
+        self.target_fps = None
+
+        # 통계
+        self.captured = 0
+        self.processed = 0
+        self.infer_ms = 0.0
+        self.latency_ms = 0.0
+        self.active_issues = []
+        self.error = None
+        self._done_times = deque(maxlen=64)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.queue.close()
+
+    @property
+    def alive(self):
+        return self._thread.is_alive()
+
+    def _capture_loop(self):
+        """
+        프레임을 읽어 최신 프레임 큐에 넣습니다. 파일 입력은 원래 FPS에 맞추어 읽으므로 카메라처럼 동작합니다.
+        큰 프레임은 max_width로 줄여 프로세스 간 전송량을 줄입니다(랜드마크는 정규화 좌표라 영향 없음).
+        """
+        cap = cv2.VideoCapture(self.source)
+        is_file = isinstance(self.source, str) and '://' not in self.source
+        interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0) if is_file else 0.0
+        next_at = time.perf_counter()
+        try:
+            if not cap.isOpened():
+                self.error = "입력을 열 수 없습니다"
+                return
+            while not self._stop.is_set():
+                success, img = cap.read()
+                if not success:
+                    if is_file and self.loop:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    break
+                now = time.perf_counter()
+                if img.shape[1] > self.max_width:
+                    scale = self.max_width / img.shape[1]
+                    img = cv2.resize(img, (self.max_width, int(img.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+                self.queue.put(FramePacket(self.captured, now, img))
+                self.captured += 1
+                if interval:
+                    next_at = max(next_at + interval, now - interval)
+                    self._stop.wait(max(next_at - time.perf_counter(), 0.0))
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            cap.release()
+            self.queue.close()
+
+    def handle_result(self, capture_time, landmarks, infer_s):
+        """추론 결과로 이 스트림의 평활/분석/피드백 상태를 갱신합니다(결과 처리 스레드에서 호출)."""
+        frame = self._ring.next()
+        if landmarks is None:
+            frame.invalidate(capture_time)
+        else:
+            frame.data[:] = landmarks
+            frame.valid = True
+            frame.timestamp = capture_time
+        smoothed = self.session.smoother.process(frame, capture_time)
+        self.session.update(analyze_items(smoothed, self.session.min_visibility), capture_time)
+        self.active_issues = [
+            status for status in self.session.display_state.confirmed.values() if status not in ('GOOD', 'UNKNOWN')
+        ]
+
+        now = time.perf_counter()
+        self.infer_ms = 1000.0 * infer_s if self.processed == 0 else 0.9 * self.infer_ms + 100.0 * infer_s
+        latency = (now - capture_time) * 1000.0
+        self.latency_ms = latency if self.processed == 0 else 0.9 * self.latency_ms + 0.1 * latency
+        self.processed += 1
+        self._done_times.append(now)
+
+    def fps(self, window_seconds=5.0):
+        """최근 window_seconds 동안의 분석 완료 빈도."""
+        now = time.perf_counter()
+        recent = [t for t in self._done_times if now - t <= window_seconds]
+        if len(recent) < 2:
+            return 0.0
+        return (len(recent) - 1) / max(now - recent[0], 1e-6)
+
+    def stats(self):
+        return {
+            'source': str(self.source),
+            'captured': self.captured,
+            'processed': self.processed,
+            'fps': self.fps(),
+            'target_fps': self.target_fps,
+            'worker': self.worker,
+            'queue_depth': len(self.queue) + int(self.inflight),
+            'dropped': self.queue.dropped,
+            'infer_ms': self.infer_ms,
+            'latency_ms': self.latency_ms,
+            'issues': list(self.active_issues),
+            'alive': self.alive,
+            'error': self.error,
+        }
+
+
+class StreamServer:
+    """
+    다중 스트림 분석 서버.
+    - sources: 입력 리스트(카메라 번호 int 또는 URL/파일 경로 str)
+    - workers: 추론 작업 프로세스 수. 각 스트림은 배정이 가장 적은 작업 프로세스에 고정되며, 스트림이 끝나면 다시 균형을 맞춥니다.
+    - max_fps: 스트림당 최대 추론 빈도. 풀 처리량이 부족하면 살아 있는 스트림 수로 공평하게 나눈 빈도로 낮춥니다.
+    - dispatcher: 피드백 이벤트를 받을 FeedbackDispatcher(생략 시 콘솔 출력)
+    - max_width: 작업 프로세스로 보내기 전 프레임 최대 너비
+    - loop: 파일 입력을 끝에서 다시 재생
+    - min_visibility: 관절 visibility가 이보다 낮은 항목은 판단 보류(None이면 보류 안 함)
+    """
+    def __init__(self, sources, workers=2, max_fps=10.0, dispatcher=None, names=None, max_width=640,
+                 loop=False, min_visibility=None):
+        self.workers = workers
+        self.max_fps = max_fps
+        self._own_dispatcher = dispatcher is None
+        self.dispatcher = dispatcher or FeedbackDispatcher([ConsoleSink()])
+        names = names or [f"s{i}" for i in range(len(sources))]
+        self.streams = [
+            Stream(i, src, name, self.dispatcher, max_width=max_width, loop=loop, min_visibility=min_visibility)
+            for i, (src, name) in enumerate(zip(sources, names))
+        ]
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._running = False
+        self._pools = []  # 작업 프로세스마다 프로세스 1개짜리 풀(스트림 고정용)
+        self._busy = [None] * workers  # 작업 프로세스 번호 → 추론 중인 스트림 번호
+        self.rebalances = 0
+        self._scheduler = None
+        self._pending = {}  # 스트림 번호 → 추론 중인 프레임의 캡처 시각
+        self.pool_infer_ms = None  # 작업 프로세스 추론 시간(지수 이동 평균)
+        self._started_at = None
+
+    def start(self):
+        if self._own_dispatcher:
+            self.dispatcher.start()
+        self._pools = [multiprocessing.Pool(processes=1, initializer=_init_worker) for _ in range(self.workers)]
+        self._running = True
+        self._started_at = time.perf_counter()
+        for stream in self.streams:
+            stream.start()
+        self._scheduler = threading.Thread(target=self._schedule_loop, name="stream-scheduler", daemon=True)
+        self._scheduler.start()
+        return self
+
+    def _fair_fps(self, active):
+        """풀 처리량 추정치를 활성 스트림 수로 나눈 스트림당 빈도(max_fps 이하)."""
+        if not self.pool_infer_ms or not active:
+            return self.max_fps
+        capacity = self.workers * 1000.0 / self.pool_infer_ms
+        return min(self.max_fps, capacity / active)
+
+    def _move(self, stream, worker):
+        """스트림을 작업 프로세스 worker에 배정합니다. 이전 프로세스의 추적 그래프는 닫습니다(_cond 보유 중 호출)."""
+        if stream.worker is not None:
+            self._pools[stream.worker].apply_async(_forget, (stream.index,))
+        stream.worker = worker
+
+    def _balance(self, live):
+        """
+        끝난 스트림의 배정을 풀고, 새 스트림은 배정이 가장 적은 작업 프로세스에 붙입니다.
+        배정 수 차이가 2 이상이면 많은 쪽의 추론 중이 아닌 스트림을 적은 쪽으로 옮깁니다(_cond 보유 중 호출).
+        """
+        alive = {s.index for s in live}
+        for s in self.streams:
+            if s.worker is not None and s.index not in alive and not s.inflight:
+                self._pools[s.worker].apply_async(_forget, (s.index,))
+                s.worker = None
+        load = [0] * self.workers
+        for s in live:
+            if s.worker is not None:
+                load[s.worker] += 1
+        for s in live:
+            if s.worker is None:
+                worker = load.index(min(load))
+                self._move(s, worker)
+                load[worker] += 1
+        while max(load) - min(load) > 1:
+            src, dst = load.index(max(load)), load.index(min(load))
+            movable = [s for s in live if s.worker == src and not s.inflight]
+            if not movable:
+                break
+            self._move(movable[0], dst)
+            load[src] -= 1
+            load[dst] += 1
+            self.rebalances += 1
+
+    def _schedule_loop(self):
+        """쉬고 있는 작업 프로세스에 배정된 스트림 중 차례가 되었고 가장 오래 기다린 스트림의 최신 프레임을 보냅니다."""
+        while self._running:
+            with self._cond:
+                while self._running and self._inflight >= self.workers:
+                    self._cond.wait(0.1)
+                if not self._running:
+                    break
+                now = time.perf_counter()
+                live = [s for s in self.streams if s.alive or len(s.queue) or s.inflight]
+                self._balance(live)
+                fair = self._fair_fps(len(live))
+                ready = [s for s in live if self._busy[s.worker] is None and now >= s.next_due and len(s.queue)]
+                if not ready:
+                    self._cond.wait(0.005)
+                    continue
+                stream = min(ready, key=lambda s: s.last_served)
+                packet = stream.queue.get(timeout=0)
+                if packet is None:
+                    continue
+                worker = stream.worker
+                stream.inflight = True
+                stream.last_served = now
+                stream.target_fps = fair
+                stream.next_due = now + 1.0 / fair
+                self._pending[stream.index] = packet.capture_time
+                self._busy[worker] = stream.index
+                self._inflight += 1
+            self._pools[worker].apply_async(_detect, ((stream.index, packet.index, packet.img),),
+                                            callback=self._on_result,
+                                            error_callback=partial(self._on_error, worker))
+
+    def _release(self, stream_index):
+        with self._cond:
+            self.streams[stream_index].inflight = False
+            self._busy[self.streams[stream_index].worker] = None
+            self._inflight -= 1
+            self._cond.notify_all()
+            return self._pending.pop(stream_index, None)
+
+    def _on_result(self, result):
+        stream_index, _, landmarks, infer_s, error = result
+        capture_time = self._release(stream_index)
+        stream = self.streams[stream_index]
+        if error is not None:
+            print(f"[스트림 서버] {stream.name} 추론 오류: {error}")
+            return
+        ms = infer_s * 1000.0
+        self.pool_infer_ms = ms if self.pool_infer_ms is None else 0.9 * self.pool_infer_ms + 0.1 * ms
+        try:
+            stream.handle_result(capture_time, landmarks, infer_s)
+        except Exception as e:
+            print(f"[스트림 서버] {stream.name} 분석 오류: {e}")
+
+    def _on_error(self, worker, error):
+        """작업 전달/결과 전송 등 풀 수준의 실패. 작업 프로세스마다 추론은 하나뿐이므로 해당 스트림을 풉니다."""
+        print(f"[스트림 서버] 작업 프로세스 {worker} 오류: {error}")
+        with self._cond:
+            stream_index = self._busy[worker]
+        if stream_index is not None:
+            self._release(stream_index)
+
+    @property
+    def finished(self):
+        """모든 입력이 끝났고 처리 중인 프레임이 없는지 여부."""
+        return all(not s.alive and not len(s.queue) and not s.inflight for s in self.streams)
+
+    def stats(self):
+        """스트림별 통계와 풀 전체 요약."""
+        elapsed = max(time.perf_counter() - (self._started_at or time.perf_counter()), 1e-6)
+        return {
+            'streams': {s.name: s.stats() for s in self.streams},
+            'pool': {
+                'workers': self.workers,
+                'inflight': self._inflight,
+                'infer_ms': self.pool_infer_ms,
+                'fair_fps': self._fair_fps(sum(s.alive for s in self.streams)),
+                'rebalances': self.rebalances,
+                'processed_fps': sum(s.processed for s in self.streams) / elapsed,
+            },
+        }
+
+    def format_stats(self):
+        report = self.stats()
+        lines = []
+        for name, s in report['streams'].items():
+            state = "" if s['alive'] else f" (종료{': ' + s['error'] if s['error'] else ''})"
+            issues = ",".join(s['issues']) or "-"
+            lines.append(f"  {name}: {s['fps']:.1f}fps (목표 {s['target_fps'] or 0:.1f}) w={s['worker']} q={s['queue_depth']} "
+                         f"drop={s['dropped']} infer {s['infer_ms']:.0f}ms latency {s['latency_ms']:.0f}ms "
+                         f"issues={issues}{state}")
+        pool = report['pool']
+        head = (f"[스트림 서버] workers={pool['workers']} inflight={pool['inflight']} "
+                f"infer {pool['infer_ms'] or 0:.0f}ms 전체 {pool['processed_fps']:.1f}fps")
+        return "\n".join([head] + lines)
+
+    def run(self, duration=None, stats_interval=5.0):
+        """duration초 동안(None이면 입력이 끝나거나 Ctrl+C까지) 실행하며 주기적으로 통계를 출력합니다."""
+        deadline = None if duration is None else time.perf_counter() + duration
+        next_report = time.perf_counter() + stats_interval
+        try:
+            while not self.finished and (deadline is None or time.perf_counter() < deadline):
+                time.sleep(0.1)
+                if time.perf_counter() >= next_report:
+                    print(self.format_stats())
+                    next_report += stats_interval
+        except KeyboardInterrupt:
+            pass
+        print(self.format_stats())
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        for stream in self.streams:
+            stream.stop()
+        if self._scheduler is not None:
+            self._scheduler.join(1.0)
+        for pool in self._pools:
+            pool.terminate()
+        for pool in self._pools:
+            pool.join()
+        if self._own_dispatcher:
+            self.dispatcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="다중 스트림 자세 분석 서버 (헤드리스)")
+    parser.add_argument("sources", nargs='+', help="카메라 번호, 스트림 URL 또는 영상 파일")
+    parser.add_argument("--names", help="스트림 이름(쉼표 구분, 기본 s0, s1, ...)")
+    parser.add_argument("--workers", type=int, default=max((multiprocessing.cpu_count() or 2) // 2, 1),
+                        help="추론 작업 프로세스 수 (기본: CPU 코어 수의 절반)")
+    parser.add_argument("--max-fps", type=float, default=10.0, help="스트림당 최대 추론 빈도 (기본 10)")
+    parser.add_argument("--max-width", type=int, default=640, help="추론 전 프레임 최대 너비 (기본 640)")
+    parser.add_argument("--loop", action='store_true', help="영상 파일 입력을 반복 재생")
+    parser.add_argument("--min-visibility", type=float, nargs='?', const=0.5, default=None,
+                        help="관절 visibility가 이 값보다 낮은 항목은 판단을 보류합니다(값 생략 시 0.5, 기본: 끔)")
+    parser.add_argument("--duration", type=float, default=None, help="실행 시간(초, 기본: 입력이 끝날 때까지)")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="통계 출력 주기(초)")
+    parser.add_argument("--feedback-log", help="피드백 이벤트를 JSONL로 기록할 파일 경로")
+    parser.add_argument("--webhook", help="피드백 이벤트를 POST할 HTTP 주소")
+    args = parser.parse_args(argv)
+
+    sinks = [ConsoleSink()]
+    if args.feedback_log:
+        sinks.append(JsonlFileSink(args.feedback_log))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    dispatcher = FeedbackDispatcher(sinks).start()
+    names = [n.strip() for n in args.names.split(',')] if args.names else None
+
+    server = StreamServer([parse_source(s) for s in args.sources], workers=args.workers, max_fps=args.max_fps,
+                          dispatcher=dispatcher, names=names, max_width=args.max_width, loop=args.loop,
+                          min_visibility=args.min_visibility).start()
+    try:
+        server.run(args.duration, args.stats_interval)
+    finally:
+        server.stop()
+        dispatcher.stop()
+        print(f"[피드백] {dispatcher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from ergonomics_rules import MIN_VISIBILITY, STATUS_NAMES, analyze_batch
+from landmark_frame import LandmarkFrame
+from main import analyze_items
+
+
+def random_landmarks(n, seed=0):
+    """상태가 고루 나오도록 흩뿌린 (n, 33, 4) float32 랜드마크(visibility도 0~1 무작위)."""
+    rng = np.random.default_rng(seed)
+    landmarks = np.empty((n, 33, 4), dtype=np.float32)
+    landmarks[:, :, :2] = rng.uniform(0.0, 1.0, (n, 33, 2))
+    landmarks[:, :, 2] = rng.uniform(-0.6, 0.6, (n, 33))
+    landmarks[:, :, 3] = rng.uniform(0.0, 1.0, (n, 33))
+    return landmarks
+
+
+def as_frame(data):
+    frame = LandmarkFrame()
+    frame.data[:] = data
+    frame.valid = True
+    return frame
+
+
+@pytest.mark.parametrize('min_visibility', [None, MIN_VISIBILITY])
+def test_analyze_batch_matches_per_frame_analysis(min_visibility):
+    landmarks = random_landmarks(2000)
+    batch = analyze_batch(landmarks, min_visibility=min_visibility)
+    seen = set()
+    for i, data in enumerate(landmarks):
+        expected = {item: (status, msg) for item, status, msg in analyze_items(as_frame(data), min_visibility)}
+        head, shoulder, elbow, eye = batch.messages(i)
+        assert {'head': head, 'shoulder': shoulder, 'elbow': elbow, 'eye': eye} == expected, f"프레임 {i}"
+        seen.update(status for status, _ in expected.values())
+    # 모든 상태가 한 번 이상 나와야 비교가 의미 있습니다(판단 보류는 보류 기준이 있을 때만).
+    assert seen == set(STATUS_NAMES) - ({'UNKNOWN'} if min_visibility is None else set())
@@ -0,0 +1,132 @@
+import json
+import threading
+
+import pytest
+
+from feedback_dispatcher import (
+    BLOCK,
+    DROP_NEWEST,
+    DROP_OLDEST,
+    FeedbackDispatcher,
+    FeedbackEvent,
+    JsonlFileSink,
+    StubWebhookServer,
+    WebhookSink,
+)
+
+
+class GateSink:
+    """gate가 열릴 때까지 handle()에서 기다리는 싱크(작업 스레드를 붙잡아 두는 용도)."""
+    name = 'gate'
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+        self.handled = []
+        self.closed = False
+        self.used_after_close = False
+
+    def handle(self, event):
+        self.entered.set()
+        self.gate.wait(5.0)
+        self.used_after_close |= self.closed
+        self.handled.append(event.key)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def webhook():
+    server = StubWebhookServer().start()
+    yield server
+    server.stop()
+
+
+def test_coalesces_pending_events_and_delivers_to_jsonl_and_webhook(tmp_path, webhook):
+    path = tmp_path / "feedback.jsonl"
+    dispatcher = FeedbackDispatcher([JsonlFileSink(str(path)), WebhookSink(webhook.url)])
+    assert dispatcher.dispatch(FeedbackEvent('SLUMPED', "첫 문구"))
+    assert not dispatcher.dispatch(FeedbackEvent('SLUMPED', "새 문구"))
+    assert dispatcher.dispatch(FeedbackEvent('FORWARD_HEAD', "목"))
+    dispatcher.start()
+    assert dispatcher.stop(5.0)
+
+    lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [(e['key'], e['message'], e['count']) for e in lines] == [('SLUMPED', "새 문구", 2), ('FORWARD_HEAD', "목", 1)]
+    assert [(e['key'], e['count']) for e in webhook.received] == [('SLUMPED', 2), ('FORWARD_HEAD', 1)]
+    assert dispatcher.stats()['coalesced'] == 1
+
+
+def test_coalesces_repeat_within_window_after_delivery(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    dispatcher = FeedbackDispatcher([JsonlFileSink(str(path))], coalesce_window=60.0).start()
+    dispatcher.dispatch(FeedbackEvent('SLUMPED', "a"))
+    with dispatcher._cond:
+        dispatcher._cond.wait_for(lambda: 'SLUMPED' in dispatcher._last_delivered, 5.0)
+    assert not dispatcher.dispatch(FeedbackEvent('SLUMPED', "b"))
+    dispatcher.stop(5.0)
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 1
+
+
+@pytest.mark.parametrize('overflow, kept', [(DROP_OLDEST, ['k1', 'k2']), (DROP_NEWEST, ['k0', 'k1'])])
+def test_drop_policies(overflow, kept):
+    dispatcher = FeedbackDispatcher([], max_pending=2, overflow=overflow)
+    results = [dispatcher.dispatch(FeedbackEvent(f"k{i}", "m")) for i in range(3)]
+    assert list(dispatcher._pending) == kept
+    assert dispatcher.dropped == 1
+    assert results == ([True, True, True] if overflow == DROP_OLDEST else [True, True, False])
+
+
+def test_block_policy_never_exceeds_max_pending():
+    sink = GateSink()
+    dispatcher = FeedbackDispatcher([sink], max_pending=2, overflow=BLOCK).start()
+    dispatcher.dispatch(FeedbackEvent('k0', "m"))
+    assert sink.entered.wait(5.0)  # 작업 스레드가 k0을 붙잡고 있음
+    dispatcher.dispatch(FeedbackEvent('k1', "m"))
+    dispatcher.dispatch(FeedbackEvent('k2', "m"))
+
+    senders = [threading.Thread(target=dispatcher.dispatch, args=(FeedbackEvent(f"k{i}", "m"),)) for i in (3, 4)]
+    for t in senders:
+        t.start()
+    for t in senders:
+        t.join(0.2)
+        assert t.is_alive()  # 큐가 가득 차 대기 중
+    assert len(dispatcher._pending) == 2
+
+    sink.gate.set()
+    for t in senders:
+        t.join(5.0)
+    assert dispatcher.stop(5.0)
+    assert sorted(sink.handled) == ['k0', 'k1', 'k2', 'k3', 'k4']
+    assert dispatcher.dropped == 0
+
+
+def test_block_policy_drops_when_stopped_with_full_queue():
+    dispatcher = FeedbackDispatcher([], max_pending=1, overflow=BLOCK)
+    assert dispatcher.dispatch(FeedbackEvent('k0', "m"))
+    assert not dispatcher.dispatch(FeedbackEvent('k1', "m"))  # 작업 스레드가 없으면 기다리지 않고 버림
+    assert len(dispatcher._pending) == 1
+    assert dispatcher.dropped == 1
+
+
+def test_sinks_are_closed_by_worker_after_it_exits():
+    sink = GateSink()
+    dispatcher = FeedbackDispatcher([sink]).start()
+    dispatcher.dispatch(FeedbackEvent('k0', "m"))
+    assert sink.entered.wait(5.0)
+
+    assert not dispatcher.stop(timeout=0.05)  # 전달 중이라 제시간에 끝나지 않음
+    assert not sink.closed
+
+    sink.gate.set()
+    dispatcher._thread.join(5.0)
+    assert sink.closed
+    assert not sink.used_after_close
+    assert sink.handled == ['k0']
+
+
+def test_stop_without_start_closes_sinks():
+    sink = GateSink()
+    assert FeedbackDispatcher([sink]).stop()
+    assert sink.closed
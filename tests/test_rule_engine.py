@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from ergonomics_rules import MIN_VISIBILITY
+from landmark_frame import LandmarkFrame
+from main import analyze_items
+from rule_engine import DEFAULT_RULES_PATH, RuleEngine, load_rules
+from test_batch_parity import as_frame, random_landmarks
+
+
+@pytest.mark.parametrize('min_visibility', [None, MIN_VISIBILITY])
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_default_rules_match_analyze_items(min_visibility, dtype):
+    engine = RuleEngine(reload_interval=float('inf'), min_visibility=min_visibility)
+    for i, data in enumerate(random_landmarks(2000, seed=1)):
+        landmarks = as_frame(data) if dtype == np.float32 else data.astype(dtype).tolist()
+        assert engine.evaluate(landmarks) == analyze_items(landmarks, min_visibility), f"프레임 {i}"
+
+
+def test_missing_landmarks_evaluate_to_empty():
+    engine = RuleEngine(reload_interval=float('inf'))
+    assert engine.evaluate(LandmarkFrame()) == []
+    assert engine.evaluate([]) == []
+
+
+def _outside_rhs_scalar(config):
+    for rule in config['rules']:
+        for check in rule['checks']:
+            if check['issue_if']['op'] == 'outside':
+                check['issue_if']['rhs'] = 80
+
+
+MALFORMED = {
+    'outside_rhs_scalar': _outside_rhs_scalar,
+    'checks_not_list': lambda c: c['rules'][0].__setitem__('checks', 5),
+    'rule_is_string': lambda c: c['rules'].__setitem__(0, "head"),
+    'lhs_is_point': lambda c: c['rules'][0]['checks'][0]['issue_if'].__setitem__('lhs', 'shoulder_center'),
+    'bad_format_spec': lambda c: c['rules'][0]['checks'][0].__setitem__('message', "{cva:q}"),
+    'unknown_feature': lambda c: c['rules'][0]['checks'][0]['issue_if'].__setitem__('lhs', 'no_such_feature'),
+}
+
+
+@pytest.mark.parametrize('name', sorted(MALFORMED))
+def test_malformed_rules_raise_value_error(tmp_path, name):
+    with open(DEFAULT_RULES_PATH, encoding='utf-8') as f:
+        config = json.load(f)
+    MALFORMED[name](config)
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(config), encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_rules(str(path))
+
+
+@pytest.mark.parametrize('content', ["{ not json", json.dumps({'rules': [5]}), json.dumps({'rules': {}})])
+def test_malformed_hot_reload_keeps_previous_rules(tmp_path, content):
+    path = tmp_path / "rules.json"
+    shutil.copy(DEFAULT_RULES_PATH, path)
+    engine = RuleEngine(str(path), reload_interval=0.0)
+    previous = engine.compiled
+    landmarks = as_frame(random_landmarks(1, seed=2)[0])
+    expected = engine.evaluate(landmarks)
+
+    path.write_text(content, encoding='utf-8')
+    os.utime(path, ns=(0, 0))  # 크기가 같아도 mtime이 바뀌도록
+    assert engine.evaluate(landmarks) == expected
+    assert engine.compiled is previous
+    assert engine.reloads == 0
+
+
+def test_valid_hot_reload_applies_new_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    with open(DEFAULT_RULES_PATH, encoding='utf-8') as f:
+        config = json.load(f)
+    path.write_text(json.dumps(config), encoding='utf-8')
+    engine = RuleEngine(str(path), reload_interval=0.0)
+
+    config['constants']['cva_min'] = 180
+    path.write_text(json.dumps(config), encoding='utf-8')
+    os.utime(path, ns=(0, 0))
+    data = random_landmarks(1, seed=3)[0]
+    data[:, 3] = 1.0
+    items = dict((item, status) for item, status, _ in engine.evaluate(as_frame(data)))
+    assert engine.reloads == 1
+    assert items['head'] == 'FORWARD_HEAD'
@@ -0,0 +1,398 @@
+"""
+기록된 랜드마크(세션 로그 .plog)로 ergonomics_rules 임계값 조합을 한꺼번에 평가하는 보정 도구.
+- 스윕 축: cva_min, slump_z, eye_down_diff, elbow_min, elbow_max (각 축은 값 목록, 기본값은 항상 포함)
+- 프레임마다 축별로 "이 임계값부터 문제/양호가 바뀌는 격자 위치"를 searchsorted로 구하고,
+  그 위치의 5차원 히스토그램을 누적합하여 모든 조합의 결과를 한 번에 얻습니다(조합 수와 무관하게 프레임당 한 번 계산).
+  · 팔꿈치는 보이는 팔의 각도 중 최솟값(elbow_min과 비교)과 최댓값(elbow_max와 비교)으로 바꾸어 두 축으로 나눕니다.
+  · 히스토그램은 더할 수 있으므로 기록을 구간으로 나누어 여러 프로세스에서 만든 뒤 합칩니다.
+- 결과: 조합별 경보율(문제가 하나라도 있는 검출 프레임 비율, 히스테리시스 적용 전)과,
+  라벨 파일이 있으면 라벨과의 일치율/정밀도/재현율 및 (경보율↓, 일치율↑) 파레토 최적 조합.
+  라벨이 없으면 --target-alert-rate 이하의 조합 중 현재 기본값에 가장 가까운 조합을 보여 줍니다.
+라벨 파일(CSV, 머리글 줄 필요): start,end,label[,item]
+- start/end: 'HH:MM[:SS]'(기록 날짜 기준), ISO 시각, 또는 UNIX 초
+- label: issue/good (또는 1/0, 상태 이름 — GOOD이면 양호, 그 밖은 문제)
+- item: head, shoulder, eye, elbow 중 하나면 그 항목만, 비우거나 any면 "문제가 하나라도 있음"과 비교합니다.
+  구간이 겹치면 파일에서 나중 줄이 우선합니다.
+사용 예:
+   python threshold_sweep.py today.plog --labels labels.csv
+   python threshold_sweep.py today.plog --cva-min 55:75:1 --elbow-min 70,75,80 --target-alert-rate 0.2
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from ergonomics_rules import (
+    analyze_batch,
+    CVA_MIN_DEG,
+    ELBOW_MIN_DEG,
+    ELBOW_MAX_DEG,
+    EYE_DOWN_NOSE_DIFF,
+    SLUMP_Z_THRESHOLD,
+    MIN_VISIBILITY,
+    UNKNOWN,
+)
+from landmark_frame import LANDMARK_INDEX
+from session_log import SessionLog, _parse_time
+
+AXES = ('cva_min', 'slump_z', 'eye_down_diff', 'elbow_min', 'elbow_max')
+DEFAULTS = {
+    'cva_min': CVA_MIN_DEG,
+    'slump_z': SLUMP_Z_THRESHOLD,
+    'eye_down_diff': EYE_DOWN_NOSE_DIFF,
+    'elbow_min': ELBOW_MIN_DEG,
+    'elbow_max': ELBOW_MAX_DEG,
+}
+DEFAULT_GRID = {
+    'cva_min': "50:80:2",
+    'slump_z': "-0.4:-0.05:0.025",
+    'eye_down_diff': "0:0.08:0.005",
+    'elbow_min': "60:95:2.5",
+    'elbow_max': "95:130:2.5",
+}
+# 축별 비교 방향: 'below'는 값 < 임계값이면 문제, 'above'는 값 > 임계값이면 문제
+_DIRECTION = {'cva_min': 'below', 'slump_z': 'below', 'eye_down_diff': 'above', 'elbow_min': 'below',
+              'elbow_max': 'above'}
+ITEM_AXES = {'head': ('cva_min',), 'shoulder': ('slump_z',), 'eye': ('eye_down_diff',),
+             'elbow': ('elbow_min', 'elbow_max')}
+ANY = 'any'
+# 웹캠 좌우 반전으로 화면상 왼팔은 MediaPipe의 right_* 관절입니다.
+_LEFT_ARM = [LANDMARK_INDEX[j] for j in ('right_shoulder', 'right_elbow', 'right_wrist')]
+_RIGHT_ARM = [LANDMARK_INDEX[j] for j in ('left_shoulder', 'left_elbow', 'left_wrist')]
+
+
+def parse_grid(spec, default):
+    """'시작:끝:간격'(끝 포함) 또는 '값,값,...'을 정렬된 격자로 바꿉니다. 기본값은 항상 포함됩니다."""
+    if ':' in spec:
+        start, stop, step = (float(v) for v in spec.split(':'))
+        values = np.arange(start, stop + step / 2, step)
+    else:
+        values = np.array([float(v) for v in spec.split(',') if v.strip()])
+    return np.union1d(np.round(values, 6), [default])
+
+
+def frame_values(landmarks, min_visibility=None):
+    """
+    (N, 33, 4) float32 랜드마크에서 축별 비교 값을 계산합니다(임계값과 무관한 부분).
+    가려진 관절로 판단을 보류(UNKNOWN)하는 항목은 어떤 임계값에서도 문제가 되지 않도록 ±inf로 둡니다.
+    min_visibility가 None이면 실시간 모드 기본값처럼 판단을 보류하지 않습니다.
+    - 반환: {축 이름: (N,) 배열}
+    """
+    batch = analyze_batch(landmarks, min_visibility=min_visibility)
+    if min_visibility is None:
+        hidden = np.zeros(landmarks.shape[:2], dtype=bool)
+    else:
+        hidden = landmarks[:, :, 3] < min_visibility
+    inf = np.float32(np.inf)
+
+    cva = np.where(batch.head_status == UNKNOWN, inf, batch.cva)
+    slump = np.where(batch.shoulder_status == UNKNOWN, inf, batch.shoulder_z_delta)
+    eye = np.where(batch.eye_status == UNKNOWN, -inf, batch.nose_eye_diff)
+
+    hidden_left = hidden[:, _LEFT_ARM].any(axis=1)
+    hidden_right = hidden[:, _RIGHT_ARM].any(axis=1)
+    left, right = batch.left_elbow_angle, batch.right_elbow_angle
+    # 각도가 NaN이면 프레임 단위 분석과 같이 범위 밖(문제)으로 봅니다.
+    lo = np.minimum(np.where(hidden_left, inf, np.where(np.isnan(left), -inf, left)),
+                    np.where(hidden_right, inf, np.where(np.isnan(right), -inf, right)))
+    hi = np.maximum(np.where(hidden_left, -inf, np.where(np.isnan(left), inf, left)),
+                    np.where(hidden_right, -inf, np.where(np.isnan(right), inf, right)))
+    # NaN 비교는 항상 거짓이므로 CVA/어깨/시선의 NaN은 양호로 둡니다(프레임 단위 분석과 동일).
+    cva = np.where(np.isnan(cva), inf, cva)
+    slump = np.where(np.isnan(slump), inf, slump)
+    eye = np.where(np.isnan(eye), -inf, eye)
+    return {'cva_min': cva, 'slump_z': slump, 'eye_down_diff': eye, 'elbow_min': lo, 'elbow_max': hi}
+
+
+def coordinates(values, grid, direction):
+    """
+    격자 위치 좌표 c(0..len(grid)). 'below'는 격자 k < c에서 양호, 'above'는 k >= c에서 양호입니다.
+    비교는 값의 dtype(float32)으로 하므로 프레임 단위 분석과 경계값까지 같습니다.
+    """
+    grid = grid.astype(values.dtype)
+    side = 'right' if direction == 'below' else 'left'
+    return np.searchsorted(grid, values, side=side)
+
+
+def ok_counts(hist, axes):
+    """
+    좌표 히스토그램을 조합별 "양호 프레임 수"로 바꿉니다(축마다 누적합 한 번).
+    - hist: 축마다 len(grid)+1 크기, axes: hist 차원 순서의 축 이름
+    - 반환: 축마다 len(grid) 크기 배열
+    """
+    out = hist
+    for dim, name in enumerate(axes):
+        if _DIRECTION[name] == 'below':
+            out = np.flip(np.cumsum(np.flip(out, dim), axis=dim), dim)
+            out = np.delete(out, 0, axis=dim)
+        else:
+            out = np.delete(np.cumsum(out, axis=dim), -1, axis=dim)
+    return out
+
+
+def _histogram(coords, shape, mask=None):
+    flat = np.ravel_multi_index(coords, shape)
+    if mask is not None:
+        flat = flat[mask]
+    return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+
+def _label_array(timestamps, spans):
+    """라벨 구간을 프레임별 값(-1 없음, 0 양호, 1 문제)으로 바꿉니다. 나중 구간이 우선합니다."""
+    out = np.full(len(timestamps), -1, dtype=np.int8)
+    for start, end, value in spans:
+        lo, hi = np.searchsorted(timestamps, (start, end))
+        out[lo:hi] = value
+    return out
+
+
+def _sweep_chunk(task):
+    """작업 프로세스: 레코드 구간 하나의 좌표 히스토그램을 만듭니다(구간별 결과는 더해서 합칩니다)."""
+    path, lo, hi, grids, labels, min_visibility = task
+    log = SessionLog(path)
+    records = log.records[lo:hi]
+    lms = records['lm'].astype(np.float32)
+    detected = ~np.isnan(lms).any(axis=(1, 2))
+    timestamps = np.asarray(records['t'], dtype=np.float64)[detected]
+    values = frame_values(lms[detected], min_visibility)
+    coords = {name: coordinates(values[name], grids[name], _DIRECTION[name]) for name in AXES}
+    shape = tuple(len(grids[name]) + 1 for name in AXES)
+    result = {'records': hi - lo, 'detected': int(detected.sum()),
+              'all': _histogram(tuple(coords[name] for name in AXES), shape), 'labels': {}}
+    for group, spans in labels.items():
+        axes = AXES if group == ANY else ITEM_AXES[group]
+        label = _label_array(timestamps, spans)
+        sub_shape = tuple(len(grids[name]) + 1 for name in axes)
+        sub_coords = tuple(coords[name] for name in axes)
+        result['labels'][group] = (_histogram(sub_coords, sub_shape, label == 1),
+                                   _histogram(sub_coords, sub_shape, label == 0))
+    for item, axes in ITEM_AXES.items():
+        result[item] = _histogram(tuple(coords[name] for name in axes),
+                                  tuple(len(grids[name]) + 1 for name in axes))
+    return result
+
+
+def _merge(total, part):
+    if total is None:
+        return part
+    for key, value in part.items():
+        if key == 'labels':
+            for group, (pos, neg) in value.items():
+                if group in total['labels']:
+                    total['labels'][group] = (total['labels'][group][0] + pos, total['labels'][group][1] + neg)
+                else:
+                    total['labels'][group] = (pos, neg)
+        else:
+            total[key] = total[key] + value
+    return total
+
+
+def _broadcast(counts, axes):
+    """항목 축만 가진 배열을 전체 5축 배열에 맞게 늘립니다(복사 없는 보기)."""
+    shape = [1] * len(AXES)
+    for name, n in zip(axes, counts.shape):
+        shape[AXES.index(name)] = n
+    return counts.reshape(shape)
+
+
+def sweep(paths, grids=None, labels=None, workers=None, chunk=100000, min_visibility=None):
+    """
+    세션 로그들의 모든 임계값 조합을 평가합니다.
+    - grids: {축: 정렬된 값 배열}(생략하면 DEFAULT_GRID), labels: {그룹(항목 또는 'any'): [(start, end, 0/1)]}
+    - workers: 작업 프로세스 수(기본: CPU 코어 수, 1이면 현재 프로세스에서 처리)
+    - min_visibility: 판단 보류 기준(None이면 보류 안 함, 실시간 모드 기본값과 같음)
+    - 반환: dict(grids, records, detected, alert_rate(5차원), item_alert_rate{항목: 배열},
+                 라벨이 있으면 labeled, positives, agreement, precision, recall, f1(5차원))
+    """
+    grids = grids or {name: parse_grid(DEFAULT_GRID[name], DEFAULTS[name]) for name in AXES}
+    labels = labels or {}
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for path in paths:
+        n = len(SessionLog(path))
+        tasks.extend((path, lo, min(lo + chunk, n), grids, labels, min_visibility) for lo in range(0, n, chunk))
+
+    total = None
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            total = _merge(total, _sweep_chunk(task))
+    else:
+        with multiprocessing.Pool(processes=min(workers, len(tasks))) as pool:
+            for part in pool.imap_unordered(_sweep_chunk, tasks):
+                total = _merge(total, part)
+    if total is None:
+        raise ValueError("기록된 레코드가 없습니다")
+
+    detected = max(total['detected'], 1)
+    result = {'grids': grids, 'records': total['records'], 'detected': total['detected'],
+              'alert_rate': 1.0 - ok_counts(total['all'], AXES) / detected,
+              'item_alert_rate': {item: 1.0 - ok_counts(total[item], axes) / detected
+                                  for item, axes in ITEM_AXES.items()}}
+    if total['labels']:
+        tp = fp = 0
+        labeled = positives = 0
+        for group, (pos, neg) in total['labels'].items():
+            axes = AXES if group == ANY else ITEM_AXES[group]
+            n_pos, n_neg = int(pos.sum()), int(neg.sum())
+            tp = tp + _broadcast(n_pos - ok_counts(pos, axes), axes)
+            fp = fp + _broadcast(n_neg - ok_counts(neg, axes), axes)
+            labeled += n_pos + n_neg
+            positives += n_pos
+        tp = np.broadcast_to(tp, result['alert_rate'].shape)
+        fp = np.broadcast_to(fp, result['alert_rate'].shape)
+        tn = (labeled - positives) - fp
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+            recall = tp / positives if positives else np.zeros(tp.shape)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        result.update(labeled=labeled, positives=positives, agreement=(tp + tn) / max(labeled, 1),
+                      precision=precision, recall=recall, f1=f1)
+    return result
+
+
+def pareto_front(cost, benefit):
+    """(cost↓, benefit↑) 파레토 최적 조합의 평탄화 색인을 cost 오름차순으로 반환합니다."""
+    cost, benefit = cost.ravel(), benefit.ravel()
+    order = np.lexsort((-benefit, cost))
+    b = benefit[order]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], b[:-1])))
+    return order[b > best_before]
+
+
+def config_at(result, flat_index):
+    """평탄화 색인의 임계값 조합 dict."""
+    idx = np.unravel_index(flat_index, result['alert_rate'].shape)
+    return {name: float(result['grids'][name][i]) for name, i in zip(AXES, idx)}
+
+
+def default_index(result):
+    """기본 임계값 조합의 평탄화 색인."""
+    idx = tuple(int(np.searchsorted(result['grids'][name], np.round(DEFAULTS[name], 6))) for name in AXES)
+    return int(np.ravel_multi_index(idx, result['alert_rate'].shape))
+
+
+def closest_to_default(result, max_alert_rate, top=10):
+    """경보율이 max_alert_rate 이하인 조합 중 기본값과의 (축별 격자 범위로 정규화한) 거리가 가까운 순서의 색인."""
+    distance = 0.0
+    for dim, name in enumerate(AXES):
+        grid = result['grids'][name]
+        span = (grid[-1] - grid[0]) or 1.0
+        shape = [1] * len(AXES)
+        shape[dim] = len(grid)
+        distance = distance + (((grid - DEFAULTS[name]) / span) ** 2).reshape(shape)
+    distance = np.broadcast_to(distance, result['alert_rate'].shape).ravel()
+    candidates = np.flatnonzero(result['alert_rate'].ravel() <= max_alert_rate)
+    return candidates[np.argsort(distance[candidates], kind='stable')[:top]]
+
+
+def load_labels(path, reference):
+    """라벨 CSV를 {그룹: [(start, end, 0/1)]}로 읽습니다."""
+    labels = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            group = (row.get('item') or ANY).strip().lower()
+            if group != ANY and group not in ITEM_AXES:
+                raise ValueError(f"알 수 없는 항목: {group} (사용 가능: {', '.join(ITEM_AXES)}, {ANY})")
+            text = row['label'].strip()
+            value = 0 if text.lower() in ('good', '0', 'false', 'no') else 1
+            labels.setdefault(group, []).append(
+                (_parse_time(row['start'].strip(), reference), _parse_time(row['end'].strip(), reference), value))
+    return labels
+
+
+def _format_config(config):
+    return (f"cva_min {config['cva_min']:5.1f}  slump_z {config['slump_z']:6.3f}  "
+            f"eye_down_diff {config['eye_down_diff']:5.3f}  elbow {config['elbow_min']:5.1f}~{config['elbow_max']:5.1f}")
+
+
+def _row(result, i):
+    flat = {key: result[key].ravel()[i] for key in ('alert_rate', 'agreement', 'precision', 'recall', 'f1')
+            if key in result}
+    text = f"{_format_config(config_at(result, i))} | 경보율 {flat['alert_rate']:6.1%}"
+    if 'agreement' in flat:
+        text += (f"  일치율 {flat['agreement']:6.1%}  정밀도 {flat['precision']:6.1%}  "
+                 f"재현율 {flat['recall']:6.1%}  F1 {flat['f1']:.3f}")
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="세션 로그로 자세 임계값 조합을 병렬 스윕/보정")
+    parser.add_argument("paths", nargs='+', help="세션 로그(.plog) 경로")
+    parser.add_argument("--labels", help="라벨 CSV(start,end,label[,item])")
+    for name in AXES:
+        parser.add_argument("--" + name.replace('_', '-'), default=DEFAULT_GRID[name],
+                            help=f"{name} 격자('시작:끝:간격' 또는 쉼표 목록, 기본 {DEFAULT_GRID[name]})")
+    parser.add_argument("--min-visibility", type=float, nargs='?', const=MIN_VISIBILITY, default=None,
+                        help=f"관절 visibility가 이 값보다 낮은 항목은 판단을 보류합니다(고정, 값 생략 시 {MIN_VISIBILITY}, 기본: 끔)")
+    parser.add_argument("--workers", type=int, default=None, help="작업 프로세스 수(기본: CPU 코어 수)")
+    parser.add_argument("--chunk", type=int, default=100000, help="작업 단위 레코드 수(기본 100000)")
+    parser.add_argument("--target-alert-rate", type=float, default=None,
+                        help="이 경보율 이하에서 기본값에 가장 가까운 조합을 찾습니다(예: 0.2)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 조합 수(기본 10)")
+    parser.add_argument("-o", "--output", help="조합별 결과 배열을 저장할 .npz 경로")
+    parser.add_argument("--json", help="요약(기본값, 파레토/추천 조합)을 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+
+    grids = {name: parse_grid(getattr(args, name), DEFAULTS[name]) for name in AXES}
+    labels = None
+    if args.labels:
+        reference = float(SessionLog(args.paths[0]).timestamps[0])
+        labels = load_labels(args.labels, reference)
+
+    t0 = time.perf_counter()
+    result = sweep(args.paths, grids, labels, workers=args.workers, chunk=args.chunk,
+                   min_visibility=args.min_visibility)
+    elapsed = time.perf_counter() - t0
+    combos = result['alert_rate'].size
+    print(f"[스윕] 레코드 {result['records']}개(검출 {result['detected']}) × 조합 {combos}개, {elapsed:.1f}초")
+
+    base = default_index(result)
+    print(f"[스윕] 현재 기본값: {_row(result, base)}")
+    for item, axes in ITEM_AXES.items():
+        rates = result['item_alert_rate'][item]
+        if len(axes) == 1:
+            grid = grids[axes[0]]
+            points = ", ".join(f"{v:g}:{r:.0%}" for v, r in zip(grid, rates))
+            print(f"  {item:8s} 항목 경보율({axes[0]}) {points}")
+
+    summary = {'records': result['records'], 'detected': result['detected'], 'combinations': combos,
+               'seconds': elapsed, 'default': {'config': config_at(result, base), 'alert_rate': float(
+                   result['alert_rate'].ravel()[base])}}
+    if 'agreement' in result:
+        print(f"[스윕] 라벨 프레임 {result['labeled']}개(문제 {result['positives']}개)")
+        front = pareto_front(result['alert_rate'], result['agreement'])
+        picks = front[np.unique(np.linspace(0, len(front) - 1, min(args.top, len(front))).astype(int))]
+        print(f"[스윕] 파레토 최적 조합 {len(front)}개 중 {len(picks)}개(경보율↓, 일치율↑):")
+        for i in picks:
+            print("  " + _row(result, i))
+        best = int(np.argmax(result['f1'].ravel()))
+        print(f"[스윕] F1 최고: {_row(result, best)}")
+        summary['pareto'] = [dict(config_at(result, int(i)), alert_rate=float(result['alert_rate'].ravel()[i]),
+                                  agreement=float(result['agreement'].ravel()[i])) for i in front]
+        summary['best_f1'] = dict(config_at(result, best), f1=float(result['f1'].ravel()[best]))
+    if args.target_alert_rate is not None:
+        picks = closest_to_default(result, args.target_alert_rate, args.top)
+        print(f"[스윕] 경보율 {args.target_alert_rate:.0%} 이하에서 기본값에 가까운 조합 {len(picks)}개:")
+        for i in picks:
+            print("  " + _row(result, i))
+        summary['target'] = [dict(config_at(result, int(i)), alert_rate=float(result['alert_rate'].ravel()[i]))
+                             for i in picks]
+
+    if args.output:
+        arrays = {f"grid_{name}": grids[name] for name in AXES}
+        arrays.update({key: result[key] for key in ('alert_rate', 'agreement', 'precision', 'recall', 'f1')
+                       if key in result})
+        np.savez_compressed(args.output, **arrays)
+        print(f"[스윕] 조합별 결과 저장: {args.output}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=1)
+        print(f"[스윕] 요약 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+음성 안내용 TTS 오디오 캐시.
+- (text, language, backend) 내용 주소(SHA-1) 키로 합성 결과를 디스크와 메모리에 저장하고, 용량 제한을 넘으면 가장 오래 쓰지 않은 항목부터 삭제(LRU)합니다.
+- 각도 숫자가 들어간 메시지는 고정 문구 조각과 숫자 조각으로 나누어 캐시하므로, 숫자가 바뀌어도 매번 새로 합성하지 않습니다.
+- 합성 백엔드는 교체 가능합니다: gTTS(온라인), pyttsx3(오프라인 로컬 엔진).
+- prewarm()으로 ergonomics_rules의 고정 문구를 시작 시 미리 합성해 둘 수 있습니다.
+- 합성 라이브러리는 설치 여부만 확인해 두고 실제로 합성할 때 불러옵니다(시작 시간 단축).
+"""
+import hashlib
+import importlib.util
+import io
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+GTTS_AVAILABLE = importlib.util.find_spec("gtts") is not None
+
+# 오프라인 음성 합성은 선택 사항입니다(pip install pyttsx3).
+PYTTSX3_AVAILABLE = importlib.util.find_spec("pyttsx3") is not None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ergonomic_posture", "tts")
+
+_NUMBER_RE = re.compile(r"(\d+°?)")  # 각도 등 숫자 조각
+_SPEAKABLE_RE = re.compile(r"[^\W_]")  # 글자/숫자가 하나라도 있어야 읽을 조각으로 취급
+
+
+class GTTSBackend:
+    """gTTS(Google Translate TTS) 온라인 합성 백엔드. mp3를 반환합니다."""
+    name = 'gtts'
+    ext = 'mp3'
+
+    def synthesize(self, text, lang):
+        if not GTTS_AVAILABLE:
+            raise RuntimeError("gTTS가 설치되어 있지 않습니다. (pip install gTTS)")
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buf)
+        return buf.getvalue()
+
+
+class Pyttsx3Backend:
+    """pyttsx3(OS 내장 음성 엔진) 오프라인 합성 백엔드. 네트워크 없이 wav를 반환합니다."""
+    name = 'pyttsx3'
+    ext = 'wav'
+
+    def __init__(self):
+        self._engine = None
+        self._lock = threading.Lock()  # pyttsx3 엔진은 스레드 안전하지 않습니다.
+
+    def synthesize(self, text, lang):
+        if not PYTTSX3_AVAILABLE:
+            raise RuntimeError("pyttsx3가 설치되어 있지 않습니다. (pip install pyttsx3)")
+        with self._lock:
+            if self._engine is None:
+                import pyttsx3
+                self._engine = pyttsx3.init()
+                self._select_voice(lang)
+            fd, path = tempfile.mkstemp(suffix='.' + self.ext)
+            os.close(fd)
+            try:
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+                with open(path, 'rb') as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+    def _select_voice(self, lang):
+        """언어 코드와 맞는 음성이 있으면 선택합니다(없으면 시스템 기본 음성)."""
+        for voice in self._engine.getProperty('voices'):
+            langs = [str(code) for code in getattr(voice, 'languages', [])]
+            if any(lang in code for code in langs) or lang in str(voice.id).lower():
+                self._engine.setProperty('voice', voice.id)
+                return
+
+
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    Pyttsx3Backend.name: Pyttsx3Backend,
+}
+
+
+def make_backend(name):
+    """이름('gtts' 또는 'pyttsx3')으로 합성 백엔드 객체를 만듭니다."""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"알 수 없는 TTS 백엔드: {name} (사용 가능: {', '.join(BACKENDS)})")
+
+
+def split_phrases(message):
+    """
+    메시지를 고정 문구 조각과 숫자 조각으로 나눕니다.
+    - 숫자 조각의 '°'는 '도'로 읽히도록 바꾸고, 기호만 남은 조각(', ', ' < ' 등)은 버립니다.
+    - 예: "거북목 주의: CVA 65° < 70°. 귀를 어깨선과 맞추세요."
+          → ["거북목 주의: CVA", "65도", "70도", "귀를 어깨선과 맞추세요."]
+    """
+    phrases = []
+    for part in _NUMBER_RE.split(message):
+        if _NUMBER_RE.fullmatch(part):
+            phrases.append(part.replace('°', '도'))
+            continue
+        part = part.strip(" ,.:;~<>")
+        if part and _SPEAKABLE_RE.search(part):
+            phrases.append(part)
+    return phrases
+
+
+def ergonomics_phrases():
+    """ergonomics_rules의 경고 메시지에서 숫자를 제외한 고정 문구 조각을 모읍니다(사전 합성용)."""
+    from ergonomics_rules import (
+        FORWARD_HEAD, SLUMPED, ELBOW_ANGLE_ISSUE, LOOKING_DOWN,
+        head_message, shoulder_message, elbow_message, eye_message,
+    )
+    messages = [
+        head_message(FORWARD_HEAD, 0),
+        shoulder_message(SLUMPED),
+        eye_message(LOOKING_DOWN),
+        elbow_message(ELBOW_ANGLE_ISSUE, 0, 0, False, False),
+        elbow_message(ELBOW_ANGLE_ISSUE, 0, 0, False, True),
+        elbow_message(ELBOW_ANGLE_ISSUE, 0, 0, True, False),
+    ]
+    phrases = []
+    for message in messages:
+        for phrase in split_phrases(message):
+            if not _NUMBER_RE.match(phrase) and phrase not in phrases:
+                phrases.append(phrase)
+    return phrases
+
+
+class TTSAudioCache:
+    """
+    문구 단위 TTS 오디오 캐시.
+    - backend: 합성 백엔드(GTTSBackend, Pyttsx3Backend 등 synthesize(text, lang)/name/ext를 가진 객체)
+    - lang: 언어 코드
+    - cache_dir: 디스크 캐시 디렉터리(None이면 디스크 캐시 없이 메모리만 사용)
+    - max_disk_bytes / max_memory_bytes: 각 계층의 용량 상한(초과 시 LRU 삭제)
+    """
+    def __init__(self, backend=None, lang='ko', cache_dir=DEFAULT_CACHE_DIR,
+                 max_disk_bytes=50 * 1024 * 1024, max_memory_bytes=8 * 1024 * 1024):
+        self.backend = backend or GTTSBackend()
+        self.lang = lang
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> bytes (최근 사용이 뒤쪽)
+        self._memory_bytes = 0
+        self._disk = OrderedDict()    # key -> 파일 크기
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._scan_disk()
+
+    def key(self, text):
+        """(text, lang, backend)로 내용 주소 키를 만듭니다."""
+        raw = f"{self.backend.name}\0{self.lang}\0{text}".encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.{self.backend.ext}")
+
+    def _scan_disk(self):
+        """기존 디스크 캐시 파일을 수정 시각 순으로 LRU 목록에 등록합니다."""
+        suffix = '.' + self.backend.ext
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(suffix):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime, name[:-len(suffix)], st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _remember(self, key, data):
+        """메모리 LRU에 넣고 상한을 넘으면 오래된 항목을 내보냅니다(잠금 보유 상태에서 호출)."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _store_disk(self, key, data):
+        """디스크에 원자적으로 저장하고 상한을 넘으면 오래된 파일을 삭제합니다(잠금 보유 상태에서 호출)."""
+        path = self._path(key)
+        tmp = path + ".part"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._disk[key] = len(data)
+        self._disk_bytes += len(data)
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+            old_key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def get(self, text):
+        """
+        문구의 오디오 바이트를 반환합니다. 메모리 → 디스크 → 합성 순서로 찾습니다.
+        - 반환: 오디오 파일 내용(bytes, 형식은 backend.ext)
+        """
+        key = self.key(text)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            if key in self._disk:
+                try:
+                    with open(self._path(key), 'rb') as f:
+                        data = f.read()
+                    os.utime(self._path(key))  # 디스크 LRU 순서(수정 시각)를 갱신합니다.
+                    self._disk.move_to_end(key)
+                    self._remember(key, data)
+                    self.hits += 1
+                    return data
+                except OSError:
+                    self._disk_bytes -= self._disk.pop(key)
+
+        # 합성은 잠금 밖에서 수행합니다(네트워크/엔진 호출이 느릴 수 있음).
+        data = self.backend.synthesize(text, self.lang)
+        with self._lock:
+            self.misses += 1
+            if self.cache_dir and key not in self._disk:
+                self._store_disk(key, data)
+            self._remember(key, data)
+        return data
+
+    def get_clips(self, message):
+        """메시지를 문구 조각으로 나눠 각 조각의 오디오 바이트 리스트를 반환합니다(재생 순서)."""
+        return [self.get(phrase) for phrase in split_phrases(message)]
+
+    def prewarm(self, phrases=None, background=True):
+        """
+        고정 문구를 미리 합성해 캐시에 올립니다.
+        - phrases: 문구 리스트(None이면 ergonomics_phrases())
+        - background: True이면 데몬 스레드에서 수행하고 스레드를 반환합니다.
+        """
+        phrases = ergonomics_phrases() if phrases is None else phrases
+
+        def task():
+            for phrase in phrases:
+                try:
+                    self.get(phrase)
+                except Exception as e:
+                    print(f"TTS 사전 합성 오류: {e}")
+                    return
+
+        if not background:
+            task()
+            return None
+        thread = threading.Thread(target=task, name="tts-prewarm", daemon=True)
+        thread.start()
+        return thread